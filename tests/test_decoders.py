@@ -5,10 +5,15 @@ from os.path import (
     dirname as os_path_dirname,
     abspath as os_path_abspath,
     exists as os_path_exists)
-from typing import List
+from typing import List, Tuple
 from sys import path as sys_path
 from urllib.request import urlopen
 from shutil import copyfileobj as shutil_copyfileobj
+from threading import Thread
+
+from math import atan, cos, exp, floor, pi, sqrt
+
+import numpy as np
 
 sys_path.append(os_path_join(
     os_path_dirname(os_path_abspath(__file__)),
@@ -17,7 +22,10 @@ sys_path.append(os_path_join(
 from vorbis.decoders import (
     DataReader,
     SetupHeaderDecoder,
-    EndOfPacketException)
+    AudioDataDecoder,
+    EndOfPacketException,
+    CorruptedFileDataError)
+from vorbis.vorbis_main import PacketsProcessor
 from vorbis.helper_funcs import float32_unpack
 
 
@@ -65,6 +73,18 @@ def hex_str_to_bin_str(hex_str: str):
     return ' '.join([item[:4] + '_' + item[4:] for item in bin_values])
 
 
+def pack_bits(values: List[Tuple[int, int]]) -> bytes:
+    """Packs (<value>, <bits amount>) items into bytes in Vorbis bit order"""
+    accumulator: int = 0
+    bits_amount: int = 0
+
+    for value, value_bits in values:
+        accumulator |= value << bits_amount
+        bits_amount += value_bits
+
+    return accumulator.to_bytes((bits_amount + 7) // 8, byteorder='little')
+
+
 class DataReaderTests(TestCase):
     def test_read_some_bytes(self):
         data_reader = DataReader(data=b'\x76\x6f\x72\x62\x69\x73')
@@ -79,6 +99,24 @@ class DataReaderTests(TestCase):
         with self.assertRaises(EndOfPacketException):
             data_reader.read_bytes(7)
 
+    def test_read_bytes_not_on_byte_boundary(self):
+        # 92 E4 A1 -> 1001_0010 1110_0100 1010_0001
+        data_reader = DataReader(data=b'\x92\xE4\xA1')
+
+        self.assertEqual(data_reader.read_bits_for_int(4), 0x2)
+        self.assertEqual(data_reader.read_bytes(2), b'\x49\x1E')
+
+        with self.assertRaises(EndOfPacketException):
+            data_reader.read_bytes(1)
+
+    def test_read_bytes_from_memoryview(self):
+        data_reader = DataReader(data=memoryview(b'\x01vorbis'))
+        data_reader.read_bit()
+        data_reader.read_bits_for_int(7)
+
+        self.assertEqual(data_reader.read_bytes(6), b'vorbis')
+        self.assertIsInstance(data_reader.read_bytes(0), bytes)
+
     def test_read_some_bits(self):
         # 92 E4 -> 1001_0010 1110_0100
         data_reader = DataReader(data=b'\x92\xE4')
@@ -111,6 +149,43 @@ class DataReaderTests(TestCase):
         self.assertEqual(
             data_reader.read_bits_for_int(5, signed=True), -11)
 
+    def test_read_zero_bits_for_int(self):
+        data_reader = DataReader(data=b'')
+
+        self.assertEqual(data_reader.read_bits_for_int(0), 0)
+
+    def test_read_bits_many(self):
+        # 32 56 -> 0011_0010 0101_0110
+        data_reader = DataReader(data=b'\x32\x56')
+
+        self.assertEqual(
+            data_reader.read_bits_many(5, 3),
+            [0b010, 0b110, 0b000, 0b011, 0b101])
+        self.assertEqual(data_reader.read_bit(), 0)
+
+    def test_read_bits_many_crosses_accumulator(self):
+        data_reader = DataReader(data=bytes(range(40)))
+
+        self.assertEqual(
+            data_reader.read_bits_many(40, 8),
+            list(range(40)))
+
+    def test_read_bits_many_extra_bits(self):
+        data_reader = DataReader(data=b'\x32\x56')
+
+        with self.assertRaises(EndOfPacketException):
+            data_reader.read_bits_many(3, 6)
+
+    def test_get_bits_since(self):
+        data_reader = DataReader(data=b'\x32\x56\xff')
+        data_reader.read_bits_for_int(3)
+        data_reader.read_bits_for_int(10)
+
+        self.assertEqual(data_reader.get_packet_position(), (1, 5))
+        self.assertEqual(
+            data_reader.get_bits_since(0, 3), (10, b'\xc6\x02'))
+        self.assertEqual(data_reader.get_bits_since(1, 5), (0, b''))
+
 
 class SetupHeaderDecodingTests(TestCase):
     def test_codewords_reading_not_ordered_and_not_sparse(self):
@@ -122,7 +197,7 @@ class SetupHeaderDecodingTests(TestCase):
         data_reader.read_packet()
 
         data_reader.byte_pointer = 8
-        codebook_decoder.read_codebook()
+        codebook = codebook_decoder.read_codebook()
 
         # test_1.ogg, codebook 1
         #                                                    05
@@ -188,7 +263,7 @@ class SetupHeaderDecodingTests(TestCase):
             codebook_decoder._codebook_codewords_lengths,
             [1, 3, 4, 7, 2, 5, 6, 7])
         self.assertEqual(
-            codebook_decoder._codebook_codewords,
+            codebook.codebook_codewords,
             ['0', '100', '1010', '1011000', '11', '10111', '101101',
              '1011001'])
 
@@ -203,7 +278,7 @@ class SetupHeaderDecodingTests(TestCase):
         data_reader.byte_pointer = 8
 
         for i in range(29):
-            codebook_decoder.read_codebook()
+            codebook = codebook_decoder.read_codebook()
 
         self.assertEqual(
             codebook_decoder.last_read_codebook_position,
@@ -242,12 +317,162 @@ class SetupHeaderDecodingTests(TestCase):
             codebook_decoder._codebook_codewords_lengths[:8],
             [1, 5, 5, None, 5, 5, None, 5])
 
+        self.assertEqual(len(codebook.codebook_codewords), 81)
         self.assertEqual(
-            len(codebook_decoder._codebook_codewords), 81)
-        self.assertEqual(
-            codebook_decoder._codebook_codewords[:8],
+            codebook.codebook_codewords[:8],
             ['0', '10000', '10001', '', '10010', '10011', '', '10100'])
 
+    def test_codebooks_cache(self):
+        data_reader = DataReader(TEST_FILE_1_PATH)
+        codebook_decoder = SetupHeaderDecoder(data_reader)
+
+        data_reader.read_packet()
+        data_reader.read_packet()
+        data_reader.read_packet()
+
+        data_reader.byte_pointer = 8
+
+        SetupHeaderDecoder.clear_codebooks_cache()
+        codebook = codebook_decoder.read_codebook()
+        bits_count, bits = data_reader.get_bits_since(8, 0)
+        data_reader.close_file()
+
+        # The same codebook after 3 bits of other data
+        shifted_bits = (int.from_bytes(bits, byteorder='little') << 3) | 5
+        data_reader = DataReader(data=shifted_bits.to_bytes(
+            (bits_count + 10) // 8, byteorder='little'))
+        codebook_decoder = SetupHeaderDecoder(data_reader)
+        data_reader.read_bits_for_int(3)
+
+        self.assertIs(codebook_decoder.read_codebook(), codebook)
+
+        SetupHeaderDecoder.clear_codebooks_cache()
+
+        data_reader.byte_pointer = 0
+        data_reader.bit_pointer = 3
+        uncached_codebook = codebook_decoder.read_codebook()
+
+        self.assertIsNot(uncached_codebook, codebook)
+        self.assertEqual(
+            uncached_codebook.codebook_codewords,
+            codebook.codebook_codewords)
+
+    def test_codebooks_are_decoded_on_first_use(self):
+        data_reader = DataReader(TEST_FILE_1_PATH)
+        codebook_decoder = SetupHeaderDecoder(data_reader)
+
+        data_reader.read_packet()
+        data_reader.read_packet()
+        data_reader.read_packet()
+
+        data_reader.byte_pointer = 8
+
+        SetupHeaderDecoder.clear_codebooks_cache()
+        codebooks: List[SetupHeaderDecoder.CodebookData] = [
+            codebook_decoder.read_codebook() for _ in range(44)]
+        data_reader.close_file()
+
+        self.assertTrue(all(
+            codebook._codebook_codewords is None
+            and codebook._VQ_lookup_table is None
+            and codebook._decode_tables is None
+            for codebook in codebooks))
+
+        # test_1.ogg, codebook 29 has lookup type 1
+        VQ_lookup_table = codebooks[28].VQ_lookup_table
+
+        self.assertEqual(VQ_lookup_table.shape, (81, 4))
+        self.assertIs(codebooks[28].VQ_lookup_table, VQ_lookup_table)
+        self.assertIsNone(codebooks[28]._codebook_codewords)
+
+        # Explicit building keeps the built table
+        codebooks[28].build_vq_lookup_table()
+        codebooks[0].build_vq_lookup_table()
+
+        self.assertIs(codebooks[28]._VQ_lookup_table, VQ_lookup_table)
+        self.assertEqual(codebooks[0]._VQ_lookup_table.shape[0], 0)
+
+    def test_codebooks_cache_size(self):
+        def read_codebooks():
+            data_reader = DataReader(TEST_FILE_1_PATH)
+            codebook_decoder = SetupHeaderDecoder(data_reader)
+
+            data_reader.read_packet()
+            data_reader.read_packet()
+            data_reader.read_packet()
+
+            data_reader.byte_pointer = 8
+
+            SetupHeaderDecoder.clear_codebooks_cache()
+            for _ in range(44):
+                codebook_decoder.read_codebook()
+
+            data_reader.close_file()
+
+        cache_size = SetupHeaderDecoder.CODEBOOKS_CACHE_SIZE
+        cached_codebook_max_size = SetupHeaderDecoder.CACHED_CODEBOOK_MAX_SIZE
+
+        try:
+            SetupHeaderDecoder.CODEBOOKS_CACHE_SIZE = 32768
+            read_codebooks()
+
+            self.assertLessEqual(
+                SetupHeaderDecoder._codebooks_cache_size, 32768)
+            self.assertEqual(
+                SetupHeaderDecoder._codebooks_cache_size,
+                sum(codebook_size for _, codebook_size
+                    in SetupHeaderDecoder._codebooks_cache.values()))
+            self.assertLess(len(SetupHeaderDecoder._codebooks_cache), 44)
+
+            SetupHeaderDecoder.CACHED_CODEBOOK_MAX_SIZE = 0
+            read_codebooks()
+
+            self.assertEqual(len(SetupHeaderDecoder._codebooks_cache), 0)
+        finally:
+            SetupHeaderDecoder.CODEBOOKS_CACHE_SIZE = cache_size
+            SetupHeaderDecoder.CACHED_CODEBOOK_MAX_SIZE = (
+                cached_codebook_max_size)
+            SetupHeaderDecoder.clear_codebooks_cache()
+
+    def test_codebooks_cache_threads(self):
+        threads_codebooks: List[List[SetupHeaderDecoder.CodebookData]] = []
+
+        def read_codebooks():
+            data_reader = DataReader(TEST_FILE_1_PATH)
+            codebook_decoder = SetupHeaderDecoder(data_reader)
+
+            data_reader.read_packet()
+            data_reader.read_packet()
+            data_reader.read_packet()
+
+            data_reader.byte_pointer = 8
+
+            threads_codebooks.append([
+                codebook_decoder.read_codebook() for _ in range(44)])
+            data_reader.close_file()
+
+        SetupHeaderDecoder.clear_codebooks_cache()
+        threads = [Thread(target=read_codebooks) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # All threads get the same cached codebooks
+        self.assertEqual(len(threads_codebooks), 4)
+        for codebooks in threads_codebooks[1:]:
+            self.assertTrue(all(
+                codebook is first_thread_codebook
+                for codebook, first_thread_codebook
+                in zip(codebooks, threads_codebooks[0])))
+
+        self.assertEqual(
+            SetupHeaderDecoder._codebooks_cache_size,
+            sum(codebook_size for _, codebook_size
+                in SetupHeaderDecoder._codebooks_cache.values()))
+
+        SetupHeaderDecoder.clear_codebooks_cache()
+
     def test_codewords_lengths_reading_ordered(self):
         data_reader = DataReader(TEST_FILE_1_PATH)
         codebook_decoder = SetupHeaderDecoder(data_reader)
@@ -360,21 +585,21 @@ class SetupHeaderDecodingTests(TestCase):
             [1, 0, 2])
 
     def test_vq_table_unpacking_lookup_type_1(self):
-        codebook_decoder = SetupHeaderDecoder(DataReader())
+        codebook = SetupHeaderDecoder.CodebookData()
 
-        codebook_decoder._codebook_multiplicands = [1, 0, 2]
+        codebook.codebook_multiplicands = [1, 0, 2]
 
-        codebook_decoder._codebook_minimum_value = -1.0
-        codebook_decoder._codebook_delta_value = 1.0
+        codebook.codebook_minimum_value = -1.0
+        codebook.codebook_delta_value = 1.0
 
-        codebook_decoder._codebook_sequence_p = False
-        codebook_decoder._codebook_lookup_type = 1
-        codebook_decoder._codebook_entries = 81
-        codebook_decoder._codebook_dimensions = 4
-        codebook_decoder._codebook_lookup_values = 3
+        codebook.codebook_sequence_p = False
+        codebook.codebook_lookup_type = 1
+        codebook.codebook_entries = 81
+        codebook.codebook_dimensions = 4
+        codebook.codebook_lookup_values = 3
 
         result_vq_lookup_table: List[List[float]] = (
-            codebook_decoder._vq_lookup_table_unpack())
+            codebook._vq_lookup_table_unpack().tolist())
 
         self.assertEqual(len(result_vq_lookup_table), 81)
 
@@ -386,13 +611,52 @@ class SetupHeaderDecodingTests(TestCase):
         self.assertEqual(result_vq_lookup_table[4], [-1.0, -1.0, 0.0, 0.0])
         self.assertEqual(result_vq_lookup_table[5], [1.0, -1.0, 0.0, 0.0])
 
-    # Optimize: NO TEST DATA
     def test_vq_table_unpacking_lookup_type_2(self):
-        pass
+        codebook = SetupHeaderDecoder.CodebookData()
+
+        codebook.codebook_multiplicands = [1, 0, 2, 3, 2, 1]
+
+        codebook.codebook_minimum_value = -1.0
+        codebook.codebook_delta_value = 0.5
+
+        codebook.codebook_sequence_p = False
+        codebook.codebook_lookup_type = 2
+        codebook.codebook_entries = 3
+        codebook.codebook_dimensions = 2
+        codebook.codebook_lookup_values = 6
+
+        self.assertEqual(
+            codebook._vq_lookup_table_unpack().tolist(),
+            [[-0.5, -1.0], [0.0, 0.5], [0.0, -0.5]])
 
-    # Optimize: NO TEST DATA
     def test_vq_table_unpacking_sequence_p_is_true(self):
-        pass
+        codebook = SetupHeaderDecoder.CodebookData()
+
+        codebook.codebook_multiplicands = [1, 0, 2]
+
+        codebook.codebook_minimum_value = -1.0
+        codebook.codebook_delta_value = 1.0
+
+        codebook.codebook_sequence_p = True
+        codebook.codebook_entries = 9
+        codebook.codebook_dimensions = 2
+        codebook.codebook_lookup_values = 3
+
+        codebook.codebook_lookup_type = 1
+        result_vq_lookup_table = (
+            codebook._vq_lookup_table_unpack().tolist())
+
+        self.assertEqual(result_vq_lookup_table[0], [0.0, 0.0])
+        self.assertEqual(result_vq_lookup_table[5], [1.0, 0.0])
+        self.assertEqual(result_vq_lookup_table[7], [-1.0, 0.0])
+
+        codebook.codebook_multiplicands = list(range(18))
+        codebook.codebook_lookup_type = 2
+        result_vq_lookup_table = (
+            codebook._vq_lookup_table_unpack().tolist())
+
+        self.assertEqual(result_vq_lookup_table[0], [-1.0, -1.0])
+        self.assertEqual(result_vq_lookup_table[8], [15.0, 31.0])
 
     def test_floor_1_decoding(self):
         data_reader = DataReader(TEST_FILE_1_PATH)
@@ -542,6 +806,33 @@ class SetupHeaderDecodingTests(TestCase):
         self.assertEqual(0b0001100, first_floor_data.floor1_x_list[2])
         self.assertEqual(0b010111_0, first_floor_data.floor1_x_list[3])
 
+    def test_floor_0_decoding(self):
+        data_reader = DataReader(data=pack_bits([
+            (16, 8),  # floor0_order
+            (8000, 16),  # floor0_rate
+            (256, 16),  # floor0_bark_map_size
+            (6, 6),  # floor0_amplitude_bits
+            (100, 8),  # floor0_amplitude_offset
+            (1, 4),  # floor0_number_of_books - 1
+            (0, 8),
+            (1, 8)]))  # floor0_book_list
+
+        floor_data = SetupHeaderDecoder(
+            data_reader)._decode_floor_config_type_0(2)
+
+        self.assertEqual(floor_data.floor0_order, 16)
+        self.assertEqual(floor_data.floor0_rate, 8000)
+        self.assertEqual(floor_data.floor0_bark_map_size, 256)
+        self.assertEqual(floor_data.floor0_amplitude_bits, 6)
+        self.assertEqual(floor_data.floor0_amplitude_offset, 100)
+        self.assertEqual(floor_data.floor0_number_of_books, 2)
+        self.assertEqual(floor_data.floor0_book_list, [0, 1])
+
+        data_reader.byte_pointer = data_reader.bit_pointer = 0
+
+        with self.assertRaises(CorruptedFileDataError):
+            SetupHeaderDecoder(data_reader)._decode_floor_config_type_0(1)
+
     # WouldBeBetter: Test situation when [bitflag] is set
     def test_residue_decoding(self):
         """
@@ -802,27 +1093,244 @@ class SetupHeaderDecodingTests(TestCase):
              for mode in modes_configs])
 
 
+class Floor0Tests(TestCase):
+    def setUp(self):
+        floor_data = SetupHeaderDecoder.FloorData()
+        floor_data.floor0_order = 3
+        floor_data.floor0_rate = 22050
+        floor_data.floor0_bark_map_size = 64
+        floor_data.floor0_amplitude_bits = 4
+        floor_data.floor0_amplitude_offset = 40
+        floor_data.floor0_number_of_books = 1
+        floor_data.floor0_book_list = [0]
+
+        # Codewords '0' and '1' for vectors [0.5, 0.25] and [1.0, 0.75]
+        codebook = SetupHeaderDecoder.CodebookData()
+        codebook.codebook_codewords = ['0', '1']
+        codebook.codebook_entries = 2
+        codebook.codebook_dimensions = 2
+        codebook.codebook_lookup_type = 1
+        codebook.VQ_lookup_table = np.array(
+            [[0.5, 0.25], [1.0, 0.75]], dtype=np.float32)
+
+        logical_stream = PacketsProcessor.LogicalStreamData(0)
+        logical_stream.blocksize_0 = 64
+        logical_stream.blocksize_1 = 128
+        logical_stream.vorbis_codebook_configurations = [codebook]
+        logical_stream.vorbis_floor_configurations = [floor_data]
+
+        self._floor_data = floor_data
+        self._logical_stream = logical_stream
+
+    def _make_decoder(self, data: bytes) -> AudioDataDecoder:
+        return AudioDataDecoder(DataReader(data=data), self._logical_stream)
+
+    def test_floor_0_packet_decoding(self):
+        # Amplitude 9, book number 0, entries 1 and 0
+        audio_decoder = self._make_decoder(
+            pack_bits([(9, 4), (0, 1), (1, 1), (0, 1)]))
+
+        amplitude, coefficients = audio_decoder._decode_floor_0(
+            self._floor_data)
+
+        self.assertEqual(amplitude, 9)
+        self.assertEqual(coefficients.tolist(), [1.0, 0.75, 1.25])
+
+    def test_unused_floor_0(self):
+        self.assertIsNone(self._make_decoder(
+            pack_bits([(0, 4)]))._decode_floor_0(self._floor_data))
+
+        # The fourth vector is after the end of packet
+        self._floor_data.floor0_order = 7
+        self.assertIsNone(self._make_decoder(
+            pack_bits([(9, 4), (0, 1), (1, 1), (1, 1), (1, 1)])
+        )._decode_floor_0(self._floor_data))
+
+    def test_floor_0_curve(self):
+        audio_decoder = self._make_decoder(b'')
+        coefficients = np.array([1.0, 0.75, 1.25], dtype=np.float32)
+        curve_size = 32
+
+        floor_curve = audio_decoder._floor_0_curve(
+            0, (9, coefficients), curve_size)
+
+        def bark(x: float) -> float:
+            return (
+                13.1 * atan(0.00074 * x)
+                + 2.24 * atan(0.0000000185 * x * x)
+                + 0.0001 * x)
+
+        # Curve computed by docs for every value
+        floor_data = self._floor_data
+        for i in range(curve_size):
+            bark_map_item = min(
+                floor_data.floor0_bark_map_size - 1,
+                floor(
+                    bark(floor_data.floor0_rate * i / (2 * curve_size))
+                    * floor_data.floor0_bark_map_size
+                    / bark(0.5 * floor_data.floor0_rate)))
+            cos_omega = cos(
+                pi * bark_map_item / floor_data.floor0_bark_map_size)
+
+            p = (1 - cos_omega ** 2) * 4 * (
+                cos(coefficients[1]) - cos_omega) ** 2
+            q = 0.25 * 4 * (cos(coefficients[0]) - cos_omega) ** 2 * 4 * (
+                cos(coefficients[2]) - cos_omega) ** 2
+
+            self.assertAlmostEqual(
+                floor_curve[i],
+                exp(0.11512925 * (
+                    9 * 40 / (15 * sqrt(p + q)) - 40)),
+                places=9)
+
+        self.assertEqual(len(audio_decoder._floor0_cosines), 1)
+
+
+class Floor1Tests(TestCase):
+    def setUp(self):
+        # Floor with points on X 0, 128 and 64
+        floor_data = SetupHeaderDecoder.FloorData()
+        floor_data.floor1_partition_class_list = [0]
+        floor_data.floor1_class_dimensions = [1]
+        floor_data.floor1_class_subclasses = [0]
+        floor_data.floor1_class_masterbooks = [None]
+        floor_data.floor1_subclass_books = [[0]]
+        floor_data.floor1_multiplier = 3
+        floor_data.floor1_x_list = [0, 128, 64]
+        floor_data.floor1_values = 3
+
+        # Codebook of 256 entries with 8 bits codewords
+        codebook = SetupHeaderDecoder.CodebookData()
+        codebook.codebook_codewords = [
+            bin(entry)[2:].zfill(8) for entry in range(256)]
+        codebook.codebook_entries = 256
+        codebook.codebook_dimensions = 1
+        codebook.codebook_lookup_type = 0
+
+        logical_stream = PacketsProcessor.LogicalStreamData(0)
+        logical_stream.blocksize_0 = 256
+        logical_stream.blocksize_1 = 512
+        logical_stream.vorbis_codebook_configurations = [codebook]
+        logical_stream.vorbis_floor_configurations = [floor_data]
+
+        self._logical_stream = logical_stream
+
+    def _floor_curve(self, y_values: List[int]) -> np.ndarray:
+        """Returns floor curve of packet with Y values [y_values]
+
+        Multiplier 3 gives 7 bits for the first two Y values"""
+        # Codewords are read from the highest bit
+        third_codeword = int(bin(y_values[2])[2:].zfill(8)[::-1], 2)
+        audio_decoder = AudioDataDecoder(
+            DataReader(data=pack_bits([
+                (1, 1), (y_values[0], 7), (y_values[1], 7),
+                (third_codeword, 8)])),
+            self._logical_stream)
+
+        floor1_y = audio_decoder._decode_floor_1(
+            self._logical_stream.vorbis_floor_configurations[0])
+
+        self.assertEqual(floor1_y, y_values)
+
+        return audio_decoder._floor_1_curve(0, floor1_y, 128)
+
+    def test_out_of_range_y_values_are_clamped(self):
+        # The first Y values 127 are clamped to the top of range 85
+        self.assertTrue(np.array_equal(
+            self._floor_curve([127, 127, 0]),
+            self._floor_curve([85, 85, 0])))
+
+        # Predicted Y is 0 and the third Y value is over the top of range
+        floor_curve = self._floor_curve([0, 0, 200])
+
+        self.assertEqual(floor_curve[64], self._floor_curve([85, 85, 0])[0])
+
+    def test_negative_y_values_are_clamped(self):
+        # Predicted Y is 85 and the third Y value is below the bottom of
+        # range
+        floor_curve = self._floor_curve([85, 85, 200])
+
+        self.assertEqual(floor_curve[64], self._floor_curve([0, 0, 0])[0])
+
+
+class ResiduePartitionTests(TestCase):
+    def setUp(self):
+        # Codewords '0' and '1' for vectors [0.5, 0.25] and [1.0, 0.75]
+        codebook = SetupHeaderDecoder.CodebookData()
+        codebook.codebook_codewords = ['0', '1']
+        codebook.codebook_entries = 2
+        codebook.codebook_dimensions = 2
+        codebook.codebook_lookup_type = 1
+        codebook.VQ_lookup_table = np.array(
+            [[0.5, 0.25], [1.0, 0.75]], dtype=np.float32)
+
+        logical_stream = PacketsProcessor.LogicalStreamData(0)
+        logical_stream.blocksize_0 = 64
+        logical_stream.blocksize_1 = 128
+        logical_stream.vorbis_codebook_configurations = [codebook]
+        logical_stream.vorbis_floor_configurations = []
+
+        self._codebook = codebook
+        self._logical_stream = logical_stream
+
+    def _decode_partition(
+            self, residue_type: int, data: bytes) -> List[float]:
+        audio_decoder = AudioDataDecoder(
+            DataReader(data=data), self._logical_stream)
+        vector: List[float] = [0.0] * 40
+
+        with self.assertRaises(EndOfPacketException):
+            audio_decoder._decode_residue_partition(
+                residue_type, self._codebook, vector, 4, 32)
+
+        return vector
+
+    def test_type_0_partition_cut_by_end_of_packet(self):
+        # 8 of 16 vectors are in packet. Values of vector i are on
+        # positions 4 + i and 4 + i + 16
+        entries: List[int] = [1, 0, 0, 1, 1, 1, 0, 1]
+        vector = self._decode_partition(
+            0, pack_bits([(entry, 1) for entry in entries]))
+
+        expected_vector: List[float] = [0.0] * 40
+        for i, entry in enumerate(entries):
+            expected_vector[4 + i], expected_vector[4 + i + 16] = (
+                [[0.5, 0.25], [1.0, 0.75]][entry])
+
+        self.assertEqual(vector, expected_vector)
+
+    def test_type_1_partition_cut_by_end_of_packet(self):
+        # 8 of 16 vectors are in packet, they are placed one after another
+        vector = self._decode_partition(1, pack_bits([(0b10, 8)]))
+
+        self.assertEqual(
+            vector,
+            [0.0] * 4 + [0.5, 0.25, 1.0, 0.75] + [0.5, 0.25] * 6
+            + [0.0] * 20)
+
+
 class HuffmanTests(TestCase):
-    _codebook_decoder: SetupHeaderDecoder = SetupHeaderDecoder(DataReader())
+    _codebook: SetupHeaderDecoder.CodebookData = (
+        SetupHeaderDecoder.CodebookData())
 
     def test_1_Huffman(self):
-        self._codebook_decoder._codebook_codewords_lengths = [
+        self._codebook.codebook_codewords_lengths = [
             None, 2, 4, 4, 4, 4, 2, 3, 3]
-        self._codebook_decoder._codebook_entries = 9
+        self._codebook.codebook_entries = 9
 
         self._test_huffman([
             '', '00', '0100', '0101', '0110', '0111', '10', '110', '111'])
 
     def test_2_Huffman(self):
-        self._codebook_decoder._codebook_codewords_lengths = [
+        self._codebook.codebook_codewords_lengths = [
             1, 3, 4, 7, 2, 5, 6, 7]
-        self._codebook_decoder._codebook_entries = 8
+        self._codebook.codebook_entries = 8
 
         self._test_huffman([
             '0', '100', '1010', '1011000', '11', '10111', '101101', '1011001'])
 
     def test_long_Huffman(self):
-        self._codebook_decoder._codebook_codewords_lengths = [
+        self._codebook.codebook_codewords_lengths = [
             2, 5, 5, 4,
             5, 4, 5, 4,
             5, 5, 5, 5,
@@ -831,7 +1339,7 @@ class HuffmanTests(TestCase):
             7, 6, 7, 6,
             7, 6, 8, 6,
             9, 7, 9, 7]
-        self._codebook_decoder._codebook_entries = 32
+        self._codebook.codebook_entries = 32
 
         self._test_huffman([
             '00', '01000', '01001', '0101',
@@ -844,18 +1352,18 @@ class HuffmanTests(TestCase):
             '111100110', '1111110', '111100111', '1111111'])
 
     def test_two_entries_Huffman(self):
-        self._codebook_decoder._codebook_codewords_lengths = [1, 1]
-        self._codebook_decoder._codebook_entries = 2
+        self._codebook.codebook_codewords_lengths = [1, 1]
+        self._codebook.codebook_entries = 2
 
         self._test_huffman(['0', '1'])
 
     def _test_huffman(self, result_codewords: List[str]):
         self.assertEqual(
-            self._codebook_decoder._huffman_decode_bfc(),
+            self._codebook._huffman_decode_bfc(),
             result_codewords)
 
         self.assertEqual(
-            self._codebook_decoder._huffman_decode(),
+            self._codebook._huffman_decode(),
             result_codewords)
 
     _EXTREMELY_BIG_HUFFMAN: List[str] = [
@@ -951,7 +1459,7 @@ class HuffmanTests(TestCase):
         '11111111000111111111']
 
     def test_extremely_big_huffman(self):
-        self._codebook_decoder._codebook_codewords_lengths = [
+        self._codebook.codebook_codewords_lengths = [
             1, 5, 7, 21, 5, 8, 9, 21, 10, 9, 12, 20, 20, 16, 20, 20, 4, 8, 9,
             20, 6, 8, 9, 20, 11, 11, 13, 20, 20, 15, 17, 20, 9, 11, 14, 20,
             8, 10, 15, 20, 11, 13, 15, 20, 20, 20, 20, 20, 20, 20, 20, 20,
@@ -968,12 +1476,88 @@ class HuffmanTests(TestCase):
             18, 20, 20, 20, 20, 20, 16, 19, 18, 20, 15, 16, 20, 20, 17, 17,
             20, 20, 20, 20, 20, 20, 20, 20, 20, 20, 20, 20, 20, 20, 20, 20,
             20, 20, 20, 20, 20, 20]
-        self._codebook_decoder._codebook_entries = 256
+        self._codebook.codebook_entries = 256
 
         self.assertEqual(
-            self._codebook_decoder._huffman_decode(),
+            self._codebook._huffman_decode(),
             self._EXTREMELY_BIG_HUFFMAN)
 
 
+# noinspection PyPep8Naming
+class CodebookDecodingTests(TestCase):
+    def test_decode_scalar_short_codewords(self):
+        self._test_decode_scalar(
+            ['', '00', '0100', '0101', '0110', '0111', '10', '110', '111'],
+            [1, 8, 6, 2, 5, 7, 3, 4, 1, 1])
+
+    def test_decode_scalar_long_codewords(self):
+        self._test_decode_scalar(
+            HuffmanTests._EXTREMELY_BIG_HUFFMAN,
+            [0, 3, 255, 17, 0, 128, 7, 200, 0, 0, 45])
+
+    def test_decode_scalar_single_entry(self):
+        codebook = self._make_codebook(['', '0', ''])
+        data_reader = DataReader(data=b'\xFF')
+
+        self.assertEqual(codebook.decode_scalar(data_reader), 1)
+        self.assertEqual(codebook.decode_scalar(data_reader), 1)
+        self.assertEqual(
+            (data_reader.byte_pointer, data_reader.bit_pointer), (0, 0))
+
+    def test_decode_scalar_end_of_packet(self):
+        codebook = self._make_codebook(
+            ['0', '100', '1010', '1011000', '11', '10111', '101101',
+             '1011001'])
+        # Codeword '11' and first 6 bits of '1011000'
+        data_reader = DataReader(data=b'\x37')
+
+        self.assertEqual(codebook.decode_scalar(data_reader), 4)
+
+        with self.assertRaises(EndOfPacketException):
+            codebook.decode_scalar(data_reader)
+
+    def test_decode_vector(self):
+        codebook = self._make_codebook(['0', '10', '11'])
+        codebook.codebook_lookup_type = 1
+        codebook.VQ_lookup_table = np.array(
+            [[0.0, 1.0], [2.0, 3.0], [4.0, 5.0]], dtype=np.float32)
+        # Codewords '11', '0', '10'
+        data_reader = DataReader(data=b'\x0B')
+
+        self.assertEqual(
+            codebook.decode_vector(data_reader).tolist(), [4.0, 5.0])
+        self.assertEqual(
+            codebook.decode_vector(data_reader).tolist(), [0.0, 1.0])
+        self.assertEqual(
+            codebook.decode_vector(data_reader).tolist(), [2.0, 3.0])
+
+    def _test_decode_scalar(self, codewords: List[str], entries: List[int]):
+        codebook = self._make_codebook(codewords)
+        data_reader = DataReader(
+            data=self._encode_codewords([codewords[i] for i in entries]))
+
+        self.assertEqual(
+            [codebook.decode_scalar(data_reader) for _ in entries],
+            entries)
+
+    @staticmethod
+    def _make_codebook(
+            codewords: List[str]) -> SetupHeaderDecoder.CodebookData:
+        codebook = SetupHeaderDecoder.CodebookData()
+        codebook.codebook_codewords = codewords
+        codebook.codebook_entries = len(codewords)
+        codebook.codebook_lookup_type = 0
+
+        return codebook
+
+    @staticmethod
+    def _encode_codewords(codewords: List[str]) -> bytes:
+        bits: str = ''.join(codewords)
+        bits += '0' * (-len(bits) % 8)
+
+        return bytes(
+            int(bits[i:i + 8][::-1], 2) for i in range(0, len(bits), 8))
+
+
 if __name__ == '__main__':
     unittest_main()
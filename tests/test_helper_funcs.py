@@ -11,7 +11,14 @@ sys_path.append(os_path_join(
     os_pardir))
 
 from vorbis.helper_funcs import (
-    ilog, float32_unpack, lookup1_values, bit_reverse)
+    ilog,
+    float32_unpack,
+    lookup1_values,
+    bit_reverse,
+    low_neighbor,
+    high_neighbor,
+    render_point,
+    render_line)
 from .test_decoders import hex_str_to_bin_str
 
 
@@ -60,6 +67,30 @@ class HelperFunctionsTests(TestCase):
             '0010_0011 0101_0110',
             'Ordinary case')
 
+    def test_neighbors(self):
+        x_list = [0, 128, 64, 32, 96, 16]
+
+        self.assertEqual(low_neighbor(x_list, 4), 2)
+        self.assertEqual(high_neighbor(x_list, 4), 1)
+        self.assertEqual(low_neighbor(x_list, 5), 0)
+        self.assertEqual(high_neighbor(x_list, 5), 3)
+
+    def test_render_point(self):
+        self.assertEqual(render_point(0, 10, 10, 20, 5), 15)
+        self.assertEqual(render_point(0, 20, 10, 10, 3), 17)
+
+    def test_render_line(self):
+        vector = [0] * 8
+        render_line(0, 10, 5, 3, vector)
+
+        self.assertEqual(vector, [10, 9, 8, 6, 5, 0, 0, 0])
+
+    def test_render_line_out_of_vector(self):
+        vector = [0] * 4
+        render_line(2, 1, 8, 7, vector)
+
+        self.assertEqual(vector, [0, 0, 1, 2])
+
 
 if __name__ == '__main__':
     unittest_main()
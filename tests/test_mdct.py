@@ -0,0 +1,47 @@
+from unittest import TestCase, main as unittest_main
+from os import pardir as os_pardir
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from sys import path as sys_path
+from math import cos, pi
+from random import Random
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)),
+    os_pardir))
+
+from vorbis.mdct import imdct, _get_transform_tables
+
+
+class MdctTests(TestCase):
+    def test_imdct_by_definition(self):
+        random = Random(0)
+
+        for half_n in [2, 4, 32, 128]:
+            coefficients = [random.uniform(-1, 1) for _ in range(half_n)]
+            n = 2 * half_n
+
+            expected = [
+                sum(coefficients[k]
+                    * cos(2 * pi / n * (i + 0.5 + n / 4) * (k + 0.5))
+                    for k in range(half_n))
+                for i in range(n)]
+
+            for value, expected_value in zip(
+                    imdct(coefficients), expected):
+                self.assertAlmostEqual(value, expected_value, places=9)
+
+    def test_imdct_output_size(self):
+        self.assertEqual(len(imdct([0.0] * 1024)), 2048)
+
+    def test_transform_tables_are_cached(self):
+        imdct([0.0] * 64)
+
+        self.assertIs(_get_transform_tables(64), _get_transform_tables(64))
+        self.assertEqual(len(_get_transform_tables(64).fft_permutation), 32)
+
+
+if __name__ == '__main__':
+    unittest_main()
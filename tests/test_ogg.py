@@ -8,12 +8,26 @@ from os.path import (
 from sys import path as sys_path
 from urllib.request import urlopen
 from shutil import copyfileobj as shutil_copyfileobj
+from tempfile import TemporaryDirectory
+from itertools import zip_longest
+from typing import List
+import asyncio
 
 sys_path.append(os_path_join(
     os_path_dirname(os_path_abspath(__file__)),
     os_pardir))
 
-from vorbis.ogg import PacketsReader
+from vorbis.ogg import (
+    PacketsReader,
+    AsyncPacketsReader,
+    MmapPacketsReader,
+    OggPageSyncer,
+    CorruptedFileDataError,
+    UnexpectedEndOfFileError,
+    PageChecksumError,
+    PageChecksumWarning,
+    ogg_crc,
+    verify_pages_checksums)
 
 
 TEST_FILE_1_PATH = os_path_join(
@@ -21,6 +35,11 @@ TEST_FILE_1_PATH = os_path_join(
     'test_audiofiles',
     'test_1.ogg')
 
+TEST_FILE_4_PATH = os_path_join(
+    os_path_dirname(os_path_abspath(__file__)),
+    'test_audiofiles',
+    'test_4.ogg')
+
 TEST_FILE_1_URL: str = (
     r'https://raw.githubusercontent.com/susimus/ogg_vorbis/master/'
     r'tests/test_audiofiles/test_1.ogg')
@@ -52,6 +71,56 @@ def tearDownModule():
         os_remove(TEST_FILE_1_PATH)
 
 
+def read_pages(path: str) -> List[bytes]:
+    """Returns raw pages of ogg file"""
+    with open(path, 'rb') as ogg_file:
+        data = ogg_file.read()
+
+    pages: List[bytes] = []
+    position = 0
+
+    while position < len(data):
+        segments = data[position + 26]
+        page_size = 27 + segments + sum(
+            data[position + 27:position + 27 + segments])
+
+        pages.append(data[position:position + page_size])
+        position += page_size
+
+    return pages
+
+
+def make_multiplexed_data(
+        vorbis_path: str, other_path: str, other_serial: int = 2) -> bytes:
+    """Returns pages of two ogg files interleaved one by one
+
+    Pages of [other_path] get serial number [other_serial] and its first
+    packet is changed, so it is not recognized as Vorbis stream"""
+    other_pages: List[bytearray] = []
+
+    for page in read_pages(other_path):
+        page = bytearray(page)
+        page[14:18] = other_serial.to_bytes(4, byteorder='little')
+        other_pages.append(page)
+
+    data_start = 27 + other_pages[0][26]
+    other_pages[0][data_start:data_start + 7] = b'\x01VORBIS'
+
+    for page in other_pages:
+        page[22:26] = bytes(4)
+        page[22:26] = ogg_crc(page).to_bytes(4, byteorder='little')
+
+    vorbis_pages = read_pages(vorbis_path)
+    result_pages = [other_pages[0], vorbis_pages[0]]
+
+    for vorbis_page, other_page in zip_longest(
+            vorbis_pages[1:], other_pages[1:]):
+        result_pages += [
+            page for page in (vorbis_page, other_page) if page is not None]
+
+    return b''.join(result_pages)
+
+
 class PacketReadingTest(TestCase):
     @staticmethod
     def test_correct_filename():
@@ -101,5 +170,623 @@ class PacketReadingTest(TestCase):
         packets_reader.close_file()
 
 
+class MmapPacketReadingTest(TestCase):
+    def test_packets_equal_to_file_packets(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+        mmap_packets_reader = MmapPacketsReader(TEST_FILE_1_PATH)
+
+        try:
+            while True:
+                packet_data, packet_pages = packets_reader.read_packet()
+                mmap_packet_data, mmap_packet_pages = (
+                    mmap_packets_reader.read_packet())
+
+                self.assertIsInstance(mmap_packet_data, memoryview)
+                self.assertEqual(packet_data, mmap_packet_data)
+                self.assertEqual(packet_pages, mmap_packet_pages)
+        except EOFError:
+            with self.assertRaises(EOFError):
+                mmap_packets_reader.read_packet()
+
+        packets_reader.close_file()
+        mmap_packets_reader.close_file()
+
+    def test_moving_byte_pointer(self):
+        mmap_packets_reader = MmapPacketsReader(TEST_FILE_1_PATH)
+        mmap_packets_reader.move_byte_position(352363)
+
+        self.assertEqual(mmap_packets_reader.read_packet()[1][0], 54)
+
+        mmap_packets_reader.close_file()
+
+
+class OggPageSyncerTest(TestCase):
+    def setUp(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            self._file_data = test_file.read()
+
+    def test_pages_by_small_chunks(self):
+        page_syncer = OggPageSyncer()
+        page_numbers = []
+
+        for i in range(0, len(self._file_data), 1000):
+            for page_header, page_data in page_syncer.feed(
+                    self._file_data[i:i + 1000]):
+                self.assertEqual(len(page_data), page_header.data_size)
+                page_numbers.append(page_header.page_sequence_number)
+
+        page_syncer.finish()
+
+        self.assertEqual(page_numbers, list(range(421)))
+
+    def test_packets_split_by_lacing_values(self):
+        page_syncer = OggPageSyncer()
+        packets = page_syncer.feed_packets(self._file_data[:130000])
+
+        # Identification, comment and setup headers and audio packets of
+        # page 4
+        self.assertEqual(packets[0][0][:7], b'\x01vorbis')
+        self.assertEqual(packets[1][0][:7], b'\x03vorbis')
+        self.assertEqual(packets[1][1], [1, 2])
+        self.assertEqual(packets[2][0][:7], b'\x05vorbis')
+        self.assertEqual(len(packets[3][0]), 191)
+        self.assertEqual(len(packets[4][0]), 210)
+        self.assertEqual(packets[4][1], [4])
+
+    def test_missing_capture_pattern(self):
+        page_syncer = OggPageSyncer()
+
+        with self.assertRaises(CorruptedFileDataError):
+            page_syncer.feed(self._file_data[:58] + b'Ogg_' + b'0' * 30)
+
+    def test_damaged_data_after_pages(self):
+        page_syncer = OggPageSyncer()
+
+        with self.assertRaises(CorruptedFileDataError):
+            page_syncer.feed(self._file_data[:58] + b'Ogg_' + b'0' * 30)
+
+        # The first page is consumed before error
+        self.assertEqual(page_syncer._byte_position, 58)
+        self.assertEqual(list(page_syncer._last_pages.values()), [0])
+
+        with self.assertRaises(CorruptedFileDataError):
+            page_syncer.feed(b'')
+
+    def test_multiplexed_pages(self):
+        page_syncer = OggPageSyncer()
+        pages_amount = 0
+
+        multiplexed_data = make_multiplexed_data(
+            TEST_FILE_1_PATH, TEST_FILE_4_PATH)
+        for i in range(0, len(multiplexed_data), 5000):
+            pages_amount += len(
+                page_syncer.feed(multiplexed_data[i:i + 5000]))
+
+        page_syncer.finish()
+
+        self.assertEqual(pages_amount, len(read_pages(TEST_FILE_1_PATH))
+                         + len(read_pages(TEST_FILE_4_PATH)))
+        self.assertEqual(sorted(page_syncer._last_pages), [1, 2])
+
+    def test_truncated_data(self):
+        page_syncer = OggPageSyncer()
+        page_syncer.feed_packets(self._file_data[:1000])
+
+        with self.assertRaises(UnexpectedEndOfFileError):
+            page_syncer.finish()
+
+
+class PageChecksumTest(TestCase):
+    # Page 4 of 'test_1.ogg' begins on 122659 byte and has 19 segments
+    _CORRUPTED_PAGE_POSITION: int = 122659
+
+    def setUp(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            corrupted_data = bytearray(test_file.read())
+
+        corrupted_data[self._CORRUPTED_PAGE_POSITION + 27 + 19 + 10] ^= 0xFF
+        self._corrupted_data = bytes(corrupted_data)
+
+    def test_ogg_crc(self):
+        self.assertEqual(ogg_crc(b'123456789'), 0x89A1897F)
+        self.assertEqual(
+            ogg_crc(b'56789', ogg_crc(b'1234')), ogg_crc(b'123456789'))
+
+    def test_verify_pages_checksums(self):
+        self.assertEqual(verify_pages_checksums(TEST_FILE_1_PATH), [])
+        self.assertEqual(
+            verify_pages_checksums(self._corrupted_data),
+            [self._CORRUPTED_PAGE_POSITION])
+
+    def test_verify_pages_checksums_after_damaged_header(self):
+        # Pages 10 and 12 of 'test_1.ogg' begin on 148474 and 156927 bytes
+        damaged_data = bytearray(self._corrupted_data)
+        damaged_data[148474] = ord('X')
+        damaged_data[156927 + 27 + 100] ^= 0xFF
+
+        self.assertEqual(
+            verify_pages_checksums(bytes(damaged_data)),
+            [self._CORRUPTED_PAGE_POSITION, 148474, 156927])
+
+        # Truncated last page is reported too
+        self.assertEqual(
+            verify_pages_checksums(bytes(damaged_data[:161303 + 100])),
+            [self._CORRUPTED_PAGE_POSITION, 148474, 156927, 161303])
+
+    def test_strict_mode(self):
+        for reader_class in (PacketsReader, MmapPacketsReader):
+            packets_reader = reader_class(self._corrupted_data, 'strict')
+            packets_reader.move_to_page(3)
+            packets_reader.read_packet()
+
+            with self.assertRaises(PageChecksumError):
+                packets_reader.read_packet()
+
+            packets_reader.close_file()
+
+    def test_warn_mode(self):
+        packets_reader = PacketsReader(self._corrupted_data, 'warn')
+        packets_reader.move_to_page(4)
+
+        with self.assertWarns(PageChecksumWarning):
+            packets_reader.read_packet()
+
+        packets_reader.close_file()
+
+    def test_off_mode(self):
+        packets_reader = PacketsReader(self._corrupted_data)
+        packets_reader.move_to_page(4)
+        packets_reader.read_packet()
+        packets_reader.close_file()
+
+
+class MultiplexedStreamTest(TestCase):
+    def setUp(self):
+        self._multiplexed_data = make_multiplexed_data(
+            TEST_FILE_1_PATH, TEST_FILE_4_PATH)
+
+    def test_find_vorbis_stream(self):
+        packets_reader = PacketsReader(self._multiplexed_data)
+
+        self.assertEqual(packets_reader.find_vorbis_stream(), 1)
+        self.assertEqual(packets_reader.opened_file.tell(), 0)
+
+        packets_reader.close_file()
+
+    def test_packets_of_selected_stream(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+        multiplexed_reader = PacketsReader(self._multiplexed_data)
+        multiplexed_reader.select_stream(1)
+
+        try:
+            while True:
+                self.assertEqual(
+                    multiplexed_reader.read_packet(),
+                    packets_reader.read_packet())
+        except EOFError:
+            pass
+
+        with self.assertRaises(EOFError):
+            multiplexed_reader.read_packet()
+
+        packets_reader.close_file()
+        multiplexed_reader.close_file()
+
+    def test_multiplexed_stream_is_not_chained(self):
+        packets_reader = PacketsReader(self._multiplexed_data)
+
+        self.assertFalse(packets_reader.chained_stream_present())
+        self.assertFalse(packets_reader.chained_stream_present(True))
+
+        packets_reader.close_file()
+
+    def test_seek_granule(self):
+        for build_page_index in (False, True):
+            packets_reader = PacketsReader(self._multiplexed_data)
+            packets_reader.select_stream(1)
+
+            if build_page_index:
+                _ = packets_reader.page_index
+
+            # Page 33 of 'test_1.ogg' is the last page with granule position
+            # not greater than 100000
+            packets_reader.seek_granule(100000)
+
+            self.assertEqual(packets_reader.read_packet()[1][0], 33)
+            self.assertEqual(
+                packets_reader._packet_page_headers[0].stream_serial_number,
+                1)
+
+            packets_reader.close_file()
+
+
+class TolerantReadingTest(TestCase):
+    def setUp(self):
+        pages = read_pages(TEST_FILE_1_PATH)
+
+        # Page 10 is damaged, page 20 is lost and garbage with capture
+        # pattern is inserted before page 5
+        damaged_pages = list(pages)
+        damaged_pages[10] = pages[10][:2000] + bytes(100) + pages[10][2100:]
+        del damaged_pages[20]
+        damaged_pages.insert(5, b'garbage OggS garbage')
+
+        self._damaged_data = b''.join(damaged_pages)
+
+    def test_damaged_data_is_skipped(self):
+        for packets_reader_class in (PacketsReader, MmapPacketsReader):
+            packets_reader = packets_reader_class(
+                self._damaged_data, tolerant=True)
+            packets_amount = 0
+
+            try:
+                while True:
+                    packets_amount += len(packets_reader.read_packets())
+            except EOFError:
+                pass
+
+            report = packets_reader.recovery_report
+            packets_reader.close_file()
+
+            # 'test_1.ogg' has 2437 packets
+            self.assertEqual(packets_amount, 2413)
+            self.assertEqual(
+                report.skipped_ranges,
+                [(126973, 126993), (148494, 152712)])
+            self.assertEqual(report.lost_pages, 2)
+            # Packets which are cut by lost pages 10 and 20
+            self.assertEqual(report.lost_packets, 2)
+
+    def test_pages_are_checked_once(self):
+        for packets_reader_class in (PacketsReader, MmapPacketsReader):
+            packets_reader = packets_reader_class(
+                TEST_FILE_1_PATH, tolerant=True)
+            checked_positions = []
+            read_checked_page = packets_reader._read_checked_page
+
+            def count_checked_page(position):
+                checked_positions.append(position)
+
+                return read_checked_page(position)
+
+            packets_reader._read_checked_page = count_checked_page
+
+            try:
+                while True:
+                    packets_reader.read_packet()
+            except EOFError:
+                pass
+
+            packets_reader.close_file()
+
+            # 'test_1.ogg' has 421 pages
+            self.assertEqual(len(checked_positions), 421)
+            self.assertEqual(
+                len(set(checked_positions)), len(checked_positions))
+
+    def test_damaged_data_is_error_by_default(self):
+        packets_reader = PacketsReader(self._damaged_data)
+
+        with self.assertRaises(CorruptedFileDataError):
+            while True:
+                packets_reader.read_packet()
+
+        packets_reader.close_file()
+
+    def test_packet_beginning_is_lost(self):
+        pages = read_pages(TEST_FILE_1_PATH)
+
+        # Packet which begins on page 9 continues on page 10
+        packets_reader = PacketsReader(
+            b''.join(pages[:9] + pages[10:12]), tolerant=True)
+        for i in range(5):
+            packets_reader.read_packet()
+
+        packets_reader.read_packet()
+        self.assertEqual(packets_reader._packet_pages, [10])
+        self.assertFalse(
+            packets_reader._packet_page_headers[0].continued_packet)
+        self.assertEqual(packets_reader.recovery_report.lost_packets, 1)
+        self.assertEqual(packets_reader.recovery_report.lost_pages, 1)
+
+        packets_reader.close_file()
+
+
+class ChunkedAsyncStream:
+    """Asynchronous stream which returns not more than [chunk_size] bytes
+    on every read"""
+    def __init__(self, data: bytes, chunk_size: int):
+        self._data = data
+        self._position = 0
+        self._chunk_size = chunk_size
+
+    async def read(self, size: int) -> bytes:
+        chunk = self._data[
+            self._position:self._position + min(size, self._chunk_size)]
+        self._position += len(chunk)
+
+        return chunk
+
+
+class AsyncPacketsReaderTest(TestCase):
+    def test_packets_are_the_same(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            file_data = test_file.read()
+
+        async def read_async_packets() -> list:
+            packets_reader = AsyncPacketsReader(
+                ChunkedAsyncStream(file_data, 1000), crc_check='strict')
+
+            return [packet async for packet in packets_reader.iter_packets()]
+
+        async_packets = asyncio.run(read_async_packets())
+
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+        packets = list(packets_reader.iter_packets())
+        packets_reader.close_file()
+
+        self.assertEqual(len(async_packets), len(packets))
+
+        for async_packet, packet in zip(async_packets, packets):
+            self.assertEqual(async_packet.data, packet.data)
+            self.assertEqual(
+                (async_packet.byte_position, async_packet.granule_position,
+                 async_packet.continued, async_packet.last_page),
+                (packet.byte_position, packet.granule_position,
+                 packet.continued, packet.last_page))
+
+    def test_vorbis_stream_selection(self):
+        multiplexed_data = make_multiplexed_data(
+            TEST_FILE_1_PATH, TEST_FILE_4_PATH)
+
+        async def read_first_packets() -> tuple:
+            stream = asyncio.StreamReader()
+            stream.feed_data(multiplexed_data)
+            stream.feed_eof()
+
+            packets_reader = AsyncPacketsReader(stream)
+            serial_number = await packets_reader.select_vorbis_stream()
+
+            return serial_number, await packets_reader.read_packets()
+
+        serial_number, packets = asyncio.run(read_first_packets())
+
+        self.assertEqual(serial_number, 1)
+        self.assertEqual(bytes(packets[0][0][:7]), b'\x01vorbis')
+
+    def test_unexpected_end_of_stream(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            file_data = test_file.read(100000)
+
+        async def read_all_packets():
+            packets_reader = AsyncPacketsReader(
+                ChunkedAsyncStream(file_data, 4096))
+
+            while True:
+                await packets_reader.read_packet()
+
+        with self.assertRaises(UnexpectedEndOfFileError):
+            asyncio.run(read_all_packets())
+
+
+class PageHeadersTest(TestCase):
+    def test_read_page_header(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+
+        page_header = packets_reader.read_page_header(65365)
+
+        self.assertEqual(page_header.page_sequence_number, 2)
+        self.assertEqual(page_header.stream_serial_number, 1)
+        self.assertEqual(page_header.absolute_granule_position, 0)
+        self.assertTrue(page_header.continued_packet)
+        self.assertFalse(page_header.first_page)
+        self.assertEqual(page_header.page_size, 27 + 209 + 53107)
+        self.assertEqual(packets_reader.opened_file.tell(), 0)
+
+        packets_reader.close_file()
+
+    def test_packet_spans(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+
+        # Page 4 of 'test_1.ogg' begins with fresh packets of 191 and 210
+        # bytes
+        self.assertEqual(
+            packets_reader.read_page_header(122659).packet_spans()[:2],
+            [(0, 191, True), (191, 401, True)])
+
+        # Page 1 contains beginning of comment header only
+        self.assertEqual(
+            packets_reader.read_page_header(58).packet_spans(),
+            [(0, 65025, False)])
+
+        packets_reader.close_file()
+
+    def test_read_packets(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+        packets_reader.move_to_page(4)
+
+        # Packets of pages 4 and 5. The last packet of page 5 is not
+        # continued on page 6
+        packets = packets_reader.read_packets()
+
+        self.assertEqual(
+            [len(packet[0]) for packet in packets[:3]], [191, 210, 211])
+        self.assertEqual(
+            [packet[1] for packet in packets],
+            [-1] * 6 + [2112] + [-1] * 3 + [6208])
+        self.assertFalse(any(packet[2] for packet in packets))
+
+        packets_reader.close_file()
+
+    def test_iter_packets(self):
+        for packets_reader_class in (PacketsReader, MmapPacketsReader):
+            packets_reader = packets_reader_class(TEST_FILE_1_PATH)
+            packets = list(packets_reader.iter_packets())
+
+            self.assertEqual(len(packets), 2437)
+            self.assertIsInstance(packets[0].data, memoryview)
+
+            # Identification header is on the first page. Comment header
+            # begins on page 1 and ends on page 2
+            self.assertEqual(
+                [(packet.byte_position, len(packet.data),
+                  packet.page_sequence_number, packet.granule_position,
+                  packet.continued, packet.first_page, packet.last_page)
+                 for packet in packets[:2]],
+                [(28, 30, 0, 0, False, True, False),
+                 (340, 118132, 2, 0, True, False, False)])
+            self.assertEqual(bytes(packets[1].data[:7]), b'\x03vorbis')
+
+            self.assertEqual(
+                [(packet.granule_position, packet.last_page)
+                 for packet in packets[-2:]],
+                [(-1, True), (1285824, True)])
+
+            packets_reader.close_file()
+
+    def test_page_index(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+
+        page_index = packets_reader.page_index
+
+        self.assertEqual(len(page_index), 421)
+        self.assertEqual(page_index.byte_positions[2], 65365)
+        self.assertEqual(page_index.data_sizes[2], 53107)
+        self.assertEqual(page_index.absolute_granule_positions[4], 2112)
+        self.assertEqual(page_index.end_position, 1898017)
+
+        # 32-bit fields of page header take 4 bytes per page
+        for page_index_array in (
+                page_index.stream_serial_numbers,
+                page_index.page_sequence_numbers,
+                page_index.data_sizes):
+            self.assertEqual(page_index_array.itemsize, 4)
+
+        self.assertEqual(page_index.page_containing(65365), 2)
+        self.assertEqual(page_index.page_containing(65364), 1)
+        self.assertEqual(page_index.page_containing(1898017), None)
+
+        packets_reader.close_file()
+
+    def test_moving_to_last_page(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+        packets_reader.move_to_page(-1)
+
+        self.assertEqual(packets_reader.read_packet()[1], [420])
+        with self.assertRaises(EOFError):
+            packets_reader.read_packet()
+
+        packets_reader.close_file()
+
+    def test_seek_granule(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+
+        # Page 33 is the last page with granule not greater than 100000.
+        # It begins with fresh packet
+        packets_reader.seek_granule(100000, 122659)
+        self.assertEqual(packets_reader.read_packet()[1][0], 33)
+
+        # Page 5 is the last page with granule not greater than 6208. It
+        # begins with continued packet, so reading starts from page 4
+        packets_reader.seek_granule(6208, 122659)
+        self.assertEqual(packets_reader.read_packet()[1][:2], [4, 5])
+
+        packets_reader.close_file()
+
+    def test_seek_granule_by_page_index(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+
+        bisection_positions = []
+        for granule in (0, 6208, 100000, 640000, 1285824, 10 ** 9):
+            packets_reader.seek_granule(granule, 122659)
+            bisection_positions.append(packets_reader.opened_file.tell())
+
+        self.assertIsNotNone(packets_reader.page_index)
+
+        for i, granule in enumerate(
+                (0, 6208, 100000, 640000, 1285824, 10 ** 9)):
+            packets_reader.seek_granule(granule, 122659)
+            self.assertEqual(
+                packets_reader.opened_file.tell(), bisection_positions[i])
+
+        packets_reader.close_file()
+
+    def test_find_last_granule_position(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+
+        self.assertEqual(
+            packets_reader.find_last_granule_position(), 1285824)
+        # The last page which ends before 1800000 byte
+        self.assertEqual(
+            packets_reader.find_last_granule_position(1800000), 1205696)
+        self.assertEqual(packets_reader.opened_file.tell(), 0)
+
+        packets_reader.close_file()
+
+        # Pages of other logical bitstream are at the end of file
+        packets_reader = PacketsReader(
+            make_multiplexed_data(TEST_FILE_1_PATH, TEST_FILE_4_PATH))
+        packets_reader.select_stream(1)
+
+        self.assertEqual(
+            packets_reader.find_last_granule_position(), 1285824)
+
+        packets_reader.close_file()
+
+    def test_not_chained_stream(self):
+        packets_reader = PacketsReader(TEST_FILE_1_PATH)
+
+        self.assertFalse(packets_reader.chained_stream_present())
+        self.assertFalse(packets_reader.chained_stream_present(True))
+
+        packets_reader.close_file()
+
+    def test_chained_stream(self):
+        with TemporaryDirectory() as temp_dir:
+            chained_file_path = os_path_join(temp_dir, 'chained.ogg')
+
+            with open(chained_file_path, 'wb') as chained_file:
+                for path in (TEST_FILE_1_PATH, TEST_FILE_4_PATH):
+                    with open(path, 'rb') as link_file:
+                        shutil_copyfileobj(link_file, chained_file)
+
+            packets_reader = PacketsReader(chained_file_path)
+
+            self.assertTrue(packets_reader.chained_stream_present(True))
+
+            packets_reader.close_file()
+
+    def test_find_chain_links(self):
+        with open(TEST_FILE_4_PATH, 'rb') as test_file:
+            second_link_data = test_file.read()
+
+        # The first link is multiplexed, its first page is a page of other
+        # logical bitstream
+        first_link_data = make_multiplexed_data(
+            TEST_FILE_1_PATH, TEST_FILE_4_PATH)
+
+        packets_reader = PacketsReader(first_link_data + second_link_data)
+        links = packets_reader.find_chain_links()
+        packets_reader.close_file()
+
+        self.assertEqual(len(links), 2)
+
+        self.assertEqual(links[0].stream_serial_number, 1)
+        self.assertEqual(links[0].stream_byte_position, 58)
+        self.assertEqual(links[0].byte_range, (0, len(first_link_data)))
+        self.assertEqual(links[0].granule_range, (0, 1285824))
+        self.assertTrue(links[0].ended)
+
+        self.assertEqual(links[1].stream_serial_number, 1)
+        self.assertEqual(
+            links[1].stream_byte_position, len(first_link_data))
+        self.assertEqual(
+            links[1].byte_range,
+            (len(first_link_data),
+             len(first_link_data) + len(second_link_data)))
+        self.assertEqual(links[1].granule_range, (0, 2460800))
+        self.assertTrue(links[1].ended)
+
+
 if __name__ == '__main__':
     unittest_main()
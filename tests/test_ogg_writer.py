@@ -0,0 +1,160 @@
+from unittest import TestCase, main as unittest_main
+from os import pardir as os_pardir
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath)
+from sys import path as sys_path
+from io import BytesIO
+from typing import List
+
+import numpy as np
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)),
+    os_pardir))
+
+from vorbis.ogg import PacketsReader, verify_pages_checksums
+from vorbis.ogg_writer import OggPageWriter, cut_audio
+from vorbis.vorbis_main import PacketsProcessor
+from .test_ogg import TEST_FILE_1_PATH
+
+
+def decode_first_channel(source, samples_amount: int = -1) -> np.ndarray:
+    """Returns PCM data of the first channel of ogg vorbis [source]
+
+    Decoding stops after [samples_amount] samples if it is not -1"""
+    packets_processor = PacketsProcessor(source)
+    packets_processor.process_headers()
+
+    pcm_data: List[np.ndarray] = []
+    for packet_pcm_data in packets_processor.get_audio_data():
+        pcm_data.append(packet_pcm_data[0])
+
+        if samples_amount != -1 and sum(map(len, pcm_data)) >= samples_amount:
+            break
+
+    packets_processor.close_file()
+
+    return np.concatenate(pcm_data)
+
+
+class OggPageWriterTest(TestCase):
+    def test_written_packets_are_read_back(self):
+        packets = [b'', b'\x01' * 254, b'\x02' * 255, b'\x03' * 70000, b'4']
+
+        output = BytesIO()
+        page_writer = OggPageWriter(output, 7, page_data_size=300)
+        for packet_number, packet in enumerate(packets):
+            page_writer.write_packet(
+                packet,
+                packet_number,
+                last_packet=packet_number == len(packets) - 1)
+
+        written_data = output.getvalue()
+        self.assertEqual(verify_pages_checksums(written_data), [])
+
+        packets_reader = PacketsReader(written_data, 'strict')
+        read_packets = list(packets_reader.iter_packets())
+
+        self.assertEqual(
+            [bytes(packet.data) for packet in read_packets], packets)
+        self.assertEqual(read_packets[-1].granule_position, 4)
+        self.assertTrue(read_packets[-1].last_page)
+        self.assertTrue(read_packets[0].first_page)
+
+        page_headers = [packets_reader.read_page_header(0)]
+        while (page_headers[-1].byte_position + page_headers[-1].page_size
+               < len(written_data)):
+            page_headers.append(packets_reader.read_page_header(
+                page_headers[-1].byte_position + page_headers[-1].page_size))
+
+        packets_reader.close_file()
+
+        self.assertEqual(
+            [page_header.page_sequence_number
+             for page_header in page_headers],
+            list(range(len(page_headers))))
+
+        # 70000 bytes packet has 275 segments, so it continues on the next
+        # page after page of 255 segments
+        self.assertEqual(
+            [(page_header.page_segments, page_header.continued_packet)
+             for page_header in page_headers[1:3]],
+            [(255, False), (20, True)])
+        self.assertEqual(page_headers[1].absolute_granule_position, -1)
+
+    def test_flush(self):
+        output = BytesIO()
+        page_writer = OggPageWriter(output, 7)
+        page_writer.write_packet(b'header', 0)
+        page_writer.flush()
+        page_writer.flush()
+        page_writer.write_packet(b'audio', 10, last_packet=True)
+
+        packets_reader = PacketsReader(output.getvalue())
+        first_page = packets_reader.read_page_header(0)
+        second_page = packets_reader.read_page_header(first_page.page_size)
+        packets_reader.close_file()
+
+        self.assertTrue(first_page.first_page)
+        self.assertEqual(first_page.absolute_granule_position, 0)
+        self.assertTrue(second_page.last_page)
+        self.assertEqual(second_page.page_sequence_number, 1)
+        self.assertEqual(second_page.absolute_granule_position, 10)
+
+
+class CutAudioTest(TestCase):
+    _reference_data: np.ndarray
+
+    @classmethod
+    def setUpClass(cls):
+        cls._reference_data = decode_first_channel(TEST_FILE_1_PATH, 88200)
+
+    def _cut(self, start_time: float, end_time: float) -> bytes:
+        output = BytesIO()
+        cut_audio(TEST_FILE_1_PATH, output, start_time, end_time)
+
+        return output.getvalue()
+
+    def test_clip_samples(self):
+        # 'test_1.ogg' has sample rate 44100
+        clip_data = self._cut(1.0, 2.0)
+
+        self.assertEqual(verify_pages_checksums(clip_data), [])
+        self.assertLess(len(clip_data), 1898017 // 4)
+
+        clip_pcm_data = decode_first_channel(clip_data)
+
+        self.assertEqual(len(clip_pcm_data), 44100)
+        self.assertTrue(np.array_equal(
+            clip_pcm_data, self._reference_data[44100:88200]))
+
+    def test_clip_to_the_end(self):
+        # Last page of 'test_1.ogg' has granule position 1285824
+        clip_pcm_data = decode_first_channel(self._cut(28.5, 100.0))
+
+        self.assertEqual(len(clip_pcm_data), 1285824 - 1256850)
+
+    def test_header_packets_are_copied(self):
+        packets_readers: List[PacketsReader] = [
+            PacketsReader(TEST_FILE_1_PATH),
+            PacketsReader(self._cut(0.0, 0.5))]
+
+        header_packets = [
+            [bytes(packet.data)
+             for _, packet in zip(range(3), packets_reader.iter_packets())]
+            for packets_reader in packets_readers]
+
+        for packets_reader in packets_readers:
+            packets_reader.close_file()
+
+        self.assertEqual(header_packets[0], header_packets[1])
+
+    def test_wrong_interval(self):
+        with self.assertRaises(ValueError):
+            self._cut(2.0, 1.0)
+
+
+if __name__ == '__main__':
+    unittest_main()
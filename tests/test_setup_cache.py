@@ -0,0 +1,225 @@
+from unittest import TestCase, main as unittest_main
+from os import (
+    pardir as os_pardir,
+    listdir as os_listdir,
+    mkdir as os_mkdir,
+    rmdir as os_rmdir,
+    utime as os_utime)
+from os.path import (
+    join as os_path_join,
+    dirname as os_path_dirname,
+    abspath as os_path_abspath,
+    getsize as os_path_getsize)
+from sys import path as sys_path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+sys_path.append(os_path_join(
+    os_path_dirname(os_path_abspath(__file__)),
+    os_pardir))
+
+from vorbis.decoders import SetupHeaderDecoder
+from vorbis.setup_cache import SetupHeaderCache
+from vorbis.vorbis_main import PacketsProcessor
+from .test_ogg import TEST_FILE_1_PATH, TEST_FILE_4_PATH
+
+
+def process_headers(
+        path: str, setup_cache: SetupHeaderCache) -> PacketsProcessor:
+    """Returns processor of file on [path] with processed headers"""
+    packets_processor = PacketsProcessor(path, setup_cache=setup_cache)
+    packets_processor.process_headers(headers_only=True)
+
+    return packets_processor
+
+
+class SetupHeaderCacheTest(TestCase):
+    def test_in_process_cache(self):
+        SetupHeaderDecoder.clear_codebooks_cache()
+        setup_cache = SetupHeaderCache()
+
+        first_processor = process_headers(TEST_FILE_1_PATH, setup_cache)
+        first_processor.close_file()
+        second_processor = process_headers(TEST_FILE_1_PATH, setup_cache)
+
+        self.assertEqual((setup_cache.hits, setup_cache.misses), (1, 1))
+        self.assertIs(
+            second_processor.logical_stream.vorbis_codebook_configurations,
+            first_processor.logical_stream.vorbis_codebook_configurations)
+
+        # Cached codebooks have built decode tables and VQ lookup tables
+        self.assertTrue(all(
+            codebook._decode_tables is not None
+            and (codebook.codebook_lookup_type == 0
+                 or codebook._VQ_lookup_table is not None)
+            for codebook in (
+                second_processor.logical_stream
+                .vorbis_codebook_configurations)))
+
+        uncached_processor = process_headers(TEST_FILE_1_PATH, None)
+        packets_pcm_data = []
+
+        for packets_processor in (second_processor, uncached_processor):
+            audio_data = packets_processor.get_audio_data()
+            packets_pcm_data.append([next(audio_data) for _ in range(8)])
+            packets_processor.close_file()
+
+        for cached_pcm_data, pcm_data in zip(*packets_pcm_data):
+            self.assertTrue(np.array_equal(cached_pcm_data, pcm_data))
+
+    def test_directory_store(self):
+        with TemporaryDirectory() as cache_directory:
+            setup_cache = SetupHeaderCache(cache_directory)
+            process_headers(TEST_FILE_1_PATH, setup_cache).close_file()
+
+            self.assertEqual(len(os_listdir(cache_directory)), 1)
+
+            # New cache reads setup header from directory
+            setup_cache = SetupHeaderCache(cache_directory)
+            packets_processor = process_headers(
+                TEST_FILE_1_PATH, setup_cache)
+            packets_processor.close_file()
+
+            self.assertEqual((setup_cache.hits, setup_cache.misses), (1, 0))
+            self.assertEqual(
+                len(packets_processor.logical_stream
+                    .vorbis_codebook_configurations),
+                44)
+
+            # Codebooks from directory have built tables
+            for codebook in (packets_processor.logical_stream
+                             .vorbis_codebook_configurations):
+                self.assertIsNotNone(codebook._decode_tables)
+
+                if codebook.codebook_lookup_type != 0:
+                    self.assertIsNotNone(codebook._VQ_lookup_table)
+
+    def test_files_eviction(self):
+        packets_processor = process_headers(TEST_FILE_1_PATH, None)
+        packets_processor.close_file()
+        setup_fields = {
+            field_name: getattr(packets_processor.logical_stream, field_name)
+            for field_name in PacketsProcessor._SETUP_HEADER_FIELDS}
+
+        with TemporaryDirectory() as cache_directory:
+            setup_cache = SetupHeaderCache(cache_directory)
+
+            setup_cache.put('old', setup_fields)
+            old_file_path = os_path_join(
+                cache_directory, os_listdir(cache_directory)[0])
+            os_utime(old_file_path, (0, 0))
+
+            # Directory has room for one file only
+            setup_cache.max_directory_size = (
+                os_path_getsize(old_file_path) * 3 // 2)
+            setup_cache.put('new', setup_fields)
+
+            self.assertEqual(os_listdir(cache_directory), ['new.setup'])
+
+            # In-process layer keeps both setup headers
+            self.assertIsNotNone(setup_cache.get('old'))
+
+            setup_cache.clear()
+
+            self.assertEqual(os_listdir(cache_directory), [])
+            self.assertIsNone(setup_cache.get('new'))
+
+    def test_directory_store_decoding(self):
+        with TemporaryDirectory() as cache_directory:
+            process_headers(
+                TEST_FILE_1_PATH,
+                SetupHeaderCache(cache_directory)).close_file()
+
+            cached_processor = process_headers(
+                TEST_FILE_1_PATH, SetupHeaderCache(cache_directory))
+
+        uncached_processor = process_headers(TEST_FILE_1_PATH, None)
+
+        for field_name in ('vorbis_floor_types', 'vorbis_residue_types'):
+            self.assertEqual(
+                getattr(cached_processor.logical_stream, field_name),
+                getattr(uncached_processor.logical_stream, field_name))
+
+        packets_pcm_data = []
+
+        for packets_processor in (cached_processor, uncached_processor):
+            audio_data = packets_processor.get_audio_data()
+            packets_pcm_data.append([next(audio_data) for _ in range(8)])
+            packets_processor.close_file()
+
+        for cached_pcm_data, pcm_data in zip(*packets_pcm_data):
+            self.assertTrue(np.array_equal(cached_pcm_data, pcm_data))
+
+    def test_same_setup_header_is_shared(self):
+        # 'test_1.ogg' and 'test_4.ogg' are encoded with the same setup
+        # header
+        with TemporaryDirectory() as cache_directory:
+            setup_cache = SetupHeaderCache(cache_directory)
+
+            process_headers(TEST_FILE_1_PATH, setup_cache).close_file()
+            process_headers(TEST_FILE_4_PATH, setup_cache).close_file()
+
+            self.assertEqual((setup_cache.hits, setup_cache.misses), (1, 1))
+            self.assertEqual(len(os_listdir(cache_directory)), 1)
+
+    def test_damaged_file_is_ignored(self):
+        with TemporaryDirectory() as cache_directory:
+            process_headers(
+                TEST_FILE_1_PATH,
+                SetupHeaderCache(cache_directory)).close_file()
+
+            cache_file_path = os_path_join(
+                cache_directory, os_listdir(cache_directory)[0])
+            with open(cache_file_path, 'r+b') as cache_file:
+                cache_file.write(b'OVSH\xff\xff')
+
+            setup_cache = SetupHeaderCache(cache_directory)
+            packets_processor = process_headers(
+                TEST_FILE_1_PATH, setup_cache)
+            packets_processor.close_file()
+
+            self.assertEqual((setup_cache.hits, setup_cache.misses), (0, 1))
+            self.assertEqual(
+                packets_processor.logical_stream.vorbis_floor_types,
+                [1, 1])
+
+    def test_unwritable_directory(self):
+        packets_processor = process_headers(TEST_FILE_1_PATH, None)
+        packets_processor.close_file()
+        setup_fields = {
+            field_name: getattr(packets_processor.logical_stream, field_name)
+            for field_name in PacketsProcessor._SETUP_HEADER_FIELDS}
+
+        with TemporaryDirectory() as temporary_directory:
+            # Stored file can not replace directory with its name
+            setup_cache = SetupHeaderCache(temporary_directory)
+            os_mkdir(os_path_join(temporary_directory, 'key.setup'))
+            setup_cache.put('key', setup_fields)
+
+            self.assertEqual(os_listdir(temporary_directory), ['key.setup'])
+            self.assertIsNotNone(setup_cache.get('key'))
+
+            # Directory of store is replaced by file
+            cache_directory = os_path_join(temporary_directory, 'store')
+            setup_cache = SetupHeaderCache(cache_directory)
+            os_rmdir(cache_directory)
+            open(cache_directory, 'wb').close()
+
+            packets_processor = process_headers(
+                TEST_FILE_1_PATH, setup_cache)
+            packets_processor.close_file()
+
+            self.assertEqual((setup_cache.hits, setup_cache.misses), (0, 1))
+            self.assertEqual(
+                packets_processor.logical_stream.vorbis_floor_types,
+                [1, 1])
+
+    def test_key_depends_on_channels(self):
+        self.assertNotEqual(
+            SetupHeaderCache.make_key(b'\x05vorbis', 1),
+            SetupHeaderCache.make_key(b'\x05vorbis', 2))
+
+
+if __name__ == '__main__':
+    unittest_main()
@@ -8,12 +8,23 @@ from os.path import (
 from sys import path as sys_path
 from urllib.request import urlopen
 from shutil import copyfileobj as shutil_copyfileobj
+from io import BytesIO
+import asyncio
+
+import numpy as np
 
 sys_path.append(os_path_join(
     os_path_dirname(os_path_abspath(__file__)),
     os_pardir))
 
+from vorbis import ProgramException
 from vorbis.vorbis_main import PacketsProcessor, CorruptedFileDataError
+from vorbis.ogg import AsyncPacketsReader
+from .test_ogg import (
+    make_multiplexed_data,
+    read_pages,
+    ChunkedAsyncStream,
+    TEST_FILE_4_PATH)
 
 
 TEST_FILE_1_PATH = os_path_join(
@@ -136,6 +147,353 @@ class PacketsProcessorTests(TestCase):
 
         packets_processor.close_file()
 
+    def test_process_headers_with_mmap(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH, use_mmap=True)
+
+        packets_processor.process_headers()
+
+        self.assertEqual(
+            len(packets_processor.logical_stream
+                .vorbis_codebook_configurations),
+            44)
+
+        packets_processor.close_file()
+
+    def test_process_headers_from_memory(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            file_data = test_file.read()
+
+        for source, use_mmap in (
+                (file_data, False),
+                (bytearray(file_data), False),
+                (memoryview(file_data), True),
+                (BytesIO(file_data), False)):
+            packets_processor = PacketsProcessor(source, use_mmap=use_mmap)
+            packets_processor.process_headers()
+
+            self.assertEqual(
+                packets_processor.logical_stream.audio_sample_rate, 44100)
+            self.assertEqual(
+                len(packets_processor.logical_stream
+                    .vorbis_codebook_configurations),
+                44)
+
+            packets_processor.close_file()
+
+    def test_file_object_is_not_closed(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            packets_processor = PacketsProcessor(test_file)
+            packets_processor.process_headers(headers_only=True)
+            packets_processor.close_file()
+
+            self.assertFalse(test_file.closed)
+
+    def test_not_ogg_data_in_memory(self):
+        with self.assertRaises(CorruptedFileDataError) as occurred_err:
+            PacketsProcessor(b'Not an ogg data')
+
+        self.assertEqual(
+            occurred_err.exception.args[0],
+            'File not an ogg container: <in-memory data>')
+
+    def test_process_headers_only(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
+
+        packets_processor.process_headers(headers_only=True)
+
+        # First audio page of 'test_1.ogg' begins on 122659 byte
+        self.assertEqual(
+            packets_processor._data_reader._packets_reader.opened_file.tell(),
+            122659)
+
+        # Headers are read without indexing pages of the whole file
+        self.assertIsNone(
+            packets_processor._data_reader._packets_reader._page_index)
+
+        packets_processor.close_file()
+
+    def test_seek_to_time(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
+        packets_processor.process_headers()
+
+        # 100000 / 44100 seconds. Page 33 is the last page with granule
+        # position not greater than 100000
+        packets_processor.seek_to_time(100000 / 44100)
+
+        self.assertEqual(
+            packets_processor._data_reader.get_next_packet_global_position(),
+            246630)
+
+        packets_processor.close_file()
+
+    def test_total_samples_and_duration(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
+        packets_processor.process_headers()
+
+        self.assertEqual(packets_processor.total_samples(), 1285824)
+        self.assertAlmostEqual(
+            packets_processor.duration(), 1285824 / 44100)
+
+        packets_processor.close_file()
+
+    def test_get_audio_data(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
+        packets_processor.process_headers()
+
+        pcm_data = [[], []]
+        for packet_pcm_data in packets_processor.get_audio_data():
+            for channel_data, packet_channel_data in zip(
+                    pcm_data, packet_pcm_data):
+                channel_data.extend(packet_channel_data)
+
+            if len(pcm_data[0]) > 65000:
+                break
+
+        packets_processor.close_file()
+
+        # Reference values are decoded from 'test_1.ogg' by libvorbis
+        for sample_number, reference_values in [
+                (1000, [0.07611233741044998, 0.04810153692960739]),
+                (12345, [0.08246935904026031, 0.040549419820308685]),
+                (30000, [-0.0911821499466896, 0.049056362360715866]),
+                (65000, [0.014166046865284443, 0.009173857048153877])]:
+            for channel_data, reference_value in zip(
+                    pcm_data, reference_values):
+                self.assertAlmostEqual(
+                    channel_data[sample_number], reference_value, places=6)
+
+    def test_get_audio_data_after_seek(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
+        packets_processor.process_headers()
+
+        # Last page of 'test_1.ogg' has granule position 1285824
+        packets_processor.seek_to_sample(1280000)
+
+        samples_amount = sum(
+            len(packet_pcm_data[0])
+            for packet_pcm_data in packets_processor.get_audio_data())
+
+        packets_processor.close_file()
+
+        self.assertEqual(samples_amount, 1285824 - 1280000)
+
+    def test_seek_is_sample_exact(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
+        packets_processor.process_headers()
+
+        audio_data = np.concatenate([
+            packet_pcm_data[0]
+            for packet_pcm_data in packets_processor.get_audio_data()])
+
+        for sample_number in (0, 1000, 100000, 500000, 1000000):
+            packets_processor.seek_to_sample(sample_number)
+            packets_data = packets_processor.get_audio_data()
+            seek_data = np.concatenate([
+                next(packets_data)[0] for _ in range(3)])
+
+            self.assertTrue(np.array_equal(
+                seek_data,
+                audio_data[sample_number:sample_number + len(seek_data)]))
+
+        packets_processor.close_file()
+
+    def test_multiplexed_stream(self):
+        packets_processor = PacketsProcessor(
+            make_multiplexed_data(TEST_FILE_1_PATH, TEST_FILE_4_PATH),
+            crc_check='strict')
+        packets_processor.process_headers()
+
+        self.assertEqual(
+            packets_processor.logical_stream.stream_serial_number, 1)
+        self.assertEqual(packets_processor.logical_stream.audio_channels, 2)
+
+        # Reference value is decoded from 'test_1.ogg' by libvorbis
+        pcm_data = []
+        for packet_pcm_data in packets_processor.get_audio_data():
+            pcm_data.extend(packet_pcm_data[0])
+
+            if len(pcm_data) > 1000:
+                break
+
+        self.assertAlmostEqual(pcm_data[1000], 0.07611233741044998, places=6)
+
+        packets_processor.close_file()
+
+    def test_chained_stream_links(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            first_link_data = test_file.read()
+        with open(TEST_FILE_4_PATH, 'rb') as test_file:
+            second_link_data = test_file.read()
+
+        packets_processor = PacketsProcessor(
+            first_link_data + second_link_data)
+        packets_processor.process_headers()
+
+        links = packets_processor.links
+
+        self.assertEqual(len(links), 2)
+        self.assertEqual(links[0].byte_range, (0, len(first_link_data)))
+        self.assertEqual(links[1].granule_range, (0, 2460800))
+        self.assertIs(
+            links[0].logical_stream, packets_processor.logical_stream)
+
+        # Headers of the second link are not processed until access
+        self.assertIsNone(links[1]._logical_stream)
+
+        reading_position = (
+            packets_processor._data_reader.get_next_packet_global_position())
+
+        self.assertEqual(links[1].logical_stream.byte_position, 1898045)
+        self.assertEqual(links[1].logical_stream.audio_channels, 2)
+
+        self.assertEqual(
+            packets_processor._data_reader.get_next_packet_global_position(),
+            reading_position)
+        self.assertIs(
+            links[0].logical_stream, packets_processor.logical_stream)
+
+        packets_processor.close_file()
+
+    def test_chained_stream_audio_data(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            first_link_data = test_file.read()
+        with open(TEST_FILE_4_PATH, 'rb') as test_file:
+            second_link_data = test_file.read()
+
+        packets_processor = PacketsProcessor(
+            first_link_data + second_link_data)
+        packets_processor.process_headers()
+
+        # Decoding of the first link stops on its last page
+        packets_processor.seek_to_sample(1280000)
+        first_link_samples = sum(
+            len(packet_pcm_data[0])
+            for packet_pcm_data in packets_processor.get_audio_data())
+
+        self.assertEqual(first_link_samples, 1285824 - 1280000)
+
+        # Links are found by seeking
+        self.assertEqual(packets_processor.total_samples(), 1285824)
+
+        packets_processor.select_link(1)
+
+        self.assertIs(
+            packets_processor.logical_stream,
+            packets_processor.links[1].logical_stream)
+
+        # Seeking is bounded by the second link, its last granule position
+        # is 2460800
+        packets_processor.seek_to_sample(2455000)
+        second_link_samples = sum(
+            len(packet_pcm_data[0])
+            for packet_pcm_data in packets_processor.get_audio_data())
+
+        self.assertEqual(second_link_samples, 2460800 - 2455000)
+        self.assertEqual(packets_processor.total_samples(), 2460800)
+
+        packets_processor.close_file()
+
+    def test_tolerant_reading(self):
+        pages = read_pages(TEST_FILE_1_PATH)
+
+        # Page 10 is damaged and page 20 is lost
+        damaged_pages = list(pages)
+        damaged_pages[10] = pages[10][:2000] + bytes(100) + pages[10][2100:]
+        del damaged_pages[20]
+
+        packets_processor = PacketsProcessor(
+            b''.join(damaged_pages), tolerant=True)
+        packets_processor.process_headers()
+
+        samples_amount = 0
+        for packet_pcm_data in packets_processor.get_audio_data():
+            samples_amount += len(packet_pcm_data[0])
+
+            if samples_amount > 100000:
+                break
+
+        packets_processor.close_file()
+
+        self.assertGreater(samples_amount, 100000)
+        self.assertEqual(packets_processor.recovery_report.lost_pages, 2)
+
+    def test_process_headers_async(self):
+        with open(TEST_FILE_1_PATH, 'rb') as test_file:
+            file_data = test_file.read()
+
+        sources = [
+            file_data,
+            make_multiplexed_data(TEST_FILE_1_PATH, TEST_FILE_4_PATH)]
+
+        async def process_headers(source: bytes) -> PacketsProcessor:
+            packets_processor = PacketsProcessor(
+                AsyncPacketsReader(ChunkedAsyncStream(source, 4096)))
+            await packets_processor.process_headers_async()
+
+            return packets_processor
+
+        async def process_all_headers() -> list:
+            return await asyncio.gather(
+                *[process_headers(source) for source in sources])
+
+        packets_processors = asyncio.run(process_all_headers())
+
+        sync_processor = PacketsProcessor(TEST_FILE_1_PATH)
+        sync_processor.process_headers(headers_only=True)
+        sync_processor.close_file()
+
+        # The first page of multiplexed data is a page of other stream
+        for packets_processor, byte_offset in zip(
+                packets_processors, (0, 58)):
+            logical_stream = packets_processor.logical_stream
+
+            self.assertEqual(
+                logical_stream.byte_position,
+                sync_processor.logical_stream.byte_position + byte_offset)
+            self.assertEqual(logical_stream.stream_serial_number, 1)
+            self.assertEqual(logical_stream.audio_sample_rate, 44100)
+            self.assertEqual(
+                len(logical_stream.vorbis_codebook_configurations), 44)
+            self.assertEqual(
+                logical_stream.user_comment_list_strings,
+                sync_processor.logical_stream.user_comment_list_strings)
+
+        self.assertEqual(
+            packets_processors[0].logical_stream.audio_byte_position,
+            sync_processor.logical_stream.audio_byte_position)
+
+        with self.assertRaises(ProgramException):
+            next(packets_processors[0].get_audio_data())
+
+        packets_processors[0].close_file()
+
+    def test_user_comments(self):
+        packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
+        packets_processor.process_headers(headers_only=True)
+        packets_processor.close_file()
+
+        logical_stream = packets_processor.logical_stream
+        user_comments = logical_stream.user_comment_list_strings
+
+        self.assertFalse(logical_stream.comment_header_decoding_failed)
+        self.assertEqual(len(user_comments), 12)
+        self.assertEqual(user_comments[4], 'DATE=2015')
+        self.assertEqual(user_comments[9:10], [
+            'COMPOSER=Marcin Przybyłowicz, Percival Schuttenbach'])
+        self.assertEqual(user_comments.get_field('date'), ['2015'])
+        self.assertEqual(user_comments.get_field('Genre'), ['Soundtrack'])
+        self.assertEqual(user_comments.get_field('LYRICS'), [])
+        self.assertTrue(
+            user_comments.get_raw_field('COVERART')[0].startswith(b'/9j/'))
+
+        broken_comments = PacketsProcessor.UserComments(
+            [b'TITLE=\xff', b'no separator'])
+
+        self.assertEqual(
+            list(broken_comments),
+            ['[Unicode decoding failed]', 'no separator'])
+        self.assertEqual(broken_comments.get_raw_field('title'), [b'\xff'])
+
     def test_ident_header_processing(self):
         packets_processor = PacketsProcessor(TEST_FILE_1_PATH)
 
@@ -10,18 +10,16 @@ from tkinter import (
     Label as tk_Label)
 from contextlib import redirect_stdout as clib_redirect_stdout
 from argparse import ArgumentParser, Namespace
-from pydub import AudioSegment
 from typing import List, Tuple
 
 
 from .console_ui import (
     get_current_version, init_packets_processor, exit_with_exception)
-from vorbis.vorbis_main import FileDataException
+from vorbis.vorbis_main import FileDataException, PacketsProcessor
 
 with clib_redirect_stdout(None):
     from pygame.mixer import (
         music as pygame_music,
-        Sound as pygame_Sound,
         pre_init as pygame_mixer_pre_init,
         init as pygame_mixer_init)
 
@@ -118,9 +116,11 @@ with clib_redirect_stdout(None):
 
 class AudioToolbarFrame(tk_Frame):
     """Class represents audio toolbar frame"""
-    def __init__(self, filepath, **kwargs):
+    def __init__(self, filepath, track_length: float, **kwargs):
+        """[track_length] is duration of track in seconds"""
         super().__init__(**kwargs)
         self._filepath = filepath
+        self._track_length = track_length
         self._paused = False
         self._time_offset = 0.0
 
@@ -160,8 +160,7 @@ class AudioToolbarFrame(tk_Frame):
         if pygame_music.get_pos() == -1:
             pygame_music.load(self._filepath)
 
-            current_track = pygame_Sound(self._filepath)
-            self._time_scale['to'] = current_track.get_length()
+            self._time_scale['to'] = self._track_length
             self._play_button['text'] = 'Stop'
 
             pygame_music.play()
@@ -193,9 +192,7 @@ class AudioToolbarFrame(tk_Frame):
             showvalue=0,
             command=self._time_scale_moved)
 
-        current_track = pygame_Sound(self._filepath)
-
-        self._time_scale['to'] = current_track.get_length()
+        self._time_scale['to'] = self._track_length
 
         self._time_label_var = tk_StringVar()
 
@@ -277,7 +274,8 @@ def run_graphics_launcher():
     arguments: Namespace = _parse_arguments()
 
     # For better errors handling
-    init_packets_processor(arguments.filepath, arguments)
+    packets_processor: PacketsProcessor = init_packets_processor(
+        arguments.filepath, arguments)
 
     # Init music player
     pygame_mixer_pre_init(44100, -16, 2, 2048)
@@ -325,7 +323,8 @@ def run_graphics_launcher():
     toolbar_frame = AudioToolbarFrame(
         master=root,
         background='blue',
-        filepath=arguments.filepath)
+        filepath=arguments.filepath,
+        track_length=packets_processor.duration())
 
     toolbar_frame.time_scale_tick(root)
 
@@ -336,34 +335,45 @@ def run_graphics_launcher():
 
     amplitude_canvas.grid(row=0, column=0)
 
-    ogg_audio: AudioSegment = AudioSegment.from_ogg(arguments.filepath)
+    audio_channels: int = packets_processor.logical_stream.audio_channels
 
-    if ogg_audio.channels > 2:
+    if audio_channels > 2:
         exit_with_exception(
             "Amount of channels more than 2",
             FileDataException(
-                f"[ogg_audio.channels] > 2: {ogg_audio.channels}"),
+                f"[audio_channels] > 2: {audio_channels}"),
             arguments.debug)
 
-    def get_amplitudes_per_channel(audio: AudioSegment) -> List[List[int]]:
-        result_amplitude: List[List[int]] = [[] for _ in range(audio.channels)]
-        bytes_in_frame: int = audio.channels * audio.sample_width
+    # Amplitudes are drawn as unsigned 16-bit PCM
+    pcm_max: int = 2**16
 
-        for frame_shift in range(len(audio.raw_data) // bytes_in_frame):
-            for channel in range(audio.channels):
-                sample_start: int = (
-                    frame_shift * bytes_in_frame
-                    + channel * audio.sample_width)
-                sample_end: int = sample_start + audio.sample_width
+    def get_amplitudes_per_channel(
+            start_ms: int, length_ms: int) -> List[List[int]]:
+        """Decodes [length_ms] of audio from [start_ms]
 
-                sample_bytes: bytes = audio.raw_data[sample_start:sample_end]
+        Returned audio begins exactly on sample of [start_ms] because
+        seeking drops decoded samples before it"""
+        sample_rate: int = packets_processor.logical_stream.audio_sample_rate
+        samples_amount: int = length_ms * sample_rate // 1000
+        result_amplitude: List[List[int]] = [
+            [] for _ in range(audio_channels)]
 
-                result_amplitude[channel].append(
-                    int.from_bytes(sample_bytes, byteorder='big'))
+        # Sample number is computed in integers, so it is not shifted by
+        # rounding of seconds
+        packets_processor.seek_to_sample(start_ms * sample_rate // 1000)
 
-        return result_amplitude
+        for packet_pcm_data in packets_processor.get_audio_data():
+            for channel_amplitude, channel_data in zip(
+                    result_amplitude, packet_pcm_data):
+                channel_amplitude.extend(
+                    int((min(max(sample, -1.0), 1.0) + 1) * (pcm_max - 1) / 2)
+                    for sample in channel_data[
+                        :samples_amount - len(channel_amplitude)])
 
-    pcm_max: int = 2**(ogg_audio.sample_width * 8)
+            if len(result_amplitude[0]) >= samples_amount:
+                break
+
+        return result_amplitude
 
     def draw_plot(amplitude: List[int], axes_zero_coord: Tuple[int, int]):
         if len(amplitude) == 0:
@@ -397,8 +407,7 @@ def run_graphics_launcher():
             // ms_in_block * ms_in_block)
 
         amplitudes: List[List[int]] = (
-            get_amplitudes_per_channel(
-                ogg_audio[current_ms_block:current_ms_block + ms_in_block]))
+            get_amplitudes_per_channel(current_ms_block, ms_in_block))
 
         # Thick line-separator in the center
         amplitude_canvas.create_line(0, 300, 1200, 300, fill='black', width=3)
@@ -420,7 +429,7 @@ def run_graphics_launcher():
 
         draw_plot(amplitudes[0], (50, 300 - 50))
 
-        if ogg_audio.channels == 2:
+        if audio_channels == 2:
             # Bottom axis X
             amplitude_canvas.create_line(0 + 50, 600 - 50, 1200 - 50, 600 - 50)
             # Bottom axis Y
@@ -431,7 +440,7 @@ def run_graphics_launcher():
             amplitude_canvas.create_text(
                 0 + 50 - 25,
                 300 + 50,
-                text=str(2 ** (ogg_audio.sample_width * 8)))
+                text=str(pcm_max))
             # Bottom X axis legend ([ms_in_block] ms in audio segment)
             amplitude_canvas.create_text(
                 1200 - 50, 600 - 50 + 10, text=f'{ms_in_block}, ms')
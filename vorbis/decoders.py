@@ -1,7 +1,28 @@
-from typing import Optional, Callable, List, Tuple
-
-from .ogg import PacketsReader, CorruptedFileDataError, FileDataException
-from .helper_funcs import float32_unpack, ilog, bit_reverse, lookup1_values
+from typing import Optional, Callable, List, Tuple, Union, Dict, Deque
+from collections import deque, OrderedDict
+from hashlib import blake2b
+from threading import Lock
+
+import numpy as np
+
+from .ogg import (
+    ChainLink,
+    RecoveryReport,
+    PacketsReader,
+    MmapPacketsReader,
+    OggSource,
+    CorruptedFileDataError,
+    FileDataException)
+from .helper_funcs import (
+    float32_unpack,
+    ilog,
+    bit_reverse,
+    lookup1_values,
+    low_neighbor,
+    high_neighbor,
+    render_point,
+    render_line)
+from .mdct import imdct
 
 
 class EndOfPacketException(FileDataException):
@@ -24,6 +45,7 @@ class AbstractDecoder:
     _read_bit: Callable[[], int]
     _read_bytes: Callable[[int], bytes]
     _read_bits_for_int: Callable[[int, bool], int]
+    _read_bits_many: Callable[[int, int], List[int]]
 
     _get_current_global_position: Callable[[], Tuple[int, int]]
 
@@ -31,6 +53,7 @@ class AbstractDecoder:
         self._read_bit = data_reader.read_bit
         self._read_bytes = data_reader.read_bytes
         self._read_bits_for_int = data_reader.read_bits_for_int
+        self._read_bits_many = data_reader.read_bits_many
 
         self._get_current_global_position = (
             data_reader.get_current_global_position)
@@ -38,13 +61,366 @@ class AbstractDecoder:
 
 class SetupHeaderDecoder(AbstractDecoder):
     class CodebookData:
-        codebook_codewords: List[str]
-        VQ_lookup_table: List[List[float]]
+        """Codebook values read from setup header
+
+        Codewords, decode tables and VQ lookup table are decoded from read
+        values on the first use, so codebooks that are not used for audio
+        decoding are cheap"""
         codebook_lookup_type: int
         codebook_dimensions: int
         codebook_entries: int
 
+        # None if entry is unused
+        codebook_codewords_lengths: List[Optional[int]]
+
+        # Values below are used if codebook lookup type is not 0
+        codebook_minimum_value: float
+        codebook_delta_value: float
+        codebook_sequence_p: bool
+        codebook_lookup_values: int
+        codebook_multiplicands: List[int]
+
+        # Decoded [codebook_codewords]. None if they are not decoded yet
+        _codebook_codewords: Optional[List[str]] = None
+
+        # Decoded [VQ_lookup_table]. None if it is not decoded yet
+        _VQ_lookup_table: Optional[np.ndarray] = None
+
+        # Max amount of bits looked up in one decode table
+        DECODE_TABLE_BITS: int = 8
+
+        # Decode tables for Huffman decoding. Table 0 is the main table,
+        # others are subtables for long codewords. Every table is
+        # (<table bits>, <table>). Table item is one of:
+        # * (<entry> << 6) | <codeword bits in this table> for found entry
+        # * -<subtable number> if codeword is longer than table bits
+        # * None if there is no codeword with such bits
+        _decode_tables: Optional[List[Tuple[int, List[Optional[int]]]]] = (
+            None)
+
+        @property
+        def codebook_codewords(self) -> List[str]:
+            """Codewords of entries. Codeword of unused entry is empty"""
+            if self._codebook_codewords is None:
+                self._codebook_codewords = self._huffman_decode()
+
+            return self._codebook_codewords
+
+        @codebook_codewords.setter
+        def codebook_codewords(self, codewords: List[str]):
+            self._codebook_codewords = codewords
+            self._decode_tables = None
+
+        @property
+        def VQ_lookup_table(self) -> np.ndarray:
+            """Contiguous float32 array of shape (<entries>, <dimensions>)
+
+            Has no rows if codebook lookup type is 0. Built on the first
+            access"""
+            self.build_vq_lookup_table()
+
+            return self._VQ_lookup_table
+
+        @VQ_lookup_table.setter
+        def VQ_lookup_table(self, VQ_lookup_table: np.ndarray):
+            self._VQ_lookup_table = VQ_lookup_table
+
+        def decode_scalar(self, data_reader: 'DataReader') -> int:
+            """Method decodes entry number from [data_reader]
+
+            Next bits of packet are looked up in decode tables, so one
+            Huffman symbol costs one table lookup for short codewords"""
+            self.build_decode_tables()
+
+            table_bits, table = self._decode_tables[0]
+
+            while True:
+                table_item = table[data_reader.peek_bits(table_bits)]
+
+                if table_item is None:
+                    # Bits after end of packet are zeros, so end of packet
+                    # can look like wrong codeword
+                    data_reader.skip_bits(table_bits)
+
+                    raise CorruptedFileDataError(
+                        'Huffman codeword is not found in codebook')
+
+                if table_item >= 0:
+                    data_reader.skip_bits(table_item & 63)
+
+                    return table_item >> 6
+
+                data_reader.skip_bits(table_bits)
+                table_bits, table = self._decode_tables[-table_item]
+
+        def decode_vector(self, data_reader: 'DataReader') -> np.ndarray:
+            """Method decodes VQ vector from [data_reader]"""
+            self.check_vq_lookup_table()
+
+            return self.VQ_lookup_table[self.decode_scalar(data_reader)]
+
+        def check_vq_lookup_table(self):
+            """Method checks that VQ vectors can be read from codebook"""
+            if self.codebook_lookup_type == 0:
+                raise CorruptedFileDataError(
+                    'VQ vector is read from codebook with lookup type 0')
+
+        def build_vq_lookup_table(self):
+            """Method builds VQ lookup table if it is not built yet
+
+            Table is built on the first access otherwise"""
+            if self._VQ_lookup_table is None:
+                if self.codebook_lookup_type == 0:
+                    self._VQ_lookup_table = np.empty(
+                        (0, self.codebook_dimensions), dtype=np.float32)
+                else:
+                    self._VQ_lookup_table = self._vq_lookup_table_unpack()
+
+        def build_decode_tables(self):
+            """Method builds decode tables if they are not built yet
+
+            Tables are built on the first decoding otherwise"""
+            if self._decode_tables is None:
+                self._decode_tables = self._build_decode_tables()
+
+        @property
+        def decode_tables(self) -> List[Tuple[int, List[Optional[int]]]]:
+            """Decode tables for Huffman decoding. Built on the first
+            access"""
+            self.build_decode_tables()
+
+            return self._decode_tables
+
+        @decode_tables.setter
+        def decode_tables(
+                self, decode_tables: List[Tuple[int, List[Optional[int]]]]):
+            self._decode_tables = decode_tables
+
+        def _build_decode_tables(
+                self) -> List[Tuple[int, List[Optional[int]]]]:
+            """Method builds decode tables from codewords"""
+            codes: List[Tuple[int, int, int]] = [
+                (int(codeword[::-1], 2), len(codeword), entry)
+                for entry, codeword in enumerate(self.codebook_codewords)
+                if codeword != '']
+
+            if len(codes) == 0:
+                raise CorruptedFileDataError('Codebook has no used entries')
+
+            decode_tables: List[Tuple[int, List[Optional[int]]]] = []
+
+            # From docs: "reading a value out of such a codebook always
+            # returns the single used value and sinks zero bits"
+            if len(codes) == 1:
+                decode_tables.append((0, [codes[0][2] << 6]))
+            else:
+                self._add_decode_table(decode_tables, codes)
+
+            return decode_tables
+
+        def _add_decode_table(
+                self,
+                decode_tables: List[Tuple[int, List[Optional[int]]]],
+                codes: List[Tuple[int, int, int]]) -> int:
+            """Method adds decode table for [codes] into [decode_tables]
+
+            [codes] items are (<codeword bits in reading order from lowest
+            bit>, <codeword length>, <entry>). Returns number of added
+            table"""
+            table_bits = min(
+                self.DECODE_TABLE_BITS, max(code[1] for code in codes))
+            table: List[Optional[int]] = [None] * (1 << table_bits)
+            table_number = len(decode_tables)
+            decode_tables.append((table_bits, table))
+
+            long_codes: Dict[int, List[Tuple[int, int, int]]] = {}
+
+            for key, length, entry in codes:
+                if length <= table_bits:
+                    for high_bits in range(1 << (table_bits - length)):
+                        table[key | (high_bits << length)] = (
+                            (entry << 6) | length)
+                else:
+                    long_codes.setdefault(
+                        key & ((1 << table_bits) - 1), []).append(
+                        (key >> table_bits, length - table_bits, entry))
+
+            for prefix, prefix_codes in long_codes.items():
+                table[prefix] = -self._add_decode_table(
+                    decode_tables, prefix_codes)
+
+            return table_number
+
+        def _huffman_decode(self) -> List[str]:
+            """Decodes Huffman tree with int codewords representation method"""
+            result_codewords: List[str] = []
+
+            for start_entry in range(self.codebook_entries):
+                if self.codebook_codewords_lengths[start_entry] is not None:
+                    break
+                result_codewords.append('')
+            else:
+                return result_codewords
+
+            result_codewords.append(
+                ''.zfill(self.codebook_codewords_lengths[start_entry]))
+
+            available: List[int] = [0] * 32
+            for i in range(1,
+                           self.codebook_codewords_lengths[start_entry] + 1):
+                available[i] = 1 << (32 - i)
+
+            for i in range(start_entry + 1, self.codebook_entries):
+                max_available_branch = self.codebook_codewords_lengths[i]
+
+                if max_available_branch is None:
+                    result_codewords.append('')
+                    continue
+
+                while (max_available_branch > 0
+                       and available[max_available_branch] == 0):
+                    max_available_branch -= 1
+
+                assert 0 < max_available_branch < 32
+
+                result = available[max_available_branch]
+                available[max_available_branch] = 0
+
+                codeword: str = bin(bit_reverse(result))[2:]
+                codeword = (
+                    ''.zfill(
+                        self.codebook_codewords_lengths[i] - len(
+                            codeword))
+                    + codeword)
+                result_codewords.append(codeword[::-1])
+
+                if max_available_branch != self.codebook_codewords_lengths[i]:
+                    for new_branch in range(
+                            self.codebook_codewords_lengths[i],
+                            max_available_branch,
+                            -1):
+                        assert available[new_branch] == 0
+                        available[new_branch] = result + (
+                            1 << (32 - new_branch))
+
+            return result_codewords
+
+        def _vq_lookup_table_unpack(self) -> np.ndarray:
+            """Decodes VQ lookup table from read multiplicands
+
+            Table is computed for all entries at once. For lookup type 1
+            multiplicand offsets are digits of entry number in mixed radix
+            notation with base [codebook_lookup_values]. For lookup type 2
+            multiplicands are the table itself. If [codebook_sequence_p] is
+            True then every value is added to the previous value of its
+            vector. Values are computed in float32 like in reference
+            decoder"""
+            if self.codebook_lookup_type == 1:
+                index_divisors = np.power(
+                    self.codebook_lookup_values,
+                    np.arange(self.codebook_dimensions, dtype=np.int64))
+                multiplicand_offsets = (
+                    np.arange(self.codebook_entries, dtype=np.int64)[:, None]
+                    // index_divisors
+                    % self.codebook_lookup_values)
+
+                result_vq_table = (
+                    np.array(self.codebook_multiplicands, dtype=np.float32)[
+                        multiplicand_offsets]
+                    * np.float32(self.codebook_delta_value)
+                    + np.float32(self.codebook_minimum_value))
+
+            elif self.codebook_lookup_type == 2:
+                result_vq_table = (
+                    np.array(self.codebook_multiplicands, dtype=np.float32)
+                    .reshape(self.codebook_entries, self.codebook_dimensions)
+                    * np.float32(self.codebook_delta_value)
+                    + np.float32(self.codebook_minimum_value))
+
+            else:
+                raise CorruptedFileDataError(
+                    'Got illegal codebook lookup type: '
+                    f'{self.codebook_lookup_type}')
+
+            if self.codebook_sequence_p:
+                result_vq_table = np.cumsum(
+                    result_vq_table, axis=1, dtype=np.float32)
+
+            return np.ascontiguousarray(result_vq_table, dtype=np.float32)
+
+        def _huffman_decode_bfc(self) -> List[str]:
+            """Decodes Huffman tree with brute force method
+
+            Extremely slow code! Use for tests ONLY!"""
+            return_values: List[str] = []
+            for i in range(0, self.codebook_entries):
+                if self.codebook_codewords_lengths[i] is None:
+                    return_values.append('')
+                    continue
+
+                bfc_value: str = (
+                    ''.join(["1" for i in range(
+                        self.codebook_codewords_lengths[i])]))
+                for value in return_values:
+                    if len(value) == len(bfc_value) and \
+                            int(value, 2) < int(bfc_value, 2):
+                        bfc_value = value
+                if '0' not in bfc_value:
+                    bfc_value = ''.zfill(self.codebook_codewords_lengths[i])
+
+                while '0' in bfc_value:
+                    for value in return_values:
+                        prefix_length = min(len(value), len(bfc_value))
+                        if (prefix_length != 0
+                            and value[:prefix_length]
+                                == bfc_value[:prefix_length]):
+                            break
+                    else:
+                        break
+
+                    bfc_value = (
+                        bin(int(bfc_value, 2) + 1)[2:]
+                        .zfill(self.codebook_codewords_lengths[i]))
+
+                return_values.append(bfc_value)
+
+            self._huffman_bfc_fullness_check(return_values)
+
+            return return_values
+
+        @staticmethod
+        def _huffman_bfc_fullness_check(codewords: List[str]):
+            """Method checks if decoded Huffman tree is full
+
+            Slow code!"""
+            for codeword_1 in codewords:
+                if len(codeword_1) == 0:
+                    continue
+
+                paired_node_is_present = False
+                for codeword_2 in codewords:
+                    if len(codeword_2) == 0 or codeword_1 == codeword_2:
+                        continue
+
+                    min_len = min(len(codeword_1), len(codeword_2))
+                    if codeword_1[:min_len - 1] == codeword_2[:min_len - 1]:
+                        paired_node_is_present = True
+                        break
+                if not paired_node_is_present:
+                    raise CorruptedFileDataError(
+                        'Huffman tree is underspecified')
+
     class FloorData:
+        # Floor type 0 data
+        floor0_order: int
+        floor0_rate: int
+        floor0_bark_map_size: int
+        floor0_amplitude_bits: int
+        floor0_amplitude_offset: int
+        floor0_number_of_books: int
+        floor0_book_list: List[int]
+
+        # Floor type 1 data
         floor1_partition_class_list: List[int]
         floor1_class_dimensions: List[int]
         floor1_class_subclasses: List[int]
@@ -80,6 +456,34 @@ class SetupHeaderDecoder(AbstractDecoder):
 
     last_read_codebook_position: Tuple[int, int]
 
+    # Max estimated size of codebooks in [_codebooks_cache] in bytes
+    CODEBOOKS_CACHE_SIZE: int = 32 << 20
+
+    # Codebooks with bigger estimated size in bytes are not cached
+    CACHED_CODEBOOK_MAX_SIZE: int = 2 << 20
+
+    # Estimated size in bytes of codeword length, codeword and decode
+    # tables items of one codebook entry
+    _CODEBOOK_ENTRY_SIZE: int = 64
+
+    # Decoded codebooks shared by all decoders. Key is fingerprint of
+    # codebook bits, so the same codebook in different setup headers is
+    # decoded once. Value is (<codebook>, <estimated size in bytes>).
+    # Codebooks are not changed after decoding, so they are shared as is
+    _codebooks_cache: (
+        'OrderedDict[bytes, Tuple[SetupHeaderDecoder.CodebookData, int]]') = (
+        OrderedDict())
+
+    # Estimated size of codebooks in [_codebooks_cache] in bytes
+    _codebooks_cache_size: int = 0
+
+    # Guards [_codebooks_cache] and [_codebooks_cache_size], so setup
+    # headers can be decoded in several threads at once
+    _codebooks_cache_lock: Lock = Lock()
+
+    _get_packet_position: Callable[[], Tuple[int, int]]
+    _get_bits_since: Callable[[int, int], Tuple[int, bytes]]
+
     # Amount of scalars in every VQ table vector
     _codebook_dimensions: int
 
@@ -93,10 +497,6 @@ class SetupHeaderDecoder(AbstractDecoder):
     # Data for Huffman tree decoding
     _codebook_codewords_lengths: List[Optional[int]]
 
-    # Acquired from Huffman tree decoding
-    # List of decoded codewords
-    _codebook_codewords: List[str]
-
     # Data below for VQ lookup table unpacking
     _codebook_lookup_type: int
     _codebook_minimum_value: float
@@ -106,25 +506,80 @@ class SetupHeaderDecoder(AbstractDecoder):
     _codebook_lookup_values: int
     _codebook_multiplicands: List[int]
 
-    # Acquired from vq lookup table unpacking
-    _VQ_lookup_table: List[List[float]]
-
     def __init__(self, data_reader: 'DataReader'):
         super().__init__(data_reader)
 
+        self._get_packet_position = data_reader.get_packet_position
+        self._get_bits_since = data_reader.get_bits_since
+
+    @classmethod
+    def clear_codebooks_cache(cls):
+        """Method removes all codebooks from shared codebooks cache"""
+        with cls._codebooks_cache_lock:
+            cls._codebooks_cache.clear()
+            cls._codebooks_cache_size = 0
+
+    @classmethod
+    def _cache_codebook(
+            cls,
+            codebook_key: bytes,
+            codebook: CodebookData,
+            codebook_size: int):
+        """Method adds [codebook] into shared codebooks cache evicting the
+        least recently used codebooks while cache is too big
+
+        Returns codebook which is cached with [codebook_key]: it is codebook
+        cached by other thread meanwhile if there is such one"""
+        with cls._codebooks_cache_lock:
+            cached_codebook: Optional[
+                Tuple[SetupHeaderDecoder.CodebookData, int]] = (
+                cls._codebooks_cache.get(codebook_key))
+
+            if cached_codebook is not None:
+                cls._codebooks_cache.move_to_end(codebook_key)
+
+                return cached_codebook[0]
+
+            cls._codebooks_cache[codebook_key] = codebook, codebook_size
+            cls._codebooks_cache_size += codebook_size
+
+            while cls._codebooks_cache_size > cls.CODEBOOKS_CACHE_SIZE:
+                _, (_, evicted_size) = cls._codebooks_cache.popitem(
+                    last=False)
+                cls._codebooks_cache_size -= evicted_size
+
+        return codebook
+
+    @classmethod
+    def _cached_codebook(cls, codebook_key: bytes) -> Optional[CodebookData]:
+        """Returns codebook with [codebook_key] from shared codebooks cache
+        or None if it is not cached"""
+        with cls._codebooks_cache_lock:
+            cached_codebook: Optional[
+                Tuple[SetupHeaderDecoder.CodebookData, int]] = (
+                cls._codebooks_cache.get(codebook_key))
+
+            if cached_codebook is None:
+                return None
+
+            cls._codebooks_cache.move_to_end(codebook_key)
+
+            return cached_codebook[0]
+
     def read_codebook(self) -> CodebookData:
-        """Method reads full codebook from packet data"""
-        self.last_read_codebook_position = self._get_current_global_position()
+        """Method reads full codebook from packet data
 
-        result_data: SetupHeaderDecoder.CodebookData = self.CodebookData()
+        Codebook bits are read fully, then Huffman tree and VQ lookup table
+        are decoded only if codebook with the same bits is not in
+        [_codebooks_cache]"""
+        self.last_read_codebook_position = self._get_current_global_position()
+        codebook_start: Tuple[int, int] = self._get_packet_position()
 
         self._check_codebook_sync_pattern()
 
         self._codebook_dimensions = self._read_bits_for_int(16)
-        result_data.codebook_dimensions = self._codebook_dimensions
 
         self._codebook_entries = self._read_bits_for_int(24)
-        result_data.codebook_entries = self._codebook_entries
 
         if self._codebook_entries == 1:
             raise CorruptedFileDataError('Single codebook entry was given')
@@ -135,11 +590,52 @@ class SetupHeaderDecoder(AbstractDecoder):
 
         self._codebook_codewords_lengths = self._read_codeword_lengths()
 
-        self._codebook_codewords = self._huffman_decode()
-        result_data.codebook_codewords = list(self._codebook_codewords)
+        self._read_lookup_config()
+
+        codebook_size: int = self._codebook_size_estimate()
+        if codebook_size > self.CACHED_CODEBOOK_MAX_SIZE:
+            return self._make_codebook()
+
+        codebook_key: bytes = self._codebook_fingerprint(
+            *self._get_bits_since(*codebook_start))
+        cached_codebook: Optional[SetupHeaderDecoder.CodebookData] = (
+            self._cached_codebook(codebook_key))
+
+        if cached_codebook is not None:
+            return cached_codebook
 
+        return self._cache_codebook(
+            codebook_key, self._make_codebook(), codebook_size)
+
+    def _codebook_size_estimate(self) -> int:
+        """Returns estimated size in bytes of read codebook with built
+        tables
+
+        Size is [_CODEBOOK_ENTRY_SIZE] per entry plus float32 VQ lookup
+        table and multiplicands"""
+        codebook_size: int = self._codebook_entries * self._CODEBOOK_ENTRY_SIZE
+
+        if self._codebook_lookup_type != 0:
+            codebook_size += (
+                self._codebook_entries * self._codebook_dimensions * 4
+                + self._codebook_lookup_values * 8)
+
+        return codebook_size
+
+    @staticmethod
+    def _codebook_fingerprint(bits_count: int, bits: bytes) -> bytes:
+        """Returns key of codebook with [bits_count] bits [bits] in
+        codebooks cache"""
+        key_hash = blake2b(digest_size=20)
+        key_hash.update(bits_count.to_bytes(8, byteorder='little'))
+        key_hash.update(bits)
+
+        return key_hash.digest()
+
+    def _read_lookup_config(self):
+        """Method reads lookup type and VQ lookup table values from packet
+        data"""
         self._codebook_lookup_type = self._read_bits_for_int(4)
-        result_data.codebook_lookup_type = self._codebook_lookup_type
 
         if (self._codebook_lookup_type < 0
                 or self._codebook_lookup_type > 2):
@@ -158,9 +654,6 @@ class SetupHeaderDecoder(AbstractDecoder):
 
             self._codebook_sequence_p = bool(self._read_bit())
 
-            if self._codebook_sequence_p:
-                raise NotImplementedError("[_codebook_sequence_p] is True")
-
             if self._codebook_lookup_type == 1:
                 self._codebook_lookup_values = lookup1_values(
                     self._codebook_entries, self._codebook_dimensions)
@@ -168,17 +661,25 @@ class SetupHeaderDecoder(AbstractDecoder):
                 self._codebook_lookup_values = (
                     self._codebook_entries * self._codebook_dimensions)
 
-            self._codebook_multiplicands = []
-            for i in range(self._codebook_lookup_values):
-                self._codebook_multiplicands.append(
-                    self._read_bits_for_int(self._codebook_value_bits))
+            self._codebook_multiplicands = self._read_bits_many(
+                self._codebook_lookup_values, self._codebook_value_bits)
 
-            self._VQ_lookup_table = self._vq_lookup_table_unpack()
-            result_data.VQ_lookup_table = list(self._VQ_lookup_table)
+    def _make_codebook(self) -> CodebookData:
+        """Method makes codebook from read codebook values"""
+        result_data: SetupHeaderDecoder.CodebookData = self.CodebookData()
 
-            return result_data
+        result_data.codebook_dimensions = self._codebook_dimensions
+        result_data.codebook_entries = self._codebook_entries
+        result_data.codebook_codewords_lengths = (
+            self._codebook_codewords_lengths)
+        result_data.codebook_lookup_type = self._codebook_lookup_type
 
-        result_data.VQ_lookup_table = []
+        if self._codebook_lookup_type != 0:
+            result_data.codebook_minimum_value = self._codebook_minimum_value
+            result_data.codebook_delta_value = self._codebook_delta_value
+            result_data.codebook_sequence_p = self._codebook_sequence_p
+            result_data.codebook_lookup_values = self._codebook_lookup_values
+            result_data.codebook_multiplicands = self._codebook_multiplicands
 
         return result_data
 
@@ -191,19 +692,19 @@ class SetupHeaderDecoder(AbstractDecoder):
         """Method reads codewords lengths from packet data"""
         result_codeword_lengths: List[Optional[int]] = []
 
-        if not self._ordered:
+        if not self._ordered and self._sparse:
             for i in range(self._codebook_entries):
-                if self._sparse:
-                    flag: bool = bool(self._read_bit())
+                flag: bool = bool(self._read_bit())
 
-                    if flag:
-                        result_codeword_lengths.append(
-                            self._read_bits_for_int(5) + 1)
-                    else:
-                        result_codeword_lengths.append(None)
-                else:
+                if flag:
                     result_codeword_lengths.append(
                         self._read_bits_for_int(5) + 1)
+                else:
+                    result_codeword_lengths.append(None)
+        elif not self._ordered:
+            result_codeword_lengths = [
+                length + 1 for length in self._read_bits_many(
+                    self._codebook_entries, 5)]
         else:
             current_entry: int = 0
             current_length: int = self._read_bits_for_int(5) + 1
@@ -229,179 +730,6 @@ class SetupHeaderDecoder(AbstractDecoder):
 
         return result_codeword_lengths
 
-    def _huffman_decode(self) -> List[str]:
-        """Decodes Huffman tree with int codewords representation method"""
-        result_codewords: List[str] = []
-
-        for start_entry in range(self._codebook_entries):
-            if self._codebook_codewords_lengths[start_entry] is not None:
-                break
-            result_codewords.append('')
-        else:
-            return result_codewords
-
-        result_codewords.append(
-            ''.zfill(self._codebook_codewords_lengths[start_entry]))
-
-        available: List[int] = [0] * 32
-        for i in range(1,
-                       self._codebook_codewords_lengths[start_entry] + 1):
-            available[i] = 1 << (32 - i)
-
-        for i in range(start_entry + 1, self._codebook_entries):
-            max_available_branch = self._codebook_codewords_lengths[i]
-
-            if max_available_branch is None:
-                result_codewords.append('')
-                continue
-
-            while (max_available_branch > 0
-                   and available[max_available_branch] == 0):
-                max_available_branch -= 1
-
-            assert 0 < max_available_branch < 32
-
-            result = available[max_available_branch]
-            available[max_available_branch] = 0
-
-            codeword: str = bin(bit_reverse(result))[2:]
-            codeword = (
-                ''.zfill(
-                    self._codebook_codewords_lengths[i] - len(
-                        codeword))
-                + codeword)
-            result_codewords.append(codeword[::-1])
-
-            if max_available_branch != self._codebook_codewords_lengths[i]:
-                for new_branch in range(
-                        self._codebook_codewords_lengths[i],
-                        max_available_branch,
-                        -1):
-                    assert available[new_branch] == 0
-                    available[new_branch] = result + (
-                        1 << (32 - new_branch))
-
-        return result_codewords
-
-    def _vq_lookup_table_unpack(self) -> List[List[float]]:
-        """Decodes VQ lookup table from some values in packet data"""
-        result_vq_table: List[List[float]] = []
-
-        if self._codebook_lookup_type == 1:
-            for lookup_offset in range(self._codebook_entries):
-                last: float = 0
-                index_divisor: int = 1
-                value_vector: List[float] = []
-
-                for i in range(self._codebook_dimensions):
-                    multiplicand_offset = (
-                        (lookup_offset // index_divisor)
-                        % self._codebook_lookup_values)
-                    value_vector.append(
-                        self._codebook_multiplicands[multiplicand_offset]
-                        * self._codebook_delta_value
-                        + self._codebook_minimum_value
-                        + last)
-
-                    if self._codebook_sequence_p:
-                        last = value_vector[i]
-
-                    index_divisor *= self._codebook_lookup_values
-
-                result_vq_table.append(value_vector)
-
-        elif self._codebook_lookup_type == 2:
-            raise NotImplementedError(
-                'VQ lookup table unpacking with [_codebook_lookup_type] = 2')
-            # for lookup_offset in range(self._codebook_entries):
-            #     last: float = 0
-            #     multiplicand_offset: int = (
-            #             lookup_offset * self._codebook_dimensions)
-            #     value_vector: List[float] = []
-            #
-            #     for i in range(self._codebook_dimensions):
-            #         value_vector.append(
-            #             self._codebook_multiplicands[multiplicand_offset]
-            #             * self._codebook_delta_value
-            #             + self._codebook_minimum_value
-            #             + last)
-            #
-            #         if self._codebook_sequence_p:
-            #             last = value_vector[i]
-            #
-            #         multiplicand_offset += 1
-            #
-            #     result_vq_table.append(value_vector)
-
-        else:
-            raise CorruptedFileDataError(
-                'Got illegal codebook lookup type: '
-                f'{self._codebook_lookup_type}')
-
-        return result_vq_table
-
-    def _huffman_decode_bfc(self) -> List[str]:
-        """Decodes Huffman tree with brute force method
-
-        Extremely slow code! Use for tests ONLY!"""
-        return_values: List[str] = []
-        for i in range(0, self._codebook_entries):
-            if self._codebook_codewords_lengths[i] is None:
-                return_values.append('')
-                continue
-
-            bfc_value: str = (
-                ''.join(["1" for i in range(
-                    self._codebook_codewords_lengths[i])]))
-            for value in return_values:
-                if len(value) == len(bfc_value) and \
-                        int(value, 2) < int(bfc_value, 2):
-                    bfc_value = value
-            if '0' not in bfc_value:
-                bfc_value = ''.zfill(self._codebook_codewords_lengths[i])
-
-            while '0' in bfc_value:
-                for value in return_values:
-                    prefix_length = min(len(value), len(bfc_value))
-                    if (prefix_length != 0
-                        and value[:prefix_length]
-                            == bfc_value[:prefix_length]):
-                        break
-                else:
-                    break
-
-                bfc_value = (
-                    bin(int(bfc_value, 2) + 1)[2:]
-                    .zfill(self._codebook_codewords_lengths[i]))
-
-            return_values.append(bfc_value)
-
-        self._huffman_bfc_fullness_check(return_values)
-
-        return return_values
-
-    @staticmethod
-    def _huffman_bfc_fullness_check(codewords: List[str]):
-        """Method checks if decoded Huffman tree is full
-
-        Slow code!"""
-        for codeword_1 in codewords:
-            if len(codeword_1) == 0:
-                continue
-
-            paired_node_is_present = False
-            for codeword_2 in codewords:
-                if len(codeword_2) == 0 or codeword_1 == codeword_2:
-                    continue
-
-                min_len = min(len(codeword_1), len(codeword_2))
-                if codeword_1[:min_len - 1] == codeword_2[:min_len - 1]:
-                    paired_node_is_present = True
-                    break
-            if not paired_node_is_present:
-                raise CorruptedFileDataError(
-                    'Huffman tree is underspecified')
-
     def read_floors(
             self, codebooks_amount: int) -> Tuple[List[int], List[FloorData]]:
         """Returns tuple of floors' types AND related floors' data
@@ -419,7 +747,7 @@ class SetupHeaderDecoder(AbstractDecoder):
 
             elif vorbis_floor_types[i] == 0:
                 vorbis_floor_configurations.append(
-                    self._decode_floor_config_type_0())
+                    self._decode_floor_config_type_0(codebooks_amount))
 
             else:
                 raise CorruptedFileDataError(
@@ -427,8 +755,7 @@ class SetupHeaderDecoder(AbstractDecoder):
 
         return vorbis_floor_types, vorbis_floor_configurations
 
-    # WouldBeBetter: Floor config type 0 decoding. Check docstring for details
-    def _decode_floor_config_type_0(self) -> FloorData:
+    def _decode_floor_config_type_0(self, codebooks_amount: int) -> FloorData:
         """Method decodes floor configuration type 0
 
         From Vorbis I docs:
@@ -436,7 +763,33 @@ class SetupHeaderDecoder(AbstractDecoder):
         modern use. No known Vorbis encoder past Xiph.Org’s own beta 4 makes
         use of floor 0."
         """
-        raise NotImplementedError('Floor 0 decoding')
+        result_data: 'SetupHeaderDecoder.FloorData' = self.FloorData()
+
+        result_data.floor0_order = self._read_bits_for_int(8)
+        result_data.floor0_rate = self._read_bits_for_int(16)
+        result_data.floor0_bark_map_size = self._read_bits_for_int(16)
+        result_data.floor0_amplitude_bits = self._read_bits_for_int(6)
+        result_data.floor0_amplitude_offset = self._read_bits_for_int(8)
+        result_data.floor0_number_of_books = self._read_bits_for_int(4) + 1
+
+        result_data.floor0_book_list = []
+
+        for i in range(result_data.floor0_number_of_books):
+            result_data.floor0_book_list.append(self._read_bits_for_int(8))
+
+            if result_data.floor0_book_list[i] >= codebooks_amount:
+                raise CorruptedFileDataError(
+                    'Received incorrect [floor0_book_list] item: '
+                    + str(result_data.floor0_book_list[i]))
+
+        if (result_data.floor0_order == 0
+                or result_data.floor0_rate == 0
+                or result_data.floor0_bark_map_size == 0):
+            raise CorruptedFileDataError(
+                '[floor0_order], [floor0_rate] or [floor0_bark_map_size] '
+                'equal to zero')
+
+        return result_data
 
     def _decode_floor_config_type_1(self, codebooks_amount: int) -> FloorData:
         """Method decodes floor configuration type 1"""
@@ -760,6 +1113,748 @@ class SetupHeaderDecoder(AbstractDecoder):
         return modes_configs
 
 
+# Amplitude ranges of floor type 1 by [floor1_multiplier]
+_FLOOR1_RANGES: List[int] = [256, 128, 86, 64]
+
+# Values of floor type 1 curve in linear domain. From docs:
+# "floor1_inverse_dB_table"
+_FLOOR1_INVERSE_DB_TABLE: np.ndarray = np.array([
+    1.0649863e-07, 1.1341951e-07, 1.2079015e-07, 1.2863978e-07, 1.369995e-07,
+    1.459025e-07, 1.5538409e-07, 1.6548181e-07, 1.7623574e-07, 1.8768856e-07,
+    1.998856e-07, 2.1287531e-07, 2.2670913e-07, 2.4144197e-07, 2.5713223e-07,
+    2.7384212e-07, 2.9163792e-07, 3.1059022e-07, 3.307741e-07, 3.5226967e-07,
+    3.7516213e-07, 3.995423e-07, 4.2550681e-07, 4.5315863e-07, 4.8260745e-07,
+    5.1397001e-07, 5.4737063e-07, 5.8294188e-07, 6.2082472e-07, 6.6116939e-07,
+    7.0413591e-07, 7.4989464e-07, 7.9862701e-07, 8.5052631e-07, 9.0579829e-07,
+    9.6466215e-07, 1.0273513e-06, 1.0941144e-06, 1.1652161e-06, 1.2409384e-06,
+    1.3215816e-06, 1.4074654e-06, 1.4989305e-06, 1.5963394e-06, 1.7000785e-06,
+    1.8105592e-06, 1.9282195e-06, 2.053526e-06, 2.1869757e-06, 2.3290977e-06,
+    2.4804558e-06, 2.6416496e-06, 2.813319e-06, 2.9961443e-06, 3.1908505e-06,
+    3.3982101e-06, 3.6190449e-06, 3.8542307e-06, 4.1047006e-06, 4.3714472e-06,
+    4.6555283e-06, 4.9580708e-06, 5.2802739e-06, 5.6234162e-06, 5.9888571e-06,
+    6.3780467e-06, 6.7925284e-06, 7.2339453e-06, 7.7040477e-06, 8.2047e-06,
+    8.7378876e-06, 9.3057251e-06, 9.9104636e-06, 1.0554501e-05, 1.1240392e-05,
+    1.1970856e-05, 1.2748789e-05, 1.3577278e-05, 1.4459606e-05, 1.5399271e-05,
+    1.6400005e-05, 1.7465769e-05, 1.8600793e-05, 1.9809577e-05, 2.1096914e-05,
+    2.2467912e-05, 2.3928002e-05, 2.5482977e-05, 2.7139005e-05, 2.890265e-05,
+    3.078091e-05, 3.2781227e-05, 3.4911533e-05, 3.7180282e-05, 3.9596467e-05,
+    4.2169668e-05, 4.4910092e-05, 4.7828602e-05, 5.0936775e-05, 5.4246932e-05,
+    5.7772202e-05, 6.1526567e-05, 6.552491e-05, 6.9783084e-05, 7.4317984e-05,
+    7.9147583e-05, 8.4291038e-05, 8.976875e-05, 9.5602423e-05, 0.00010181521,
+    0.00010843174, 0.00011547824, 0.00012298267, 0.00013097477, 0.00013948625,
+    0.00014855085, 0.00015820454, 0.00016848555, 0.00017943469, 0.00019109536,
+    0.00020351382, 0.0002167393, 0.00023082423, 0.00024582449, 0.00026179955,
+    0.00027881275, 0.00029693157, 0.00031622787, 0.00033677815, 0.00035866388,
+    0.00038197188, 0.00040679457, 0.00043323037, 0.0004613841, 0.00049136748,
+    0.00052329927, 0.00055730622, 0.00059352309, 0.00063209358, 0.00067317061,
+    0.00071691698, 0.00076350628, 0.00081312325, 0.00086596457, 0.00092223985,
+    0.00098217221, 0.0010459992, 0.0011139743, 0.0011863665, 0.0012634633,
+    0.0013455702, 0.0014330129, 0.0015261382, 0.0016253153, 0.0017309374,
+    0.0018434235, 0.0019632196, 0.0020908006, 0.0022266726, 0.0023713743,
+    0.0025254795, 0.0026895993, 0.0028643848, 0.0030505287, 0.0032487691,
+    0.0034598925, 0.0036847359, 0.0039241905, 0.0041792067, 0.0044507948,
+    0.0047400328, 0.0050480668, 0.0053761187, 0.005725489, 0.0060975635,
+    0.0064938175, 0.0069158226, 0.0073652514, 0.0078438874, 0.0083536273,
+    0.0088964924, 0.009474637, 0.010090352, 0.01074608, 0.011444421,
+    0.012188144, 0.012980198, 0.013823725, 0.014722068, 0.015678791,
+    0.016697686, 0.017782796, 0.018938422, 0.020169148, 0.021479854,
+    0.022875736, 0.024362329, 0.025945531, 0.027631618, 0.029427277,
+    0.031339627, 0.03337625, 0.035545226, 0.037855156, 0.0403152, 0.042935107,
+    0.045725275, 0.048696756, 0.051861349, 0.05523159, 0.058820851,
+    0.062643364, 0.066714279, 0.07104975, 0.075666964, 0.080584228,
+    0.085821047, 0.09139818, 0.097337745, 0.1036633, 0.11039993, 0.11757434,
+    0.12521498, 0.13335215, 0.14201812, 0.15124726, 0.16107617, 0.17154381,
+    0.18269168, 0.19456401, 0.20720787, 0.22067343, 0.23501402, 0.25028655,
+    0.26655158, 0.28387362, 0.30232131, 0.32196787, 0.34289113, 0.36517414,
+    0.3889052, 0.41417846, 0.44109413, 0.4697589, 0.50028646, 0.53279793,
+    0.56742209, 0.60429639, 0.64356697, 0.68538958, 0.72993004, 0.77736503,
+    0.82788259, 0.88168305, 0.9389798, 1.0])
+
+
+def _bark(x: np.ndarray) -> np.ndarray:
+    """Returns Bark scale values of frequencies [x]. From docs"""
+    return (
+        13.1 * np.arctan(0.00074 * x)
+        + 2.24 * np.arctan(0.0000000185 * x * x)
+        + 0.0001 * x)
+
+
+class AudioDataDecoder(AbstractDecoder):
+    """Class for audio packets decoding
+
+    Audio packet is decoded into PCM data as described in docs: floor
+    curves, residue vectors, inverse channel coupling, inverse MDCT,
+    windowing and overlap-add with previous packet"""
+    _logical_stream: 'PacketsProcessor.LogicalStreamData'
+
+    # Windowed right parts of previous packet blocks per channel. None if
+    # there is no previous packet
+    _previous_blocks: Optional[List[np.ndarray]]
+
+    # Cached windows. Key is (<blocksize>, <previous window flag>,
+    # <next window flag>)
+    _windows: Dict[Tuple[int, int, int], np.ndarray]
+
+    # Cached data for floors type 1. Key is floor number, value is
+    # (<low neighbors>, <high neighbors>, <positions sorted by X>)
+    _floor1_neighbors: Dict[int, Tuple[List[int], List[int], List[int]]]
+
+    # Cached cosines of floor type 0 Bark map for every curve value. Key is
+    # (<floor0_bark_map_size>, <blocksize>, <floor0_rate>)
+    _floor0_cosines: Dict[Tuple[int, int, int], np.ndarray]
+
+    def __init__(
+            self,
+            data_reader: 'DataReader',
+            logical_stream: 'PacketsProcessor.LogicalStreamData'):
+        super().__init__(data_reader)
+
+        self._data_reader = data_reader
+        self._logical_stream = logical_stream
+        self._previous_blocks = None
+        self._floor1_neighbors = {}
+        self._floor0_cosines = {}
+
+        # Windows are computed once for both blocksizes of logical stream
+        self._windows = {}
+        self._get_window(logical_stream.blocksize_0, 0, 0)
+        for previous_window_flag in (0, 1):
+            for next_window_flag in (0, 1):
+                self._get_window(
+                    logical_stream.blocksize_1,
+                    previous_window_flag,
+                    next_window_flag)
+
+    def reset(self):
+        """Method forgets previous packet
+
+        Should be used after seeking. Next decoded packet returns no PCM data
+        because there is nothing to overlap it with"""
+        self._previous_blocks = None
+
+    def decode_audio_packet(self) -> List[np.ndarray]:
+        """Method decodes current packet returning PCM data per channel
+
+        Returned data is from the center of the previous packet window to the
+        center of the current packet window. The first packet after [reset]
+        returns empty arrays"""
+        current_stream = self._logical_stream
+
+        if self._read_bit() != 0:
+            raise CorruptedFileDataError(
+                'Got wrong packet type in process of audio data reading')
+
+        mode_number = self._read_bits_for_int(
+            ilog(len(current_stream.vorbis_mode_configurations) - 1))
+
+        if mode_number >= len(current_stream.vorbis_mode_configurations):
+            raise CorruptedFileDataError(
+                f'Received incorrect mode number: {mode_number}')
+
+        current_mode: SetupHeaderDecoder.ModeData = (
+            current_stream.vorbis_mode_configurations[mode_number])
+
+        previous_window_flag: int = 0
+        next_window_flag: int = 0
+
+        if current_mode.vorbis_mode_blockflag == 1:
+            blocksize = current_stream.blocksize_1
+            previous_window_flag = self._read_bit()
+            next_window_flag = self._read_bit()
+        else:
+            blocksize = current_stream.blocksize_0
+
+        spectra: List[np.ndarray] = self._decode_spectra(
+            current_stream.vorbis_mapping_configurations[
+                current_mode.vorbis_mode_mapping],
+            blocksize // 2)
+
+        window: np.ndarray = self._get_window(
+            blocksize,
+            previous_window_flag,
+            next_window_flag)
+
+        blocks: List[np.ndarray] = [
+            imdct(spectrum) * window for spectrum in spectra]
+
+        return self._overlap_add(blocks)
+
+    def _decode_spectra(
+            self,
+            mapping: 'SetupHeaderDecoder.MappingData',
+            spectrum_size: int) -> List[np.ndarray]:
+        """Method decodes audio spectrum of every channel by [mapping]"""
+        current_stream = self._logical_stream
+        channels: int = current_stream.audio_channels
+
+        # Mux is not coded in case of single submap
+        mapping_mux: List[int] = (
+            mapping.vorbis_mapping_mux or [0] * channels)
+
+        floor_numbers: List[int] = [
+            mapping.vorbis_mapping_submap_floor[mapping_mux[channel]]
+            for channel in range(channels)]
+
+        # Y values of floor type 1 or (<amplitude>, <coefficients>) of
+        # floor type 0. None if floor is unused
+        floors_values: List[Optional[Union[
+            List[int], Tuple[int, np.ndarray]]]] = []
+
+        for floor_number in floor_numbers:
+            floor_data: SetupHeaderDecoder.FloorData = (
+                current_stream.vorbis_floor_configurations[floor_number])
+
+            if current_stream.vorbis_floor_types[floor_number] == 0:
+                floors_values.append(self._decode_floor_0(floor_data))
+            else:
+                floors_values.append(self._decode_floor_1(floor_data))
+
+        no_residue: List[bool] = [
+            floor_values is None for floor_values in floors_values]
+
+        for magnitude, angle in zip(
+                mapping.vorbis_mapping_magnitude,
+                mapping.vorbis_mapping_angle):
+            if not no_residue[magnitude] or not no_residue[angle]:
+                no_residue[magnitude] = no_residue[angle] = False
+
+        residues: List[List[float]] = [[]] * channels
+
+        for submap_number in range(mapping.vorbis_mapping_submaps):
+            submap_channels: List[int] = [
+                channel for channel in range(channels)
+                if mapping_mux[channel] == submap_number]
+
+            residue_number: int = (
+                mapping.vorbis_mapping_submap_residue[submap_number])
+
+            submap_residues: List[List[float]] = self._decode_residue(
+                current_stream.vorbis_residue_types[residue_number],
+                current_stream.vorbis_residue_configurations[residue_number],
+                [no_residue[channel] for channel in submap_channels],
+                spectrum_size)
+
+            for channel, residue in zip(submap_channels, submap_residues):
+                residues[channel] = residue
+
+        for magnitude, angle in zip(
+                reversed(mapping.vorbis_mapping_magnitude),
+                reversed(mapping.vorbis_mapping_angle)):
+            self._inverse_coupling(residues[magnitude], residues[angle])
+
+        spectra: List[np.ndarray] = []
+
+        for channel in range(channels):
+            floor_values = floors_values[channel]
+
+            if floor_values is None:
+                spectra.append(np.zeros(spectrum_size))
+
+                continue
+
+            if current_stream.vorbis_floor_types[floor_numbers[channel]] == 0:
+                floor_curve: np.ndarray = self._floor_0_curve(
+                    floor_numbers[channel], floor_values, spectrum_size)
+            else:
+                floor_curve = self._floor_1_curve(
+                    floor_numbers[channel], floor_values, spectrum_size)
+
+            spectra.append(np.asarray(residues[channel]) * floor_curve)
+
+        return spectra
+
+    def _decode_floor_0(
+            self,
+            floor_data: 'SetupHeaderDecoder.FloorData'
+    ) -> Optional[Tuple[int, np.ndarray]]:
+        """Method decodes amplitude and LSP coefficients of floor type 0
+        from packet
+
+        Returns None if floor is unused in current packet"""
+        codebooks: List[SetupHeaderDecoder.CodebookData] = (
+            self._logical_stream.vorbis_codebook_configurations)
+
+        try:
+            amplitude: int = self._read_bits_for_int(
+                floor_data.floor0_amplitude_bits)
+
+            if amplitude == 0:
+                return None
+
+            book_number: int = self._read_bits_for_int(
+                ilog(floor_data.floor0_number_of_books))
+
+            if book_number >= floor_data.floor0_number_of_books:
+                raise CorruptedFileDataError(
+                    f'Received incorrect floor 0 book number: {book_number}')
+
+            codebook: SetupHeaderDecoder.CodebookData = codebooks[
+                floor_data.floor0_book_list[book_number]]
+
+            if codebook.codebook_dimensions == 0:
+                raise CorruptedFileDataError(
+                    'Floor 0 coefficients are read from codebook with zero '
+                    'dimensions')
+
+            coefficients: List[np.ndarray] = []
+            coefficients_amount: int = 0
+            last: float = 0.0
+
+            # Every vector continues from the last value of previous vector
+            while coefficients_amount < floor_data.floor0_order:
+                vector: np.ndarray = (
+                    codebook.decode_vector(self._data_reader) + last)
+                last = vector[-1]
+
+                coefficients.append(vector)
+                coefficients_amount += len(vector)
+
+        # Floor type 0 is unused on end-of-packet like floor type 1
+        except EndOfPacketException:
+            return None
+
+        return (
+            amplitude,
+            np.concatenate(coefficients)[:floor_data.floor0_order])
+
+    def _floor_0_curve(
+            self,
+            floor_number: int,
+            floor0_values: Tuple[int, np.ndarray],
+            curve_size: int) -> np.ndarray:
+        """Method computes floor curve of type 0 by decoded amplitude and
+        LSP coefficients
+
+        Curve is computed for all values at once. Values with the same
+        Bark map item are equal, so they are not computed separately as in
+        docs, it gives the same curve"""
+        floor_data: SetupHeaderDecoder.FloorData = (
+            self._logical_stream.vorbis_floor_configurations[floor_number])
+        amplitude, coefficients = floor0_values
+
+        cosines_key = (
+            floor_data.floor0_bark_map_size,
+            curve_size * 2,
+            floor_data.floor0_rate)
+
+        if cosines_key not in self._floor0_cosines:
+            bark_map_size, _, rate = cosines_key
+            bark_map: np.ndarray = np.minimum(
+                bark_map_size - 1,
+                np.floor(
+                    _bark(rate * np.arange(curve_size) / (2 * curve_size))
+                    * bark_map_size / _bark(0.5 * rate)))
+
+            self._floor0_cosines[cosines_key] = np.cos(
+                np.pi * bark_map / bark_map_size)
+
+        cosines: np.ndarray = self._floor0_cosines[cosines_key]
+        coefficients_cosines: np.ndarray = np.cos(
+            coefficients.astype(np.float64))[:, None]
+
+        p: np.ndarray = np.prod(
+            4 * (coefficients_cosines[1::2] - cosines) ** 2, axis=0)
+        q: np.ndarray = np.prod(
+            4 * (coefficients_cosines[0::2] - cosines) ** 2, axis=0)
+
+        if floor_data.floor0_order % 2 == 1:
+            p *= 1 - cosines ** 2
+            q /= 4
+        else:
+            p *= (1 - cosines) / 2
+            q *= (1 + cosines) / 2
+
+        amplitude_offset: int = floor_data.floor0_amplitude_offset
+
+        return np.exp(0.11512925 * (
+            amplitude * amplitude_offset
+            / (((1 << floor_data.floor0_amplitude_bits) - 1) * np.sqrt(p + q))
+            - amplitude_offset))
+
+    def _decode_floor_1(
+            self,
+            floor_data: 'SetupHeaderDecoder.FloorData'
+    ) -> Optional[List[int]]:
+        """Method decodes Y values of floor type 1 from packet
+
+        Returns None if floor is unused in current packet"""
+        codebooks: List[SetupHeaderDecoder.CodebookData] = (
+            self._logical_stream.vorbis_codebook_configurations)
+
+        try:
+            if self._read_bit() == 0:
+                return None
+
+            y_bits: int = ilog(
+                _FLOOR1_RANGES[floor_data.floor1_multiplier - 1] - 1)
+            floor1_y: List[int] = [
+                self._read_bits_for_int(y_bits),
+                self._read_bits_for_int(y_bits)]
+
+            for class_number in floor_data.floor1_partition_class_list:
+                class_subclasses: int = (
+                    floor_data.floor1_class_subclasses[class_number])
+                subclasses_mask: int = (1 << class_subclasses) - 1
+                class_value: int = 0
+
+                if class_subclasses > 0:
+                    class_value = codebooks[
+                        floor_data.floor1_class_masterbooks[class_number]
+                    ].decode_scalar(self._data_reader)
+
+                for i in range(
+                        floor_data.floor1_class_dimensions[class_number]):
+                    book: int = floor_data.floor1_subclass_books[
+                        class_number][class_value & subclasses_mask]
+                    class_value >>= class_subclasses
+
+                    if book >= 0:
+                        floor1_y.append(
+                            codebooks[book].decode_scalar(self._data_reader))
+                    else:
+                        floor1_y.append(0)
+
+        # From docs:
+        # "if end-of-packet is reached during any read operation above, floor
+        # decode is to return ’unused’ status as if the [nonzero] flag had
+        # been unset at the beginning of decode"
+        except EndOfPacketException:
+            return None
+
+        return floor1_y
+
+    def _floor_1_curve(
+            self,
+            floor_number: int,
+            floor1_y: List[int],
+            curve_size: int) -> np.ndarray:
+        """Method computes floor curve of type 1 by decoded Y values"""
+        floor_data: SetupHeaderDecoder.FloorData = (
+            self._logical_stream.vorbis_floor_configurations[floor_number])
+        x_list: List[int] = floor_data.floor1_x_list
+
+        if floor_number not in self._floor1_neighbors:
+            self._floor1_neighbors[floor_number] = (
+                [0, 0] + [low_neighbor(x_list, i)
+                          for i in range(2, len(x_list))],
+                [0, 0] + [high_neighbor(x_list, i)
+                          for i in range(2, len(x_list))],
+                sorted(range(len(x_list)), key=lambda i: x_list[i]))
+
+        low_neighbors, high_neighbors, sorted_positions = (
+            self._floor1_neighbors[floor_number])
+
+        # Amplitude value synthesis
+
+        floor_range: int = _FLOOR1_RANGES[floor_data.floor1_multiplier - 1]
+        step2_flags: List[bool] = [True, True]
+
+        # Values of malformed packets can be out of range, they are clamped
+        # to [0, floor_range - 1] like in reference decoder, so curve values
+        # are always in inverse dB table
+        final_y: List[int] = [min(y, floor_range - 1) for y in floor1_y[:2]]
+
+        for i in range(2, len(x_list)):
+            low = low_neighbors[i]
+            high = high_neighbors[i]
+            predicted: int = render_point(
+                x_list[low], final_y[low],
+                x_list[high], final_y[high],
+                x_list[i])
+            value: int = floor1_y[i]
+            high_room: int = floor_range - predicted
+            low_room: int = predicted
+            room: int = 2 * min(high_room, low_room)
+
+            if value == 0:
+                step2_flags.append(False)
+                final_y.append(predicted)
+
+                continue
+
+            step2_flags[low] = step2_flags[high] = True
+            step2_flags.append(True)
+
+            if value >= room:
+                if high_room > low_room:
+                    y: int = value - low_room + predicted
+                else:
+                    y = predicted - value + high_room - 1
+            elif value % 2 == 1:
+                y = predicted - (value + 1) // 2
+            else:
+                y = predicted + value // 2
+
+            final_y.append(max(0, min(y, floor_range - 1)))
+
+        # Curve synthesis
+
+        multiplier: int = floor_data.floor1_multiplier
+        floor_curve: List[int] = [0] * curve_size
+        low_x: int = 0
+        low_y: int = final_y[0] * multiplier
+        high_x: int = 0
+        high_y: int = low_y
+
+        for i in sorted_positions[1:]:
+            if not step2_flags[i]:
+                continue
+
+            high_x = x_list[i]
+            high_y = final_y[i] * multiplier
+
+            render_line(low_x, low_y, high_x, high_y, floor_curve)
+
+            low_x, low_y = high_x, high_y
+
+        if high_x < curve_size:
+            render_line(high_x, high_y, curve_size, high_y, floor_curve)
+
+        return _FLOOR1_INVERSE_DB_TABLE[floor_curve]
+
+    def _decode_residue(
+            self,
+            residue_type: int,
+            residue_data: 'SetupHeaderDecoder.ResidueData',
+            do_not_decode: List[bool],
+            vector_size: int) -> List[List[float]]:
+        """Method decodes residue vectors of submap channels"""
+        if residue_type != 2:
+            return self._decode_residue_vectors(
+                residue_type, residue_data, do_not_decode, vector_size)
+
+        channels: int = len(do_not_decode)
+
+        if all(do_not_decode):
+            return [[0.0] * vector_size for _ in range(channels)]
+
+        # Residue type 2 is residue type 1 of interleaved channels
+        interleaved: List[float] = self._decode_residue_vectors(
+            1, residue_data, [False], vector_size * channels)[0]
+
+        return [interleaved[channel::channels] for channel in range(channels)]
+
+    def _decode_residue_vectors(
+            self,
+            residue_type: int,
+            residue_data: 'SetupHeaderDecoder.ResidueData',
+            do_not_decode: List[bool],
+            vector_size: int) -> List[List[float]]:
+        """Method decodes residue vectors of format 0 or 1"""
+        codebooks: List[SetupHeaderDecoder.CodebookData] = (
+            self._logical_stream.vorbis_codebook_configurations)
+        classbook: SetupHeaderDecoder.CodebookData = (
+            codebooks[residue_data.residue_classbook])
+        classifications: int = residue_data.residue_classifications
+        partition_size: int = residue_data.residue_partition_size
+
+        vectors: List[List[float]] = [
+            [0.0] * vector_size for _ in do_not_decode]
+        decoded_channels: List[int] = [
+            channel for channel in range(len(do_not_decode))
+            if not do_not_decode[channel]]
+
+        limit_begin: int = min(residue_data.residue_begin, vector_size)
+        limit_end: int = min(residue_data.residue_end, vector_size)
+        partitions_to_read: int = (limit_end - limit_begin) // partition_size
+
+        if partitions_to_read == 0 or len(decoded_channels) == 0:
+            return vectors
+
+        partitions_classes: List[List[int]] = [
+            [0] * (partitions_to_read + classbook.codebook_dimensions)
+            for _ in do_not_decode]
+
+        try:
+            for pass_number in range(8):
+                partition_count: int = 0
+
+                while partition_count < partitions_to_read:
+                    if pass_number == 0:
+                        for channel in decoded_channels:
+                            class_value: int = classbook.decode_scalar(
+                                self._data_reader)
+
+                            for i in reversed(range(
+                                    classbook.codebook_dimensions)):
+                                partitions_classes[channel][
+                                    partition_count + i] = (
+                                    class_value % classifications)
+                                class_value //= classifications
+
+                    for _ in range(classbook.codebook_dimensions):
+                        if partition_count >= partitions_to_read:
+                            break
+
+                        for channel in decoded_channels:
+                            book: Optional[int] = (
+                                residue_data.residue_books[
+                                    partitions_classes[channel][
+                                        partition_count]][pass_number])
+
+                            if book is not None:
+                                self._decode_residue_partition(
+                                    residue_type,
+                                    codebooks[book],
+                                    vectors[channel],
+                                    limit_begin
+                                    + partition_count * partition_size,
+                                    partition_size)
+
+                        partition_count += 1
+
+        # From docs: "if the end of packet is reached in residue decode, the
+        # decoded values are used as is"
+        except EndOfPacketException:
+            pass
+
+        return vectors
+
+    def _decode_residue_partition(
+            self,
+            residue_type: int,
+            codebook: 'SetupHeaderDecoder.CodebookData',
+            vector: List[float],
+            offset: int,
+            partition_size: int):
+        """Method adds decoded residue partition into [vector]
+
+        Entries of partition vectors are decoded first, then vectors are
+        gathered from VQ lookup table as rows at once"""
+        dimensions: int = codebook.codebook_dimensions
+        codebook.check_vq_lookup_table()
+
+        if residue_type == 0:
+            vectors_amount: int = partition_size // dimensions
+        else:
+            vectors_amount = -(-partition_size // dimensions)
+
+        entries: List[int] = []
+
+        # From docs: "if the end of packet is reached in residue decode, the
+        # decoded values are used as is", so decoded vectors are added when
+        # end-of-packet condition is triggered too
+        try:
+            for _ in range(vectors_amount):
+                entries.append(codebook.decode_scalar(self._data_reader))
+        finally:
+            values: List[float] = (
+                codebook.VQ_lookup_table[entries].ravel().tolist())
+
+            # Residue type 0 interleaves vectors values with step of
+            # vectors amount even if not all vectors are decoded
+            if residue_type == 0:
+                positions: np.ndarray = (
+                    offset
+                    + np.arange(len(entries))[:, None]
+                    + np.arange(dimensions) * vectors_amount).ravel()
+
+                for position, value in zip(positions.tolist(), values):
+                    if position < len(vector):
+                        vector[position] += value
+            else:
+                values = values[:len(vector) - offset]
+
+                for position, value in enumerate(values, offset):
+                    vector[position] += value
+
+    @staticmethod
+    def _inverse_coupling(magnitudes: List[float], angles: List[float]):
+        """Method restores channels vectors from square polar coupling"""
+        for i, (magnitude, angle) in enumerate(zip(magnitudes, angles)):
+            if magnitude > 0:
+                if angle > 0:
+                    angles[i] = magnitude - angle
+                else:
+                    angles[i] = magnitude
+                    magnitudes[i] = magnitude + angle
+            elif angle > 0:
+                angles[i] = magnitude + angle
+            else:
+                angles[i] = magnitude
+                magnitudes[i] = magnitude - angle
+
+    def _get_window(
+            self,
+            blocksize: int,
+            previous_window_flag: int,
+            next_window_flag: int) -> np.ndarray:
+        """Method returns window for packet block
+
+        Window flags are used only for long blocks. Long window halves next
+        to short blocks are hybrid windows for lapping with short block"""
+        window_key = (blocksize, previous_window_flag, next_window_flag)
+
+        if window_key in self._windows:
+            return self._windows[window_key]
+
+        short_blocksize: int = self._logical_stream.blocksize_0
+        long_block: bool = blocksize != short_blocksize
+
+        if long_block and previous_window_flag == 0:
+            left_window_start = blocksize // 4 - short_blocksize // 4
+            left_n = short_blocksize // 2
+        else:
+            left_window_start = 0
+            left_n = blocksize // 2
+
+        if long_block and next_window_flag == 0:
+            right_window_start = blocksize * 3 // 4 - short_blocksize // 4
+            right_n = short_blocksize // 2
+        else:
+            right_window_start = blocksize // 2
+            right_n = blocksize // 2
+
+        window: np.ndarray = np.concatenate((
+            np.zeros(left_window_start),
+            np.sin(np.pi / 2 * np.sin(
+                (np.arange(left_n) + 0.5) / left_n * np.pi / 2) ** 2),
+            np.ones(right_window_start - left_window_start - left_n),
+            np.sin(np.pi / 2 * np.sin(
+                (np.arange(right_n) + 0.5) / right_n * np.pi / 2
+                + np.pi / 2) ** 2),
+            np.zeros(blocksize - right_window_start - right_n)))
+
+        self._windows[window_key] = window
+
+        return window
+
+    def _overlap_add(self, blocks: List[np.ndarray]) -> List[np.ndarray]:
+        """Method overlaps current windowed [blocks] with previous ones
+
+        Returns finished PCM data. Right halves of [blocks] are kept for
+        the next packet"""
+        blocksize: int = len(blocks[0])
+        previous_blocks = self._previous_blocks
+        self._previous_blocks = [block[blocksize // 2:] for block in blocks]
+
+        if previous_blocks is None:
+            return [np.zeros(0) for _ in blocks]
+
+        previous_half: int = len(previous_blocks[0])
+
+        # Quarter points of windows are aligned:
+        # previous block [3/4] is current block [1/4]
+        result_size: int = previous_half // 2 + blocksize // 4
+        shift: int = previous_half // 2 - blocksize // 4
+
+        result: List[np.ndarray] = []
+
+        for previous_block, block in zip(previous_blocks, blocks):
+            if shift >= 0:
+                # Previous block is long or has the same size
+                channel_data = previous_block[:result_size].copy()
+                channel_data[shift:] += block[:result_size - shift]
+            else:
+                # Previous block is short, current block is long
+                channel_data = block[-shift:result_size - shift].copy()
+                channel_data[:previous_half] += previous_block
+
+            result.append(channel_data)
+
+        return result
+
+
 class DataReader:
     """Class for low-level data reading
 
@@ -768,38 +1863,191 @@ class DataReader:
     byte 2: 15 14 13 12 11 10 09 08
     byte 3: 23 22 21 20 19 18 17 16
     etc.
+
+    Bits are taken from packet data by words: all bytes that cover requested
+    bits are loaded into one little-endian integer (accumulator) and
+    requested value is cut from it with shift and mask
     """
-    _current_packet: bytes
+    _current_packet: Union[bytes, memoryview]
     byte_pointer: int = 0
     bit_pointer: int = 0
 
-    def __init__(self, filename: Optional[str] = None, data: bytes = b''):
-        if filename is not None:
-            self._packets_reader = PacketsReader(filename)
+    # None if packets are given by [set_packet]
+    _packets_reader: Optional[PacketsReader] = None
+    # Global position of packet given by [set_packet]
+    _packet_byte_position: int = 0
+
+    # Packets of the last read pages run that are not read yet by
+    # [read_split_packet]
+    _pending_packets: Deque[Tuple[bytes, int, bool]]
+
+    # Granule position of page where current split packet ends. -1 if
+    # packet is not the last completed packet on its page
+    packet_granule_position: int = -1
+    # True if current split packet ends on the last page of stream
+    packet_on_last_page: bool = False
+
+    # Bits amount that is loaded into accumulator at once by
+    # [read_bits_many]
+    _ACCUMULATOR_SIZE: int = 64
+
+    def __init__(
+            self,
+            source: Optional[OggSource] = None,
+            data: bytes = b'',
+            use_mmap: bool = False,
+            crc_check: str = 'off',
+            tolerant: bool = False):
+        if source is not None:
+            if use_mmap:
+                self._packets_reader = MmapPacketsReader(
+                    source, crc_check, tolerant)
+            else:
+                self._packets_reader = PacketsReader(
+                    source, crc_check, tolerant)
 
         self._current_packet = data
+        self._pending_packets = deque()
 
     def close_file(self):
         """Method closes opened ogg-vorbis file"""
+        self._current_packet = b''
         self._packets_reader.close_file()
 
     def restart_file_reading(self):
         """Resets file and packet pointers to zero"""
         self.set_packet_global_position(0)
         self._current_packet = b''
+        self._pending_packets.clear()
         self.byte_pointer = 0
         self.bit_pointer = 0
 
     def set_packet_global_position(self, new_position: int):
         """Method moves global position of [byte_pointer] in audio file"""
         self._packets_reader.move_byte_position(new_position)
+        self._pending_packets.clear()
+
+    def select_vorbis_stream(self) -> Optional[int]:
+        """Method makes packets reader read only the first Vorbis logical
+        bitstream of file
+
+        Pages of other multiplexed logical bitstreams are skipped. Returns
+        serial number of selected logical bitstream or None if Vorbis
+        logical bitstream is not found"""
+        serial_number = self._packets_reader.find_vorbis_stream()
+        self._packets_reader.select_stream(serial_number)
+
+        return serial_number
+
+    def chained_stream_present(self, full_scan: bool = False) -> bool:
+        """Method checks if audio file contains chained logical bitstreams"""
+        return self._packets_reader.chained_stream_present(full_scan)
+
+    @property
+    def recovery_report(self) -> RecoveryReport:
+        """Report about damaged regions skipped in tolerant reading mode"""
+        return self._packets_reader.recovery_report
+
+    def find_last_granule_position(
+            self, end_position: Optional[int] = None) -> Optional[int]:
+        """Returns granule position of the last page of selected logical
+        bitstream found by a scan of file tail"""
+        return self._packets_reader.find_last_granule_position(end_position)
+
+    def find_chain_links(self) -> List[ChainLink]:
+        """Returns links of chained audio file found by page headers"""
+        return self._packets_reader.find_chain_links()
+
+    def select_stream(self, serial_number: Optional[int]):
+        """Method makes packets reader read only logical bitstream with
+        [serial_number]"""
+        self._packets_reader.select_stream(serial_number)
+        self._pending_packets.clear()
+
+    def get_reading_state(self) -> tuple:
+        """Returns state of reading which is restored by
+        [set_reading_state]"""
+        return (
+            self._packets_reader.get_reading_state(),
+            self._current_packet,
+            self.byte_pointer,
+            self.bit_pointer,
+            tuple(self._pending_packets),
+            self.packet_granule_position,
+            self.packet_on_last_page)
+
+    def set_reading_state(self, reading_state: tuple):
+        """Method restores state of reading returned by
+        [get_reading_state]"""
+        (packets_reader_state,
+         self._current_packet,
+         self.byte_pointer,
+         self.bit_pointer,
+         pending_packets,
+         self.packet_granule_position,
+         self.packet_on_last_page) = reading_state
+
+        self._packets_reader.set_reading_state(packets_reader_state)
+        self._pending_packets = deque(pending_packets)
+
+    def seek_granule(
+            self,
+            granule: int,
+            start_position: int = 0,
+            end_position: Optional[int] = None):
+        """Method moves reading to the packets with sample [granule]"""
+        self._packets_reader.seek_granule(
+            granule, start_position, end_position)
+        self._current_packet = b''
+        self._pending_packets.clear()
+        self.byte_pointer = 0
+        self.bit_pointer = 0
+
+    @property
+    def current_packet(self) -> Union[bytes, memoryview]:
+        """Data of current packet"""
+        return self._current_packet
+
+    def get_next_packet_global_position(self) -> int:
+        """Returns global position of the next packet's beginning"""
+        return self._packets_reader.opened_file.tell()
 
     def get_packet_global_position(self) -> int:
         """Returns global position of current packet's beginning"""
+        if self._packets_reader is None:
+            return self._packet_byte_position
+
         return (
             self._packets_reader.opened_file.tell()
             - len(self._current_packet))
 
+    def get_packet_position(self) -> Tuple[int, int]:
+        """Returns current position in current packet
+
+        Returns in format: (<byte>, <bit in this byte>)"""
+        return self.byte_pointer, self.bit_pointer
+
+    def get_bits_since(
+            self, byte_position: int, bit_position: int) -> Tuple[int, bytes]:
+        """Returns bits of current packet from position to current position
+
+        Position is given as by [get_packet_position]. Bits are returned in
+        format: (<bits amount>, <bits as little-endian bytes>). Bits are
+        shifted to the beginning of the first byte, so equal bits read from
+        different bit positions are returned equally"""
+        bits_count: int = (
+            (self.byte_pointer - byte_position) * 8
+            + self.bit_pointer - bit_position)
+        assert bits_count >= 0
+
+        bits: int = (int.from_bytes(
+            self._current_packet[
+                byte_position:self.byte_pointer + (self.bit_pointer > 0)],
+            byteorder='little') >> bit_position) & ((1 << bits_count) - 1)
+
+        return bits_count, bits.to_bytes(
+            (bits_count + 7) >> 3, byteorder='little')
+
     def get_current_global_position(self) -> Tuple[int, int]:
         """Returns current global position
 
@@ -812,19 +2060,60 @@ class DataReader:
     def read_packet(self):
         """Method reads packet from [packets_reader]"""
         self._current_packet = self._packets_reader.read_packet()[0]
+        self._pending_packets.clear()
+        self.byte_pointer = self.bit_pointer = 0
+
+    def set_packet(
+            self, data: Union[bytes, memoryview], byte_position: int = 0):
+        """Method makes [data] current packet
+
+        Used when packets are read not by [packets_reader]. [byte_position]
+        is global position of packet"""
+        self._current_packet = data
+        self._packet_byte_position = byte_position
+        self._pending_packets.clear()
+        self.byte_pointer = self.bit_pointer = 0
+
+    def read_split_packet(self):
+        """Method reads next packet split from pages by lacing values
+
+        Unlike [read_packet], packets that share pages are read one by one.
+        [packet_granule_position] and [packet_on_last_page] are set for read
+        packet"""
+        while len(self._pending_packets) == 0:
+            self._pending_packets.extend(self._packets_reader.read_packets())
+
+        (self._current_packet,
+         self.packet_granule_position,
+         self.packet_on_last_page) = self._pending_packets.popleft()
         self.byte_pointer = self.bit_pointer = 0
 
     def read_bytes(self, bytes_count: int) -> bytes:
         """Method reads and return several bytes from current packet
 
-        IMPORTANT: method gives bytes in order: 1 2 3 4 5 6!"""
+        IMPORTANT: method gives bytes in order: 1 2 3 4 5 6!
+
+        If bit pointer is on byte boundary then bytes are a slice of packet
+        data, bits are not converted"""
         assert bytes_count >= 0
 
-        read_bytes = b''
-        for i in range(bytes_count):
-            read_bytes += bytes([int(self._read_bits(8), 2)])
+        if self.bit_pointer == 0:
+            bytes_end: int = self.byte_pointer + bytes_count
+
+            if bytes_end > len(self._current_packet):
+                self.byte_pointer = len(self._current_packet)
 
-        return read_bytes
+                raise EndOfPacketException(
+                    'End of packet condition triggered')
+
+            result_bytes = bytes(
+                self._current_packet[self.byte_pointer:bytes_end])
+            self.byte_pointer = bytes_end
+
+            return result_bytes
+
+        return self.read_bits_for_int(bytes_count * 8).to_bytes(
+            bytes_count, byteorder='little')
 
     def read_bits_for_int(
             self, bits_count: int, signed: bool = False) -> int:
@@ -834,14 +2123,82 @@ class DataReader:
         value"""
         assert bits_count >= 0
 
-        number = self._read_bits(bits_count)
+        if bits_count == 0:
+            return 0
 
-        if not signed or number[0] == '0':
-            return int(number, 2)
-        else:
-            number = int(number, 2) - 1
-            return -(number
-                     ^ int(''.join(['1'] * bits_count), 2))
+        bits_end: int = self.bit_pointer + bits_count
+        bytes_end: int = self.byte_pointer + ((bits_end + 7) >> 3)
+
+        if bytes_end > len(self._current_packet):
+            self.byte_pointer = len(self._current_packet)
+            self.bit_pointer = 0
+
+            raise EndOfPacketException('End of packet condition triggered')
+
+        accumulator: int = int.from_bytes(
+            self._current_packet[self.byte_pointer:bytes_end],
+            byteorder='little')
+        number: int = (accumulator >> self.bit_pointer) & (
+            (1 << bits_count) - 1)
+
+        self.byte_pointer += bits_end >> 3
+        self.bit_pointer = bits_end & 7
+
+        if signed and number >> (bits_count - 1):
+            return number - (1 << bits_count)
+
+        return number
+
+    def read_bits_many(self, count: int, width: int) -> List[int]:
+        """Reads [count] unsigned int values of [width] bits each
+
+        Values are taken from accumulator of [_ACCUMULATOR_SIZE] bits. So
+        one read of packet data serves several values"""
+        assert count >= 0 and width >= 0
+
+        if width == 0:
+            return [0] * count
+
+        mask: int = (1 << width) - 1
+        values_per_word: int = max(1, self._ACCUMULATOR_SIZE // width)
+        result_values: List[int] = []
+
+        for word_start in range(0, count, values_per_word):
+            values_amount: int = min(values_per_word, count - word_start)
+            accumulator: int = self.read_bits_for_int(values_amount * width)
+
+            result_values.extend(
+                (accumulator >> (i * width)) & mask
+                for i in range(values_amount))
+
+        return result_values
+
+    def peek_bits(self, bits_count: int) -> int:
+        """Returns next [bits_count] bits of current packet as unsigned int
+
+        Pointers are not moved. Bits after the end of packet are zeros"""
+        bits_end: int = self.bit_pointer + bits_count
+
+        return (int.from_bytes(
+            self._current_packet[
+                self.byte_pointer:self.byte_pointer + ((bits_end + 7) >> 3)],
+            byteorder='little') >> self.bit_pointer) & ((1 << bits_count) - 1)
+
+    def skip_bits(self, bits_count: int):
+        """Moves pointers forward by [bits_count] bits"""
+        bits_end: int = self.bit_pointer + bits_count
+        new_byte_pointer: int = self.byte_pointer + (bits_end >> 3)
+
+        if (new_byte_pointer > len(self._current_packet)
+                or (new_byte_pointer == len(self._current_packet)
+                    and bits_end & 7 != 0)):
+            self.byte_pointer = len(self._current_packet)
+            self.bit_pointer = 0
+
+            raise EndOfPacketException('End of packet condition triggered')
+
+        self.byte_pointer = new_byte_pointer
+        self.bit_pointer = bits_end & 7
 
     def _read_bits(self, bits_count: int) -> str:
         """Method reads and return several bits from current packet data
@@ -849,19 +2206,17 @@ class DataReader:
         IMPORTANT: method gives bits in order: 6 5 4 3 2 1!"""
         assert bits_count >= 0
 
-        read_bits = ''
-        for i in range(bits_count):
-            read_bits = str(self.read_bit()) + read_bits
+        if bits_count == 0:
+            return ''
 
-        return read_bits
+        return bin(self.read_bits_for_int(bits_count))[2:].zfill(bits_count)
 
     def read_bit(self) -> int:
         """Method reads and return one bit from current packet data"""
-        required_bit = 1
         try:
-            if (self._current_packet[self.byte_pointer]
-                    & (1 << self.bit_pointer) == 0):
-                required_bit = 0
+            required_bit = (
+                self._current_packet[self.byte_pointer]
+                >> self.bit_pointer) & 1
         except IndexError:
             raise EndOfPacketException('End of packet condition triggered')
 
@@ -1,3 +1,6 @@
+from typing import List
+
+
 def ilog(x: int) -> int:
     """Returns number of the highest set bit
 
@@ -54,3 +57,65 @@ def bit_reverse(n: int) -> int:
     n = ((n & 0xFF00FF00) >> 8) | ((n & 0x00FF00FF) << 8)
 
     return ((n >> 16) | (n << 16)) & ((1 << 32) - 1)
+
+
+def low_neighbor(v: List[int], x: int) -> int:
+    """Returns position of the greatest value less than [v][[x]]
+
+    Only positions less than [x] are checked"""
+    return max(
+        (n for n in range(x) if v[n] < v[x]), key=lambda n: v[n])
+
+
+def high_neighbor(v: List[int], x: int) -> int:
+    """Returns position of the least value greater than [v][[x]]
+
+    Only positions less than [x] are checked"""
+    return min(
+        (n for n in range(x) if v[n] > v[x]), key=lambda n: v[n])
+
+
+def render_point(x0: int, y0: int, x1: int, y1: int, x: int) -> int:
+    """Returns Y value at [x] of line from ([x0], [y0]) to ([x1], [y1])
+
+    Integer arithmetic is used as in docs"""
+    dy = y1 - y0
+    adx = x1 - x0
+    off = abs(dy) * (x - x0) // adx
+
+    if dy < 0:
+        return y0 - off
+
+    return y0 + off
+
+
+def render_line(x0: int, y0: int, x1: int, y1: int, v: List[int]):
+    """Renders line from ([x0], [y0]) to ([x1], [y1]) into vector [v]
+
+    Last point of line is not rendered. Points outside [v] are not
+    rendered too"""
+    dy = y1 - y0
+    adx = x1 - x0
+    ady = abs(dy)
+    # Division is rounded toward zero as in docs
+    base = ady // adx if dy >= 0 else -(ady // adx)
+    sy = base - 1 if dy < 0 else base + 1
+    ady -= abs(base) * adx
+
+    y = y0
+    err = 0
+    x_end = min(x1, len(v))
+
+    if x0 < x_end:
+        v[x0] = y
+
+    for x in range(x0 + 1, x_end):
+        err += ady
+
+        if err >= adx:
+            err -= adx
+            y += sy
+        else:
+            y += base
+
+        v[x] = y
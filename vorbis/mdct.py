@@ -0,0 +1,109 @@
+from typing import List, Dict, Tuple, Union
+
+import numpy as np
+
+from .helper_funcs import bit_reverse
+
+
+class _TransformTables:
+    """Precomputed data for inverse MDCT of one size
+
+    Tables are computed once per distinct blocksize and reused for every
+    block of this size"""
+    # Twiddles of DCT-IV before and after FFT
+    pre_twiddles: np.ndarray
+    post_twiddles: np.ndarray
+
+    # Bit-reverse permutation of FFT input
+    fft_permutation: np.ndarray
+
+    # Twiddles of every FFT stage. Item number is stage number
+    fft_stage_twiddles: List[np.ndarray]
+
+    def __init__(self, dct4_size: int):
+        fft_size = dct4_size // 2
+        fft_bits = fft_size.bit_length() - 1
+
+        self.pre_twiddles = np.exp(
+            -1j * np.pi * (np.arange(fft_size) + 0.25) / dct4_size)
+        self.post_twiddles = np.exp(
+            -1j * np.pi * np.arange(fft_size) / dct4_size)
+
+        self.fft_permutation = np.array(
+            [bit_reverse(i) >> (32 - fft_bits) if fft_bits != 0 else 0
+             for i in range(fft_size)],
+            dtype=np.intp)
+
+        self.fft_stage_twiddles = []
+        span = 1
+        while span < fft_size:
+            self.fft_stage_twiddles.append(
+                np.exp(-1j * np.pi * np.arange(span) / span))
+            span *= 2
+
+
+# Key is size of inverse MDCT input
+_transform_tables: Dict[int, _TransformTables] = {}
+
+
+def _get_transform_tables(half_blocksize: int) -> _TransformTables:
+    """Returns cached tables for inverse MDCT of [half_blocksize] values"""
+    if half_blocksize not in _transform_tables:
+        _transform_tables[half_blocksize] = _TransformTables(half_blocksize)
+
+    return _transform_tables[half_blocksize]
+
+
+def imdct(coefficients: Union[np.ndarray, List[float]]) -> np.ndarray:
+    """Returns inverse MDCT of [coefficients]
+
+    Output has twice more values than input. From docs formula:
+    y[n] = sum(X[k] * cos(2*pi/N * (n + 1/2 + N/4) * (k + 1/2)))
+    where N is output size. No scaling is applied.
+
+    Transform is computed through DCT-IV of the same size as input. Output
+    is DCT-IV result unfolded with symmetries of cosine"""
+    coefficients = np.asarray(coefficients, dtype=np.float64)
+    quarter_n = len(coefficients) // 2
+
+    dct4 = _dct4(coefficients, _get_transform_tables(len(coefficients)))
+
+    # y[n] = u[n + N/4] where u is DCT-IV result continued as
+    # u[m] = -u[N - 1 - m] for N/2 <= m < N and u[m] = -u[m - N] for m >= N
+    return np.concatenate(
+        (dct4[quarter_n:], -dct4[::-1], -dct4[:quarter_n]))
+
+
+def _dct4(x: np.ndarray, tables: _TransformTables) -> np.ndarray:
+    """Returns DCT-IV of [x]
+
+    u[m] = sum(x[k] * cos(pi/M * (m + 1/2) * (k + 1/2))) where M is size of
+    [x]. Computed through complex FFT of size M/2"""
+    spectrum = _fft(
+        (x[0::2] + 1j * x[::-2]) * tables.pre_twiddles,
+        tables) * tables.post_twiddles
+
+    result = np.empty(len(x))
+    result[0::2] = spectrum.real
+    result[::-2] = -spectrum.imag
+
+    return result
+
+
+def _fft(values: np.ndarray, tables: _TransformTables) -> np.ndarray:
+    """Returns discrete Fourier transform of [values]
+
+    Iterative radix-2 algorithm. Every stage is computed for all butterflies
+    at once"""
+    result = values[tables.fft_permutation]
+    span = 1
+
+    for twiddles in tables.fft_stage_twiddles:
+        blocks = result.reshape(-1, 2, span)
+        even = blocks[:, 0, :]
+        odd = blocks[:, 1, :] * twiddles
+
+        result = np.stack((even + odd, even - odd), axis=1)
+        span *= 2
+
+    return result.reshape(-1)
@@ -1,6 +1,28 @@
-from typing import List, BinaryIO, Tuple
+from typing import (
+    List,
+    BinaryIO,
+    Tuple,
+    Set,
+    Optional,
+    Union,
+    Dict,
+    Iterator,
+    AsyncIterator,
+    Deque,
+    Any)
+from os import PathLike
+from io import BytesIO
+from struct import Struct
+from array import array
+from bisect import bisect_left, bisect_right
+from mmap import mmap, ACCESS_READ
+from zlib import crc32 as zlib_crc32
+from warnings import warn
+from copy import copy
+from collections import deque
 
 from vorbis import ProgramException
+from .helper_funcs import bit_reverse
 
 
 class FileDataException(ProgramException):
@@ -18,110 +40,1350 @@ class UnexpectedEndOfFileError(CorruptedFileDataError):
     pass
 
 
-class PacketsReader:
+class PageChecksumError(CorruptedFileDataError):
+    """Raises when page checksum is wrong in 'strict' checksum mode"""
+    pass
+
+
+class PageChecksumWarning(UserWarning):
+    """Issued when page checksum is wrong in 'warn' checksum mode"""
+    pass
+
+
+# Modes of page checksum verification
+CRC_CHECK_MODES: Tuple[str, ...] = ('strict', 'warn', 'off')
+
+# Byte values with reversed bits order
+_BIT_REVERSED_BYTES: bytes = bytes(bit_reverse(i) >> 24 for i in range(256))
+
+
+def ogg_crc(data: bytes, crc: int = 0) -> int:
+    """Returns Ogg CRC-32 of [data] continuing checksum [crc]
+
+    Ogg CRC uses polynomial 0x04c11db7 without reflection of bits, zero
+    initial value and no final xor. Bits of every byte are reversed by
+    translation table, so table-driven CRC-32 of zlib (reflected form of the
+    same polynomial) gives Ogg CRC with reversed bits"""
+    return bit_reverse(
+        zlib_crc32(
+            bytes(data).translate(_BIT_REVERSED_BYTES),
+            bit_reverse(crc) ^ 0xFFFFFFFF)
+        ^ 0xFFFFFFFF)
+
+
+# Ogg data can be given as a filename, as in-memory data or as a seekable
+# binary file object
+OggSource = Union[str, PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+def get_source_name(source: OggSource) -> str:
+    """Returns name of [source] for messages"""
+    if isinstance(source, (str, PathLike)):
+        return str(source)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return '<in-memory data>'
+
+    return str(getattr(source, 'name', '<file object>'))
+
+
+class RecoveryReport:
+    """Contains data about damaged regions skipped in tolerant reading
+    mode"""
+    # Skipped byte ranges: (<first skipped byte>, <byte after the last
+    # skipped>)
+    skipped_ranges: List[Tuple[int, int]]
+
+    # Number of pages missing by page sequence numbers
+    lost_pages: int
+
+    # Number of packets which data was dropped because some of their pages
+    # were lost. Packets that are wholly on lost pages are not counted
+    lost_packets: int
+
+    def __init__(self):
+        self.skipped_ranges = []
+        self.lost_pages = 0
+        self.lost_packets = 0
+
+
+class PageHeader:
+    """Contains ogg page header data"""
+    # Fixed part of page header: capture_pattern, stream_structure_version,
+    # header_type_flag, absolute_granule_position, stream_serial_number,
+    # page_sequence_number, page_checksum, page_segments
+    FIXED_PART: Struct = Struct('<4sBBqIIIB')
+
+    # Maximum size of the whole page: fixed part, 255 segments in segment
+    # table and 255 bytes in every segment
+    MAX_PAGE_SIZE: int = 27 + 255 + 255 * 255
+
+    byte_position: int
+    stream_structure_version: int
+    header_type_flag: int
+    absolute_granule_position: int
+    stream_serial_number: int
+    page_sequence_number: int
+    page_checksum: int
+    page_segments: int
+    segment_table: bytes
+
+    def __init__(self, byte_position: int, buffer: bytes, offset: int = 0):
+        """Parses fixed part of page header from [buffer] on [offset]"""
+        if buffer[offset:offset + 4] != b'OggS':
+            raise CorruptedFileDataError(
+                'Missing ogg capture pattern. Byte position: '
+                + str(byte_position))
+
+        if len(buffer) - offset < self.FIXED_PART.size:
+            raise UnexpectedEndOfFileError()
+
+        (_,
+         self.stream_structure_version,
+         self.header_type_flag,
+         self.absolute_granule_position,
+         self.stream_serial_number,
+         self.page_sequence_number,
+         self.page_checksum,
+         self.page_segments) = self.FIXED_PART.unpack_from(buffer, offset)
+
+        self.byte_position = byte_position
+        self.segment_table = b''
+
+    @property
+    def continued_packet(self) -> bool:
+        """Page starts with continuation of packet from previous page"""
+        return (self.header_type_flag & 1) == 1
+
+    @property
+    def first_page(self) -> bool:
+        """Page is the first page of logical bitstream (BOS)"""
+        return (self.header_type_flag & 2) == 2
+
+    @property
+    def last_page(self) -> bool:
+        """Page is the last page of logical bitstream (EOS)"""
+        return (self.header_type_flag & 4) == 4
+
+    @property
+    def header_size(self) -> int:
+        return self.FIXED_PART.size + len(self.segment_table)
+
+    @property
+    def data_size(self) -> int:
+        return sum(self.segment_table)
+
+    @property
+    def page_size(self) -> int:
+        return self.header_size + self.data_size
+
+    def compute_checksum(self, page_data: bytes) -> int:
+        """Returns checksum of page with [page_data]
+
+        Checksum is computed over the whole page with zeroed checksum
+        field"""
+        header_crc = ogg_crc(
+            self.FIXED_PART.pack(
+                b'OggS',
+                self.stream_structure_version,
+                self.header_type_flag,
+                self.absolute_granule_position,
+                self.stream_serial_number,
+                self.page_sequence_number,
+                0,
+                self.page_segments)
+            + self.segment_table)
+
+        return ogg_crc(page_data, header_crc)
+
+    def packet_spans(self) -> List[Tuple[int, int, bool]]:
+        """Returns spans of packets in page data by lacing values
+
+        Every span is (<start>, <end>, <packet is completed on this page>).
+        Lacing value less than 255 completes a packet"""
+        result_spans: List[Tuple[int, int, bool]] = []
+        span_start = span_end = 0
+
+        for lacing_value in self.segment_table:
+            span_end += lacing_value
+
+            if lacing_value < 255:
+                result_spans.append((span_start, span_end, True))
+                span_start = span_end
+
+        if span_start != span_end or (
+                len(self.segment_table) != 0
+                and self.segment_table[-1] == 255):
+            result_spans.append((span_start, span_end, False))
+
+        return result_spans
+
+
+class OggPacket:
+    """Contains data of one packet split from pages by lacing values"""
+    # Packet data. Slice of pages data, not a copy
+    data: memoryview
+
+    # Global position of the first byte of packet
+    byte_position: int
+
+    # Sequence number of page where packet ends
+    page_sequence_number: int
+
+    # Granule position of page where packet ends. -1 if packet is not the
+    # last packet completed on its page
+    granule_position: int
+
+    # True if packet begins on previous page
+    continued: bool
+
+    # True if packet is on the first page of logical bitstream
+    first_page: bool
+
+    # True if packet ends on the last page of logical bitstream
+    last_page: bool
+
+    def __init__(self, data: memoryview, byte_position: int):
+        self.data = data
+        self.byte_position = byte_position
+
+
+class PageIndex:
+    """Contains compact data about every page of file
+
+    Every page is an item in arrays below, so page data is accessed by page
+    number in file (not by [page_sequence_number])"""
+    byte_positions: array
+    absolute_granule_positions: array
+    stream_serial_numbers: array
+    page_sequence_numbers: array
+    header_type_flags: array
+    # Sum of segment table of page, i.e. page data size
+    data_sizes: array
+    # Byte position where the last indexed page ends
+    end_position: int
+
+    def __init__(self):
+        self.byte_positions = array('q')
+        self.absolute_granule_positions = array('q')
+        self.stream_serial_numbers = array('I')
+        self.page_sequence_numbers = array('I')
+        self.header_type_flags = array('B')
+        self.data_sizes = array('I')
+        self.end_position = 0
+
+    def __len__(self) -> int:
+        return len(self.byte_positions)
+
+    def append(self, page_header: PageHeader):
+        """Method adds page to the end of index"""
+        self.byte_positions.append(page_header.byte_position)
+        self.absolute_granule_positions.append(
+            page_header.absolute_granule_position)
+        self.stream_serial_numbers.append(page_header.stream_serial_number)
+        self.page_sequence_numbers.append(page_header.page_sequence_number)
+        self.header_type_flags.append(page_header.header_type_flag)
+        self.data_sizes.append(page_header.data_size)
+        self.end_position = (
+            page_header.byte_position + page_header.page_size)
+
+    def page_containing(self, position: int) -> Optional[int]:
+        """Returns number of page which contains byte on [position]
+
+        Returns None if [position] is out of indexed pages"""
+        if not 0 <= position < self.end_position:
+            return None
+
+        return bisect_right(self.byte_positions, position) - 1
+
+    def fresh_packet_page(self, page_number: int) -> int:
+        """Returns number of the nearest page with fresh packet beginning
+
+        Page is searched up from [page_number] including it among pages of
+        the same logical bitstream"""
+        serial_number = self.stream_serial_numbers[page_number]
+
+        while self.header_type_flags[page_number] & 1:
+            previous_page = self.stream_page_at_or_before(
+                page_number - 1, serial_number)
+
+            if previous_page is None:
+                raise CorruptedFileDataError(
+                    '[header_type_flag]: 0x01 flag is set on '
+                    'first page of logical bitstream')
+            page_number = previous_page
+
+        return page_number
+
+    def stream_page_at_or_before(
+            self, page_number: int, serial_number: int) -> Optional[int]:
+        """Returns number of the last page of logical bitstream with
+        [serial_number] among pages up to [page_number] including it
+
+        Returns None if there is no such page"""
+        while page_number >= 0:
+            if self.stream_serial_numbers[page_number] == serial_number:
+                return page_number
+            page_number -= 1
+
+        return None
+
+
+class ChainLink:
+    """Contains data of one link of chained file
+
+    Link begins with a group of pages with BOS flag and lasts until the next
+    such group or the end of file. Data is taken from page headers only"""
+    # Serial number of Vorbis logical bitstream of link. None if link has
+    # no Vorbis logical bitstream
+    stream_serial_number: Optional[int]
+
+    # Global position of the first page of Vorbis logical bitstream. -1 if
+    # link has no Vorbis logical bitstream
+    stream_byte_position: int
+
+    # (<first byte of link>, <byte after the last page of link>)
+    byte_range: Tuple[int, int]
+
+    # (<first>, <last>) granule positions of Vorbis logical bitstream pages.
+    # (-1, -1) if there are no pages with granule position
+    granule_range: Tuple[int, int]
+
+    # True if the last page of Vorbis logical bitstream is marked as last
+    ended: bool
+
+    def __init__(self, byte_range: Tuple[int, int]):
+        self.byte_range = byte_range
+        self.stream_serial_number = None
+        self.stream_byte_position = -1
+        self.granule_range = (-1, -1)
+        self.ended = False
+
+
+class OggPageSyncer:
+    """Class for incremental reading of pages and packets
+
+    Data is fed by chunks of any size and complete pages or packets are
+    returned as soon as they are available. Syncer never seeks. Only data of
+    incomplete page (not more than [PageHeader.MAX_PAGE_SIZE] bytes) and
+    incomplete packet are kept between chunks.
+
+    Use either [feed] or [feed_packets] with one syncer: pages returned by
+    [feed] are not assembled into packets"""
+    _buffer: bytearray
+    # Global position of [_buffer] beginning
+    _byte_position: int
+    # Last page sequence number of every logical bitstream
+    _last_pages: Dict[int, int]
+    # Header of the last page of every logical bitstream
+    _last_page_headers: Dict[int, PageHeader]
+
+    _packet_parts: List[bytes]
+    _packet_pages: List[int]
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._byte_position = 0
+        self._last_pages = {}
+        self._last_page_headers = {}
+
+        self._packet_parts = []
+        self._packet_pages = []
+
+    def feed(self, chunk: bytes) -> List[Tuple[PageHeader, bytes]]:
+        """Method adds [chunk] to data and returns completed pages
+
+        Every page is returned as (<page header>, <page data>). If data is
+        damaged then pages before damaged data are consumed before error is
+        raised, so they are not parsed again"""
+        self._buffer += chunk
+        result_pages: List[Tuple[PageHeader, bytes]] = []
+        offset = 0
+
+        try:
+            while True:
+                if len(self._buffer) - offset < PageHeader.FIXED_PART.size:
+                    self._check_capture_pattern(offset)
+                    break
+
+                page_header = PageHeader(
+                    self._byte_position + offset, self._buffer, offset)
+
+                segment_table_start = offset + PageHeader.FIXED_PART.size
+                data_start = segment_table_start + page_header.page_segments
+                if data_start > len(self._buffer):
+                    break
+
+                page_header.segment_table = bytes(
+                    self._buffer[segment_table_start:data_start])
+                data_end = data_start + page_header.data_size
+                if data_end > len(self._buffer):
+                    break
+
+                self._register_page(page_header)
+                result_pages.append(
+                    (page_header, bytes(self._buffer[data_start:data_end])))
+                offset = data_end
+        finally:
+            del self._buffer[:offset]
+            self._byte_position += offset
+
+        return result_pages
+
+    def feed_packets(self, chunk: bytes) -> List[Tuple[bytes, List[int]]]:
+        """Method adds [chunk] to data and returns completed packets
+
+        Every packet is returned as (<packet data>, <packet pages>), as
+        [PacketsReader.read_packet] does. Packet data is split by lacing
+        values, so several packets can be returned for one page"""
+        result_packets: List[Tuple[bytes, List[int]]] = []
+
+        for page_header, page_data in self.feed(chunk):
+            if page_header.continued_packet != bool(self._packet_parts):
+                if self._packet_parts:
+                    raise CorruptedFileDataError(
+                        'Continuation of packet is missing on page '
+                        + str(page_header.page_sequence_number))
+
+                # Syncing was started in the middle of packet
+                page_spans = page_header.packet_spans()[1:]
+            else:
+                page_spans = page_header.packet_spans()
+
+            for span_start, span_end, packet_completed in page_spans:
+                self._packet_parts.append(page_data[span_start:span_end])
+                self._packet_pages.append(page_header.page_sequence_number)
+
+                if packet_completed:
+                    result_packets.append(
+                        (b''.join(self._packet_parts), self._packet_pages))
+                    self._packet_parts = []
+                    self._packet_pages = []
+
+        return result_packets
+
+    def finish(self):
+        """Method checks that all fed data was consumed
+
+        Call it when data source is exhausted"""
+        if self._buffer or self._packet_parts:
+            raise UnexpectedEndOfFileError()
+
+        if any(not page_header.last_page
+               for page_header in self._last_page_headers.values()):
+            raise CorruptedFileDataError(
+                'Last page is not marked as last '
+                '(in non corrupted part of file data)')
+
+    def _check_capture_pattern(self, offset: int):
+        """Method checks capture pattern of incomplete page header"""
+        pattern_part = self._buffer[offset:offset + 4]
+
+        if pattern_part != b'OggS'[:len(pattern_part)]:
+            raise CorruptedFileDataError(
+                'Missing ogg capture pattern. Byte position: '
+                + str(self._byte_position + offset))
+
+    def _register_page(self, page_header: PageHeader):
+        """Method checks number of new page
+
+        Page numbers are counted for every logical bitstream separately,
+        so pages of multiplexed logical bitstreams can be interleaved"""
+        serial_number = page_header.stream_serial_number
+        last_page = self._last_pages.get(serial_number)
+
+        if (last_page is not None and not page_header.first_page
+                and page_header.page_sequence_number != last_page + 1):
+            raise CorruptedFileDataError(
+                'Page(s) is(are) missing!\n'
+                'Previous last page: ' + str(last_page)
+                + '\nCurrent page: '
+                + str(page_header.page_sequence_number)
+                + '\nCurrent byte position: '
+                + str(page_header.byte_position))
+
+        self._last_pages[serial_number] = page_header.page_sequence_number
+        self._last_page_headers[serial_number] = page_header
+
+
+class AbstractPacketsReader:
+    """Class with common data and methods of packets readers
+
+    Reader checks page sequence numbers and checksums of read pages and
+    splits pages runs into packets"""
+    _packet_pages: List[int]
+    _packet_page_headers: List[PageHeader]
+
+    # Last read page sequence number of every logical bitstream
+    _last_pages: Dict[int, int]
+
+    # Serial number of logical bitstream which packets are read. Pages of
+    # other logical bitstreams are skipped. None if pages of all logical
+    # bitstreams are read
+    stream_serial_number: Optional[int]
+
+    # True if the last read page of [stream_serial_number] stream is marked
+    # as last
+    _stream_ended: bool
+
+    # Mode of page checksum verification: 'strict' raises PageChecksumError,
+    # 'warn' issues PageChecksumWarning, 'off' skips verification
+    crc_check: str
+
+    # If True then missing pages are not an error
+    tolerant: bool = False
+
+    def __init__(self, crc_check: str = 'off'):
+        assert crc_check in CRC_CHECK_MODES
+
+        self.crc_check = crc_check
+
+        self._packet_pages = []
+        self._packet_page_headers = []
+        self._last_pages = {}
+        self.stream_serial_number = None
+        self._stream_ended = False
+
+    def _split_pages_run(self, run_data: bytes) -> List[OggPacket]:
+        """Method splits data of the last read pages run into packets
+
+        Lacing value less than 255 ends a packet. Data of packet which is not
+        completed in the run is dropped"""
+        run_view = memoryview(run_data)
+        packets: List[OggPacket] = []
+        packet_start = page_start = 0
+        packet_position: Optional[int] = None
+        packet_first_page: Optional[PageHeader] = None
+
+        for page_header in self._packet_page_headers:
+            data_position = page_header.byte_position + page_header.header_size
+            page_packet: Optional[OggPacket] = None
+
+            for span_start, span_end, completed in page_header.packet_spans():
+                if packet_position is None:
+                    packet_position = data_position + span_start
+                    packet_first_page = page_header
+
+                if not completed:
+                    continue
+
+                page_packet = OggPacket(
+                    run_view[packet_start:page_start + span_end],
+                    packet_position)
+                page_packet.page_sequence_number = (
+                    page_header.page_sequence_number)
+                page_packet.granule_position = -1
+                page_packet.continued = packet_first_page is not page_header
+                page_packet.first_page = packet_first_page.first_page
+                page_packet.last_page = page_header.last_page
+                packets.append(page_packet)
+
+                packet_start = page_start + span_end
+                packet_position = None
+
+            # Granule position belongs to the last packet completed on page
+            if page_packet is not None:
+                page_packet.granule_position = (
+                    page_header.absolute_granule_position)
+
+            page_start += page_header.data_size
+
+        return packets
+
+    def _check_page_checksum(self, page_header: PageHeader, page_data: bytes):
+        """Method verifies checksum of page by [crc_check] mode"""
+        if (self.crc_check == 'off'
+                or page_header.compute_checksum(page_data)
+                == page_header.page_checksum):
+            return
+
+        message = (
+            'Page checksum mismatch. Byte position: '
+            + str(page_header.byte_position))
+
+        if self.crc_check == 'strict':
+            raise PageChecksumError(message)
+
+        warn(message, PageChecksumWarning)
+
+    def _register_page(self, page_header: PageHeader):
+        """Method adds page to current packet pages checking its number
+
+        Page numbers are counted for every logical bitstream separately.
+        Counter is reset by the first page of logical bitstream. Missing
+        pages are not an error in [tolerant] mode"""
+        page_counter = page_header.page_sequence_number
+        self._packet_pages.append(page_counter)
+        self._packet_page_headers.append(page_header)
+
+        lost_pages = self._lost_pages_before(page_header)
+
+        if not self.tolerant and lost_pages != 0:
+            raise CorruptedFileDataError(
+                'Page(s) is(are) missing!\n'
+                'Previous last page: ' + str(page_counter - lost_pages - 1)
+                + '\nCurrent page: ' + str(page_counter)
+                + '\nCurrent byte position: ' + str(
+                    page_header.byte_position))
+        self._last_pages[page_header.stream_serial_number] = page_counter
+        self._stream_ended = page_header.last_page
+
+    def _lost_pages_before(self, page_header: PageHeader) -> int:
+        """Returns number of pages of logical bitstream missing between its
+        last read page and page with [page_header]
+
+        Negative number means that page is repeated or out of order"""
+        last_page = self._last_pages.get(page_header.stream_serial_number, -1)
+        if page_header.first_page:
+            last_page = -1
+
+        return page_header.page_sequence_number - last_page - 1
+
+    def select_stream(self, serial_number: Optional[int]):
+        """Method sets logical bitstream which packets are read
+
+        Pages of other logical bitstreams are skipped. If [serial_number] is
+        None then pages of all logical bitstreams are read"""
+        self.stream_serial_number = serial_number
+
+    def _foreign_page(self, page_header: PageHeader) -> bool:
+        """Returns True if page is not a page of [stream_serial_number]
+        logical bitstream"""
+        return (self.stream_serial_number is not None
+                and page_header.stream_serial_number
+                != self.stream_serial_number)
+
+
+class PacketsReader(AbstractPacketsReader):
     """Class for reading packets"""
     opened_file: BinaryIO
 
-    _current_packet_data: bytes
-    _packet_pages: List[int]
-    _last_page: int
+    _current_packet_data: bytes
+
+    _page_index: Optional[PageIndex]
+
+    # Checked page which begins the next pages run in [tolerant] mode. It
+    # is returned by [_read_valid_page] without reading and checking again
+    # if byte pointer is still on its beginning
+    _carried_page: Optional[Tuple[PageHeader, bytes]]
+
+    # If True then damaged regions of file are skipped instead of raising
+    # errors. Checksums are always verified in this mode
+    tolerant: bool
+    recovery_report: RecoveryReport
+
+    # Size of chunks in which next page is searched after damaged region
+    RESYNC_CHUNK_SIZE: int = 1 << 16
+
+    # Initial size of file tail in which the last page is searched
+    TAIL_WINDOW_SIZE: int = 1 << 12
+
+    def __init__(
+            self,
+            source: OggSource,
+            crc_check: str = 'off',
+            tolerant: bool = False):
+        super().__init__(crc_check)
+
+        self.tolerant = tolerant
+        self.recovery_report = RecoveryReport()
+
+        # File objects given by caller are not closed by reader
+        self._file_is_owned = not hasattr(source, 'read')
+        self.opened_file = self._open_file(source)
+
+        self._current_packet_data = b''
+        self._page_index = None
+        self._carried_page = None
+
+        if not self._ogg_capture_pattern_on_current_position():
+            raise CorruptedFileDataError(
+                'File not an ogg container: ' + get_source_name(source))
+
+    @staticmethod
+    def _open_file(source: OggSource) -> BinaryIO:
+        """Method opens [source] for reading
+
+        In-memory data is read through BytesIO without copying of bytes
+        objects. File objects are used as is"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return BytesIO(source)
+
+        if hasattr(source, 'read'):
+            if not source.seekable():
+                raise OSError("Audiofile object is not seekable")
+
+            return source
+
+        try:
+            return open(source, 'rb')
+        except OSError as occurred_err:
+            raise OSError("Cannot open audiofile", *occurred_err.args)
+
+    def read_packet(self) -> Tuple[bytes, List[int]]:
+        """Method returns packet data and packet pages"""
+        if self.tolerant:
+            return self._read_packet_tolerant()
+
+        self._skip_foreign_pages()
+
+        if not self._ogg_capture_pattern_on_current_position():
+            if self.stream_serial_number is None:
+                self._move_to_page_beginning_above()
+                stream_ended = self._last_page_of_logical_bitstream_reached()
+            else:
+                stream_ended = self._stream_ended
+
+            if stream_ended:
+                raise EOFError('File end reached')
+            else:
+                raise CorruptedFileDataError(
+                    'Last page is not marked as last '
+                    '(in non corrupted part of file data)')
+
+        self._beginning_of_reading_actions()
+
+        pages_data = [self._read_page_data()]
+        self._skip_foreign_pages()
+        while (self._ogg_capture_pattern_on_current_position()
+               and not self._fresh_packet_on_current_page()):
+            pages_data.append(self._read_page_data())
+            self._skip_foreign_pages()
+
+        self._current_packet_data = self._join_pages_data(pages_data)
+
+        return self._current_packet_data, self._packet_pages
+
+    def read_packets(self) -> List[Tuple[bytes, int, bool]]:
+        """Method returns separate packets of the next pages run
+
+        Pages run is read by [read_packet] and split by lacing values. Every
+        item is (<packet data>, <granule position>, <packet ends on the last
+        page>). Granule position is -1 if packet is not the last packet
+        completed on its page"""
+        return [
+            (packet.data, packet.granule_position, packet.last_page)
+            for packet in self._split_pages_run(self.read_packet()[0])]
+
+    def iter_packets(self) -> Iterator[OggPacket]:
+        """Generator of packets from current position to the end of file
+
+        Pages runs are read by [read_packet] and split by lacing values.
+        Packet data is not copied from pages run data. Generator ends on the
+        end of file instead of raising EOFError"""
+        while True:
+            try:
+                run_data, _ = self.read_packet()
+            except EOFError:
+                return
+
+            yield from self._split_pages_run(run_data)
+
+    def _read_packet_tolerant(self) -> Tuple[bytes, List[int]]:
+        """Method returns packet data and packet pages skipping damaged
+        regions of file
+
+        Pages run is broken by lost pages. Parts of packets cut by lost pages
+        are dropped and counted in [recovery_report]"""
+        self._beginning_of_reading_actions()
+        pages_data: List[bytes] = []
+        packet_lost = False
+        # True if run is broken by lost pages inside of packet. This packet
+        # is counted as lost by the next run
+        packet_continues = False
+
+        while True:
+            page = self._read_valid_page()
+            if page is None:
+                break
+
+            page_header, page_data = page
+            lost_pages = self._lost_pages_before(page_header)
+
+            if len(pages_data) != 0 and (
+                    lost_pages != 0 or not page_header.continued_packet):
+                # Page is the beginning of the next run
+                self.opened_file.seek(page_header.byte_position)
+                self._carried_page = page
+                packet_continues = page_header.continued_packet
+
+                break
+
+            if lost_pages != 0:
+                self.recovery_report.lost_pages += max(0, lost_pages)
+                packet_lost = True
+
+                if page_header.continued_packet:
+                    self.recovery_report.lost_packets += 1
+
+            if page_header.continued_packet and packet_lost:
+                page_header, page_data = self._cut_continued_packet(
+                    page_header, page_data)
+
+                if page_header.continued_packet:
+                    # Whole page is a part of lost packet
+                    self._last_pages[page_header.stream_serial_number] = (
+                        page_header.page_sequence_number)
+
+                    continue
+
+            self._register_page(page_header)
+
+            packet_lost = False
+            pages_data.append(page_data)
+
+        if (not packet_continues
+                and len(self._packet_page_headers) != 0
+                and self._packet_page_headers[-1].segment_table[-1:]
+                == b'\xff'):
+            self.recovery_report.lost_packets += 1
+
+        if len(pages_data) == 0:
+            raise EOFError('File end reached')
+
+        self._current_packet_data = self._join_pages_data(pages_data)
+
+        return self._current_packet_data, self._packet_pages
+
+    @staticmethod
+    def _cut_continued_packet(
+            page_header: PageHeader,
+            page_data: bytes) -> Tuple[PageHeader, bytes]:
+        """Returns page without data of packet continued from previous page
+
+        Flag of continued packet is kept only if the whole page is a part of
+        continued packet"""
+        cut_segments = 0
+        for lacing_value in page_header.segment_table:
+            cut_segments += 1
+
+            if lacing_value < 255:
+                break
+        else:
+            return page_header, page_data
+
+        cut_page_header = copy(page_header)
+        cut_page_header.header_type_flag &= ~1
+        cut_page_header.segment_table = (
+            page_header.segment_table[cut_segments:])
+        cut_page_header.page_segments -= cut_segments
+
+        return (
+            cut_page_header,
+            page_data[sum(page_header.segment_table[:cut_segments]):])
+
+    def _read_valid_page(self) -> Optional[Tuple[PageHeader, bytes]]:
+        """Method returns header and data of the next valid page of
+        [stream_serial_number] logical bitstream moving byte pointer after
+        the page
+
+        Damaged regions are skipped. Returns None on the end of file"""
+        carried_page = self._carried_page
+        self._carried_page = None
+
+        if (carried_page is not None
+                and carried_page[0].byte_position == self.opened_file.tell()
+                and not self._foreign_page(carried_page[0])):
+            self.opened_file.seek(
+                carried_page[0].byte_position + carried_page[0].page_size)
+
+            return carried_page
+
+        file_size = self._file_size()
+
+        while self.opened_file.tell() < file_size:
+            position = self.opened_file.tell()
+            page = self._read_checked_page(position)
+
+            if page is None:
+                self._resync(position + 1)
+                self.recovery_report.skipped_ranges.append(
+                    (position, self.opened_file.tell()))
+
+                continue
+
+            page_header, page_data = page
+
+            if self._foreign_page(page_header):
+                self._last_pages[page_header.stream_serial_number] = (
+                    page_header.page_sequence_number)
+
+                continue
+
+            return page
+
+        return None
+
+    def _read_checked_page(
+            self, position: int) -> Optional[Tuple[PageHeader, bytes]]:
+        """Method returns header and data of page on byte [position] moving
+        byte pointer after the page
+
+        Returns None if there is no page with right checksum on
+        [position]"""
+        self.opened_file.seek(position)
+
+        try:
+            page_header = self._read_page_header_on_current_position()
+            page_data = self._read_page_body(page_header)
+        except CorruptedFileDataError:
+            return None
+
+        if (page_header.stream_structure_version != 0
+                or page_header.compute_checksum(page_data)
+                != page_header.page_checksum):
+            return None
+
+        return page_header, page_data
+
+    def _resync(self, position: int):
+        """Method moves byte pointer to the first page with right checksum
+        from [position]
+
+        Capture pattern is searched forward in chunks of
+        [RESYNC_CHUNK_SIZE] bytes. Byte pointer is moved to the end of file
+        if there is no such page"""
+        file_size = self._file_size()
+
+        while position < file_size:
+            self.opened_file.seek(position)
+            chunk = self.opened_file.read(self.RESYNC_CHUNK_SIZE + 3)
+
+            candidate = chunk.find(b'OggS')
+            while candidate != -1:
+                if self._read_checked_page(position + candidate) is not None:
+                    self.opened_file.seek(position + candidate)
+
+                    return
+
+                candidate = chunk.find(b'OggS', candidate + 1)
+
+            position += self.RESYNC_CHUNK_SIZE
+
+        self.opened_file.seek(file_size)
+
+    @staticmethod
+    def _join_pages_data(pages_data: List[bytes]) -> bytes:
+        """Method joins data of packet pages into packet data"""
+        return b''.join(pages_data)
+
+    def _read_page_data(self) -> bytes:
+        """Method returns packet data of single page"""
+        page_header = self._read_page_header_on_current_position()
+        self._register_page(page_header)
+
+        data = self._read_page_body(page_header)
+        self._check_page_checksum(page_header, data)
+
+        return data
+
+    def _read_page_body(self, page_header: PageHeader) -> bytes:
+        """Method reads data of page which header is just read"""
+        data = self.opened_file.read(page_header.data_size)
+        if len(data) < page_header.data_size:
+            raise UnexpectedEndOfFileError()
+
+        return data
+
+    def verify_pages_checksums(self) -> List[int]:
+        """Method verifies checksums of all pages of file
+
+        Pages are found by hopping from one page header to another, packets
+        are not read. Byte pointer is not moved. Returns byte positions of
+        pages with wrong checksum and of damaged regions: corrupted page
+        headers and truncated pages. Checking is continued from the next
+        page with right checksum after damaged region"""
+        current_position = self.opened_file.tell()
+        file_size = self._file_size()
+        wrong_pages: List[int] = []
+        position = 0
+
+        try:
+            while position < file_size:
+                try:
+                    self.opened_file.seek(position)
+                    page_header = self._read_page_header_on_current_position()
+                    page_data = self._read_page_body(page_header)
+                except CorruptedFileDataError:
+                    wrong_pages.append(position)
+                    self._resync(position + 1)
+                    position = self.opened_file.tell()
+
+                    continue
+
+                if (page_header.compute_checksum(page_data)
+                        != page_header.page_checksum):
+                    wrong_pages.append(position)
+
+                position += page_header.page_size
+        finally:
+            self.opened_file.seek(current_position)
+
+        return wrong_pages
+
+    def _read_page_header_on_current_position(self) -> PageHeader:
+        """Method reads page header and segment table on current byte
+        position moving byte pointer to the beginning of page data"""
+        position = self.opened_file.tell()
+        page_header = PageHeader(
+            position, self.opened_file.read(PageHeader.FIXED_PART.size))
+
+        page_header.segment_table = self.opened_file.read(
+            page_header.page_segments)
+        if len(page_header.segment_table) != page_header.page_segments:
+            raise UnexpectedEndOfFileError()
+
+        return page_header
+
+    def _skip_foreign_pages(self):
+        """Method moves byte pointer over pages of logical bitstreams other
+        than [stream_serial_number] one
+
+        Only header and segment table of skipped pages are read"""
+        if self.stream_serial_number is None:
+            return
+
+        while self._ogg_capture_pattern_on_current_position():
+            page_header = self._read_page_header_on_current_position()
+
+            if page_header.stream_serial_number == self.stream_serial_number:
+                self.opened_file.seek(page_header.byte_position)
+
+                return
+
+            self._last_pages[page_header.stream_serial_number] = (
+                page_header.page_sequence_number)
+            self.opened_file.seek(
+                page_header.byte_position + page_header.page_size)
+
+    def get_reading_state(self) -> tuple:
+        """Returns state of packets reading
+
+        State can be restored with [set_reading_state] after reading of
+        other part of file"""
+        return (
+            self.opened_file.tell(),
+            dict(self._last_pages),
+            self.stream_serial_number,
+            self._stream_ended)
+
+    def set_reading_state(self, reading_state: tuple):
+        """Method restores state of packets reading returned by
+        [get_reading_state]"""
+        self._beginning_of_reading_actions()
+
+        (position,
+         last_pages,
+         self.stream_serial_number,
+         self._stream_ended) = reading_state
+
+        self.opened_file.seek(position)
+        self._last_pages = dict(last_pages)
+
+    def find_vorbis_stream(self) -> Optional[int]:
+        """Returns serial number of the first Vorbis logical bitstream
+
+        Logical bitstreams are recognized by the first packet of the first
+        pages group (pages with BOS flag at the beginning of file). Returns
+        None if there is no Vorbis logical bitstream. Byte pointer is not
+        moved"""
+        for page_header in self._first_pages_group():
+            if self._vorbis_first_page(page_header.byte_position):
+                return page_header.stream_serial_number
+
+        return None
+
+    def _vorbis_first_page(self, position: int) -> bool:
+        """Returns True if page on byte [position] begins with Vorbis
+        identification header
+
+        Byte pointer is not moved"""
+        current_position = self.opened_file.tell()
 
-    def __init__(self, filename: str):
         try:
-            self.opened_file = open(filename, 'rb')
-        except OSError as occurred_err:
-            raise OSError("Cannot open audiofile", *occurred_err.args)
+            page_header = self.read_page_header(position)
+            self.opened_file.seek(position + page_header.header_size)
 
-        self._current_packet_data = b''
-        self._packet_pages = []
-        self._last_page = -1
+            return self.opened_file.read(7) == b'\x01vorbis'
+        finally:
+            self.opened_file.seek(current_position)
 
-        if not self._ogg_capture_pattern_on_current_position():
-            raise CorruptedFileDataError(
-                'File not an ogg container: ' + filename)
+    def find_chain_links(self) -> List[ChainLink]:
+        """Returns links of chained file in order of their appearance
 
-    def read_packet(self) -> Tuple[bytes, List[int]]:
-        """Method returns packet data and packet pages"""
-        if not self._ogg_capture_pattern_on_current_position():
-            self._move_to_page_beginning_above()
+        Links are found by BOS and EOS flags of pages in [page_index], only
+        the first page of every logical bitstream in BOS group is read to
+        recognize Vorbis logical bitstream. Not chained file has one link"""
+        page_index = self.page_index
+        flags = page_index.header_type_flags
+        serials = page_index.stream_serial_numbers
+        granules = page_index.absolute_granule_positions
 
-            if self._last_page_of_logical_bitstream_reached():
-                raise EOFError('File end reached')
+        links_first_pages = [
+            page_number for page_number in range(len(page_index))
+            if flags[page_number] & 2
+            and (page_number == 0 or not flags[page_number - 1] & 2)]
+
+        result_links: List[ChainLink] = []
+
+        for first_page, end_page in zip(
+                links_first_pages,
+                links_first_pages[1:] + [len(page_index)]):
+            link = ChainLink((
+                page_index.byte_positions[first_page],
+                page_index.byte_positions[end_page]
+                if end_page < len(page_index) else page_index.end_position))
+
+            page_number = first_page
+            while page_number < end_page and flags[page_number] & 2:
+                position = page_index.byte_positions[page_number]
+
+                if self._vorbis_first_page(position):
+                    link.stream_serial_number = serials[page_number]
+                    link.stream_byte_position = position
+
+                    break
+                page_number += 1
+
+            stream_pages = [
+                page_number for page_number in range(first_page, end_page)
+                if serials[page_number] == link.stream_serial_number]
+
+            if link.stream_serial_number is not None:
+                stream_granules = [
+                    granules[page_number] for page_number in stream_pages
+                    if granules[page_number] != -1]
+
+                if len(stream_granules) != 0:
+                    link.granule_range = (
+                        stream_granules[0], stream_granules[-1])
+
+                link.ended = bool(flags[stream_pages[-1]] & 4)
+
+            result_links.append(link)
+
+        return result_links
+
+    def _first_pages_group(self) -> List[PageHeader]:
+        """Returns headers of pages with BOS flag at the beginning of file
+
+        Every logical bitstream of multiplexed file has its first page in
+        this group"""
+        page_headers: List[PageHeader] = []
+        position = 0
+        file_size = self._file_size()
+
+        while position < file_size:
+            try:
+                page_header = self.read_page_header(position)
+            except CorruptedFileDataError:
+                break
+
+            if not page_header.first_page:
+                break
+
+            page_headers.append(page_header)
+            position += page_header.page_size
+
+        return page_headers
+
+    def read_page_header(self, position: int) -> PageHeader:
+        """Method reads header of page on byte [position]
+
+        Only page header and segment table are read. Byte pointer is not
+        moved"""
+        current_position = self.opened_file.tell()
+
+        try:
+            self.opened_file.seek(position)
+            page_header = self._read_page_header_on_current_position()
+        finally:
+            self.opened_file.seek(current_position)
+
+        return page_header
+
+    def chained_stream_present(self, full_scan: bool = False) -> bool:
+        """Method checks if file contains chained logical bitstreams
+
+        Only page headers are read, packets are not decoded. By default
+        serial numbers of the first and the last page of file are compared.
+        If [full_scan] is True then all page headers are walked through
+        looking for beginning of a new logical bitstream"""
+        if not full_scan:
+            last_page = self._find_last_page_header()
+
+            if last_page is not None:
+                return last_page.stream_serial_number not in {
+                    page_header.stream_serial_number
+                    for page_header in self._first_pages_group()}
+
+        page_index = self.page_index
+        known_serials: Set[int] = set()
+        first_pages_group = True
+
+        for page_number in range(len(page_index)):
+            serial = page_index.stream_serial_numbers[page_number]
+
+            if page_index.header_type_flags[page_number] & 2:
+                if not first_pages_group:
+                    return True
+
+                known_serials.add(serial)
             else:
-                raise CorruptedFileDataError(
-                    'Last page is not marked as last '
-                    '(in non corrupted part of file data)')
+                first_pages_group = False
 
-        self._beginning_of_reading_actions()
+                if serial not in known_serials:
+                    return True
 
-        self._current_packet_data += self._read_page_data()
-        while (self._ogg_capture_pattern_on_current_position()
-               and not self._fresh_packet_on_current_page()):
-            self._current_packet_data += self._read_page_data()
+        return False
 
-        return self._current_packet_data, self._packet_pages
+    @property
+    def page_index(self) -> PageIndex:
+        """Index of file pages. Built on the first access"""
+        if self._page_index is None:
+            self._page_index = self._build_page_index()
 
-    def _read_page_data(self) -> bytes:
-        """Method returns packet data of single page"""
-        if not self._ogg_capture_pattern_on_current_position():
-            raise CorruptedFileDataError(
-                'Missing ogg capture pattern. Byte position: '
-                + str(self.opened_file.tell()))
+        return self._page_index
 
-        # capture_pattern
-        temp_ = self.opened_file.read(4)
+    def _build_page_index(self) -> PageIndex:
+        """Method builds index of pages hopping from one page header to
+        another
 
-        # stream_structure_version
-        temp_ += self.opened_file.read(1)
+        Page data is not read. Indexing stops on the first page with
+        corrupted header or on the end of file"""
+        result_index = PageIndex()
+        file_size = self._file_size()
+        position = 0
 
-        # header_type_flag
-        temp_ += self.opened_file.read(1)
+        while position < file_size:
+            try:
+                page_header = self.read_page_header(position)
+            except CorruptedFileDataError:
+                break
 
-        # absolute_granule_position
-        temp_ += self.opened_file.read(8)
+            if position + page_header.page_size > file_size:
+                break
 
-        # stream_serial_number
-        temp_ += self.opened_file.read(4)
+            result_index.append(page_header)
+            position += page_header.page_size
 
-        if len(temp_) != 18:
-            raise UnexpectedEndOfFileError()
+        return result_index
 
-        page_counter = int.from_bytes(
-            self.opened_file.read(4),
-            byteorder='little')
-        self._packet_pages.append(page_counter)
+    def _find_last_page_header(self) -> Optional[PageHeader]:
+        """Method finds the last page of file reading only its tail
 
-        if page_counter != self._last_page + 1:
-            raise CorruptedFileDataError(
-                'Page(s) is(are) missing!\n'
-                'Previous last page: ' + str(self._last_page)
-                + '\nCurrent page: ' + str(page_counter)
-                + '\nCurrent byte position: ' + str(
-                    self.opened_file.tell()))
-        self._last_page += 1
+        Page is considered the last if it ends exactly on the end of file.
+        Returns None if there is no such page in the tail"""
+        file_size = self._file_size()
+        tail_start = max(0, file_size - PageHeader.MAX_PAGE_SIZE)
 
-        # page_checksum
-        temp_ += self.opened_file.read(4)
+        current_position = self.opened_file.tell()
+        self.opened_file.seek(tail_start)
+        tail = self.opened_file.read(file_size - tail_start)
+        self.opened_file.seek(current_position)
 
-        if len(temp_) != 22:
-            raise UnexpectedEndOfFileError()
+        candidate = tail.rfind(b'OggS')
+        while candidate != -1:
+            try:
+                page_header = self.read_page_header(tail_start + candidate)
+            except CorruptedFileDataError:
+                pass
+            else:
+                if (page_header.byte_position + page_header.page_size
+                        == file_size):
+                    return page_header
 
-        page_segments_number = self.opened_file.read(1)[0]
-        segment_table = self.opened_file.read(page_segments_number)
-        if len(segment_table) != page_segments_number:
-            raise UnexpectedEndOfFileError()
-        segment_table_result = sum(segment_table)
+            candidate = tail.rfind(b'OggS', 0, candidate)
 
-        data = self.opened_file.read(segment_table_result)
-        if len(data) < segment_table_result:
-            raise UnexpectedEndOfFileError()
+        return None
 
-        return data
+    def find_last_granule_position(
+            self, end_position: Optional[int] = None) -> Optional[int]:
+        """Returns granule position of the last page of
+        [stream_serial_number] logical bitstream which has granule position
+
+        Pages before [end_position] (end of file if None) are searched
+        backwards in tail window of [TAIL_WINDOW_SIZE] bytes. Window is
+        doubled until page is found, so usually only a few kilobytes are
+        read. Page is confirmed by capture pattern of the next page. Returns
+        None if there is no such page"""
+        search_end = self._file_size()
+        if end_position is not None:
+            search_end = min(search_end, end_position)
+
+        current_position = self.opened_file.tell()
+        window_size = self.TAIL_WINDOW_SIZE
+        scanned_start = search_end
+
+        try:
+            while scanned_start > 0:
+                window_start = max(0, search_end - window_size)
+
+                self.opened_file.seek(window_start)
+                window = self.opened_file.read(
+                    min(search_end, scanned_start + 3) - window_start)
+
+                candidate = window.rfind(b'OggS')
+                while candidate != -1:
+                    page_header = self._confirmed_page_header(
+                        window_start + candidate, search_end)
+
+                    if (page_header is not None
+                            and page_header.absolute_granule_position != -1
+                            and not self._foreign_page(page_header)):
+                        return page_header.absolute_granule_position
+
+                    candidate = window.rfind(b'OggS', 0, candidate)
+
+                scanned_start = window_start
+                window_size *= 2
+        finally:
+            self.opened_file.seek(current_position)
+
+        return None
+
+    def _confirmed_page_header(
+            self, position: int, end_position: int) -> Optional[PageHeader]:
+        """Returns header of page on byte [position] if the page ends on
+        [end_position] or before capture pattern of the next page
+
+        Returns None if page is not confirmed. Byte pointer is not moved"""
+        try:
+            page_header = self.read_page_header(position)
+        except CorruptedFileDataError:
+            return None
+
+        page_end = page_header.byte_position + page_header.page_size
+        if page_end == end_position:
+            return page_header
+
+        if page_end > end_position:
+            return None
+
+        current_position = self.opened_file.tell()
+        self.opened_file.seek(page_end)
+        next_capture_pattern = self.opened_file.read(4)
+        self.opened_file.seek(current_position)
+
+        if next_capture_pattern == b'OggS':
+            return page_header
+
+        return None
+
+    def _file_size(self) -> int:
+        """Method returns size of opened file in bytes"""
+        current_position = self.opened_file.tell()
+        file_size = self.opened_file.seek(0, 2)
+        self.opened_file.seek(current_position)
+
+        return file_size
 
     def _beginning_of_reading_actions(self):
         """Method does actions in the beginning of the packet reading"""
         self._packet_pages.clear()
+        self._packet_page_headers.clear()
         self._current_packet_data = b''
+        self._stream_ended = False
 
     def _last_page_of_logical_bitstream_reached(self) -> bool:
         """Method returns True if fresh packet is on current page"""
@@ -152,9 +1414,40 @@ class PacketsReader:
         packet beginning is reached"""
         assert new_position >= 0
 
-        self.opened_file.seek(new_position)
         self._current_packet_data = b''
         self._packet_pages = []
+        self._packet_page_headers = []
+        self._stream_ended = False
+
+        # Page with fresh packet on [new_position] is read without page
+        # index, so reading from the beginning of file does not index it
+        page = self._read_checked_page(new_position)
+        if page is not None:
+            page_header = page[0]
+
+            if (not page_header.continued_packet
+                    and (self.stream_serial_number is None
+                         or page_header.stream_serial_number
+                         == self.stream_serial_number)):
+                self.opened_file.seek(new_position)
+                self._last_pages[page_header.stream_serial_number] = (
+                    page_header.page_sequence_number - 1)
+
+                return
+
+        page_number = self.page_index.page_containing(new_position)
+        if page_number is not None and self.stream_serial_number is not None:
+            page_number = self.page_index.stream_page_at_or_before(
+                page_number, self.stream_serial_number)
+
+        if page_number is not None:
+            self.move_to_page(
+                self.page_index.fresh_packet_page(page_number))
+
+            return
+
+        # Position is out of indexed part of file. Searching byte by byte
+        self.opened_file.seek(new_position)
 
         if not (self._ogg_capture_pattern_on_current_position()
                 and self._fresh_packet_on_current_page()):
@@ -168,10 +1461,198 @@ class PacketsReader:
                 self.opened_file.seek(-1, 1)
                 self._move_to_page_beginning_above()
 
-        self.opened_file.read(18)
-        self._last_page = int.from_bytes(
-            self.opened_file.read(4), byteorder='little') - 1
-        self.opened_file.seek(-22, 1)
+        page_header = self.read_page_header(self.opened_file.tell())
+        self._last_pages[page_header.stream_serial_number] = (
+            page_header.page_sequence_number - 1)
+
+    def move_to_page(self, page_number: int):
+        """Moves byte pointer to the beginning of page with [page_number]
+
+        [page_number] is the number of page in [page_index]. Negative
+        numbers are counted from the end, so -1 is the last page"""
+        page_index = self.page_index
+
+        self._beginning_of_reading_actions()
+        self.opened_file.seek(page_index.byte_positions[page_number])
+        self._last_pages[page_index.stream_serial_numbers[page_number]] = (
+            page_index.page_sequence_numbers[page_number] - 1)
+
+    def seek_granule(
+            self,
+            granule: int,
+            start_position: int = 0,
+            end_position: Optional[int] = None):
+        """Moves byte pointer to read data of sample [granule]
+
+        The last page with granule position not greater than [granule] is
+        found by bisection over pages from [start_position] up to
+        [end_position] (end of file if None). Only page
+        headers are read. Then byte pointer is moved up to the nearest page
+        with fresh packet, so at least one packet before the packet with
+        sample [granule] is read (pre-roll)"""
+        assert granule >= 0
+
+        if self._page_index is not None:
+            page_number = self._page_index_bisect(
+                granule, start_position, end_position)
+            self.move_to_page(self._page_index.fresh_packet_page(page_number))
+
+            return
+
+        search_end = self._file_size()
+        if end_position is not None:
+            search_end = min(search_end, end_position)
+
+        low_position = start_position
+        high_position = search_end
+
+        while high_position - low_position > PageHeader.MAX_PAGE_SIZE:
+            middle_position = (low_position + high_position) // 2
+            page_header = self._next_page_header(
+                middle_position, high_position)
+
+            while (page_header is not None
+                   and (page_header.absolute_granule_position == -1
+                        or self._foreign_page(page_header))):
+                page_header = self._next_page_header(
+                    page_header.byte_position + page_header.page_size,
+                    high_position)
+
+            if (page_header is None
+                    or page_header.absolute_granule_position > granule):
+                high_position = middle_position
+            else:
+                low_position = page_header.byte_position
+
+        fresh_page: Optional[PageHeader] = None
+        landing_page: Optional[PageHeader] = None
+        position = low_position
+
+        while position < search_end:
+            page_header = self.read_page_header(position)
+            position += page_header.page_size
+
+            if self._foreign_page(page_header):
+                continue
+
+            if not page_header.continued_packet:
+                fresh_page = page_header
+
+            if page_header.absolute_granule_position == -1:
+                continue
+
+            if page_header.absolute_granule_position > granule:
+                break
+
+            landing_page = fresh_page
+
+        if landing_page is not None:
+            self._move_to_page_header(landing_page)
+        elif low_position == start_position:
+            self._move_to_page_header(self.read_page_header(start_position))
+            self._skip_foreign_pages()
+        else:
+            self.move_byte_position(low_position)
+
+    def _page_index_bisect(
+            self,
+            granule: int,
+            start_position: int,
+            end_position: Optional[int] = None) -> int:
+        """Returns number of the last page with granule position not greater
+        than [granule]
+
+        Pages before [start_position] and from [end_position] are not
+        considered. Pages without
+        granule position (-1) have granule position of previous page. Pages
+        of other logical bitstreams than [stream_serial_number] one are
+        treated as pages without granule position"""
+        page_index = self.page_index
+        serials = page_index.stream_serial_numbers
+        granules = page_index.absolute_granule_positions
+        serial_number = self.stream_serial_number
+
+        first_page = bisect_left(page_index.byte_positions, start_position)
+        low_page = first_page
+        end_page = len(page_index)
+        if end_position is not None:
+            end_page = bisect_left(page_index.byte_positions, end_position)
+        high_page = end_page
+
+        while low_page < high_page:
+            middle_page = (low_page + high_page) // 2
+
+            page_number = middle_page
+            while page_number > first_page and (
+                    granules[page_number] == -1
+                    or serial_number is not None
+                    and serials[page_number] != serial_number):
+                page_number -= 1
+
+            if granules[page_number] <= granule:
+                low_page = middle_page + 1
+            else:
+                high_page = middle_page
+
+        page_number = max(first_page, low_page - 1)
+
+        if serial_number is None:
+            return page_number
+
+        stream_page = page_index.stream_page_at_or_before(
+            page_number, serial_number)
+
+        if stream_page is None or stream_page < first_page:
+            stream_page = first_page
+            while (stream_page < end_page - 1
+                   and serials[stream_page] != serial_number):
+                stream_page += 1
+
+        return stream_page
+
+    def _next_page_header(
+            self, position: int, end_position: int) -> Optional[PageHeader]:
+        """Returns header of the first page that begins between [position]
+        and [end_position]
+
+        Found capture pattern is confirmed by capture pattern of the next
+        page (or by the end of file). Returns None if page is not found"""
+        file_size = self._file_size()
+
+        current_position = self.opened_file.tell()
+        self.opened_file.seek(position)
+        chunk = self.opened_file.read(
+            min(end_position, position + PageHeader.MAX_PAGE_SIZE)
+            - position)
+
+        candidate = chunk.find(b'OggS')
+        while candidate != -1:
+            try:
+                page_header = self.read_page_header(position + candidate)
+                next_position = (
+                    page_header.byte_position + page_header.page_size)
+
+                if next_position == file_size:
+                    return page_header
+
+                self.opened_file.seek(next_position)
+                if self.opened_file.read(4) == b'OggS':
+                    return page_header
+            except CorruptedFileDataError:
+                pass
+            finally:
+                self.opened_file.seek(current_position)
+
+            candidate = chunk.find(b'OggS', candidate + 1)
+
+        return None
+
+    def _move_to_page_header(self, page_header: PageHeader):
+        """Moves byte pointer to the beginning of page with [page_header]"""
+        self._beginning_of_reading_actions()
+        self.opened_file.seek(page_header.byte_position)
+        self._last_pages[page_header.stream_serial_number] = (
+            page_header.page_sequence_number - 1)
 
     def _move_to_page_beginning_above(self):
         """Moves byte pointer up until a beginning of some page is reached"""
@@ -215,4 +1696,317 @@ class PacketsReader:
 
     def close_file(self):
         """Method closes opened ogg-vorbis file"""
-        self.opened_file.close()
+        if self._file_is_owned:
+            self.opened_file.close()
+
+
+class MmapPacketsReader(PacketsReader):
+    """Class for reading packets from memory-mapped file
+
+    Page headers are parsed right in mapped memory (or in given in-memory
+    data) and page data is given as memoryview slices of it. Packet data is
+    copied only if packet spans several pages"""
+    opened_file: Union[mmap, BinaryIO]
+
+    _mapped_data: memoryview
+
+    def _open_file(self, source: OggSource) -> Union[mmap, BinaryIO]:
+        """Method maps [source] into memory
+
+        In-memory data is used as is. File objects must have file
+        descriptor"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._mapped_data = memoryview(source).cast('B')
+
+            return BytesIO(source)
+
+        try:
+            if hasattr(source, 'read'):
+                mapped_file = mmap(
+                    source.fileno(), 0, access=ACCESS_READ)
+            else:
+                with open(source, 'rb') as file_:
+                    mapped_file = mmap(
+                        file_.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # Empty file cannot be mapped
+            raise CorruptedFileDataError(
+                'File not an ogg container: ' + get_source_name(source))
+        except OSError as occurred_err:
+            raise OSError("Cannot open audiofile", *occurred_err.args)
+
+        # Mapping is owned by reader even for file objects given by caller
+        self._file_is_owned = True
+        self._mapped_data = memoryview(mapped_file)
+
+        return mapped_file
+
+    @staticmethod
+    def _join_pages_data(pages_data: List[memoryview]) -> memoryview:
+        """Method joins data of packet pages into packet data
+
+        Data is copied only if there are several pages"""
+        if len(pages_data) == 1:
+            return pages_data[0]
+
+        return memoryview(b''.join(pages_data))
+
+    def _read_page_data(self) -> memoryview:
+        """Method returns packet data of single page"""
+        page_header = self._read_page_header_on_current_position()
+        self._register_page(page_header)
+
+        page_data = self._read_page_body(page_header)
+        self._check_page_checksum(page_header, page_data)
+
+        return page_data
+
+    def _read_page_body(self, page_header: PageHeader) -> memoryview:
+        """Method returns data of page which header is just read"""
+        data_start = self.opened_file.tell()
+        data_end = data_start + page_header.data_size
+        if data_end > len(self._mapped_data):
+            raise UnexpectedEndOfFileError()
+
+        self.opened_file.seek(data_end)
+
+        return self._mapped_data[data_start:data_end]
+
+    def _read_page_header_on_current_position(self) -> PageHeader:
+        """Method reads page header and segment table on current byte
+        position moving byte pointer to the beginning of page data"""
+        position = self.opened_file.tell()
+        page_header = PageHeader(position, self._mapped_data, position)
+
+        segment_table_start = position + PageHeader.FIXED_PART.size
+        data_start = segment_table_start + page_header.page_segments
+        if data_start > len(self._mapped_data):
+            raise UnexpectedEndOfFileError()
+
+        page_header.segment_table = bytes(
+            self._mapped_data[segment_table_start:data_start])
+        self.opened_file.seek(data_start)
+
+        return page_header
+
+    def _ogg_capture_pattern_on_current_position(self) -> bool:
+        """Checks if capture pattern on current position"""
+        position = self.opened_file.tell()
+
+        return self._mapped_data[position:position + 4] == b'OggS'
+
+    def _file_size(self) -> int:
+        """Method returns size of mapped file in bytes"""
+        return len(self._mapped_data)
+
+    def close_file(self):
+        """Method unmaps ogg-vorbis file"""
+        self._current_packet_data = b''
+        self._mapped_data.release()
+
+        try:
+            if self._file_is_owned:
+                self.opened_file.close()
+        except BufferError:
+            # Some packets data is still used outside. Mapping will be
+            # closed when this data is released
+            pass
+
+
+class AsyncPacketsReader(AbstractPacketsReader):
+    """Class for reading packets from asynchronous stream
+
+    Stream is an asyncio.StreamReader or any object with coroutine
+    read(<size>) method, e.g. async file object. Stream is read
+    sequentially and never seeked, so reading position cannot be moved.
+    Pages and packets have the same semantics as in PacketsReader"""
+    # Stream with coroutine read(<size>) method
+    stream: Any
+
+    # Global position of the next not read byte of stream
+    byte_position: int
+
+    # Pages which are read from stream but not processed yet
+    _pending_pages: Deque[Tuple[PageHeader, bytes]]
+
+    def __init__(self, stream: Any, crc_check: str = 'off'):
+        super().__init__(crc_check)
+
+        self.stream = stream
+        self.byte_position = 0
+        self._pending_pages = deque()
+
+    async def _read_exactly(self, size: int) -> bytes:
+        """Method reads [size] bytes from stream
+
+        Less bytes are returned only on the end of stream. Chunks are joined
+        once, so reading by small chunks does not copy data again and
+        again"""
+        chunks: List[bytes] = []
+        read_size = 0
+
+        while read_size < size:
+            chunk = await self.stream.read(size - read_size)
+
+            if len(chunk) == 0:
+                break
+
+            chunks.append(chunk)
+            read_size += len(chunk)
+
+        self.byte_position += read_size
+
+        return b''.join(chunks)
+
+    async def _read_stream_page(self) -> Optional[Tuple[PageHeader, bytes]]:
+        """Method reads the next page from stream
+
+        Returns (<page header>, <page data>) or None on the end of stream"""
+        page_position = self.byte_position
+        fixed_part = await self._read_exactly(PageHeader.FIXED_PART.size)
+
+        if len(fixed_part) == 0:
+            return None
+
+        page_header = PageHeader(page_position, fixed_part)
+        page_header.segment_table = await self._read_exactly(
+            page_header.page_segments)
+        if len(page_header.segment_table) != page_header.page_segments:
+            raise UnexpectedEndOfFileError()
+
+        page_data = await self._read_exactly(page_header.data_size)
+        if len(page_data) != page_header.data_size:
+            raise UnexpectedEndOfFileError()
+
+        self._check_page_checksum(page_header, page_data)
+
+        return page_header, page_data
+
+    async def read_page(self) -> Optional[Tuple[PageHeader, bytes]]:
+        """Method returns the next page of any logical bitstream
+
+        Returns (<page header>, <page data>) or None on the end of stream.
+        Page sequence number is not checked"""
+        if len(self._pending_pages) != 0:
+            return self._pending_pages.popleft()
+
+        return await self._read_stream_page()
+
+    async def _read_stream_serial_page(
+            self) -> Optional[Tuple[PageHeader, bytes]]:
+        """Method returns the next page of [stream_serial_number] logical
+        bitstream skipping pages of others"""
+        while True:
+            page = await self.read_page()
+
+            if page is None or not self._foreign_page(page[0]):
+                return page
+
+            self._last_pages[page[0].stream_serial_number] = (
+                page[0].page_sequence_number)
+
+    async def select_vorbis_stream(self) -> Optional[int]:
+        """Method selects the first Vorbis logical bitstream
+
+        Logical bitstreams are recognized by the first packet of the first
+        pages group (pages with BOS flag). Read pages of this group are kept
+        for reading. Returns serial number of selected logical bitstream or
+        None if Vorbis logical bitstream is not found"""
+        serial_number: Optional[int] = None
+
+        while len(self._pending_pages) == 0 or (
+                self._pending_pages[-1][0].first_page
+                and serial_number is None):
+            page = await self._read_stream_page()
+
+            if page is None:
+                break
+
+            self._pending_pages.append(page)
+
+            page_header, page_data = page
+            if page_header.first_page and page_data[:7] == b'\x01vorbis':
+                serial_number = page_header.stream_serial_number
+
+        self.select_stream(serial_number)
+
+        return serial_number
+
+    async def read_packet(self) -> Tuple[bytes, List[int]]:
+        """Method returns packet data and packet pages
+
+        Like [PacketsReader.read_packet], data of pages run is returned"""
+        self._packet_pages = []
+        self._packet_page_headers = []
+
+        page = await self._read_stream_serial_page()
+
+        if page is None:
+            if self._stream_ended:
+                raise EOFError('File end reached')
+
+            raise CorruptedFileDataError(
+                'Last page is not marked as last '
+                '(in non corrupted part of file data)')
+
+        pages_data = [page[1]]
+        self._register_page(page[0])
+
+        while True:
+            page = await self._read_stream_serial_page()
+
+            if page is None:
+                break
+
+            if not page[0].continued_packet:
+                self._pending_pages.appendleft(page)
+
+                break
+
+            pages_data.append(page[1])
+            self._register_page(page[0])
+
+        return b''.join(pages_data), self._packet_pages
+
+    def get_next_page_position(self) -> int:
+        """Returns global position of the next page to read"""
+        if len(self._pending_pages) != 0:
+            return self._pending_pages[0][0].byte_position
+
+        return self.byte_position
+
+    async def read_packets(self) -> List[Tuple[bytes, int, bool]]:
+        """Method returns separate packets of the next pages run
+
+        Items are the same as in [PacketsReader.read_packets]"""
+        run_data, _ = await self.read_packet()
+
+        return [
+            (packet.data, packet.granule_position, packet.last_page)
+            for packet in self._split_pages_run(run_data)]
+
+    async def iter_packets(self) -> AsyncIterator[OggPacket]:
+        """Asynchronous generator of packets to the end of stream
+
+        Packets are the same as in [PacketsReader.iter_packets]"""
+        while True:
+            try:
+                run_data, _ = await self.read_packet()
+            except EOFError:
+                return
+
+            for packet in self._split_pages_run(run_data):
+                yield packet
+
+
+def verify_pages_checksums(source: OggSource) -> List[int]:
+    """Returns byte positions of pages with wrong checksum and of damaged
+    regions in [source]
+
+    Pages are found by page headers, packets are not decoded"""
+    packets_reader = PacketsReader(source)
+
+    try:
+        return packets_reader.verify_pages_checksums()
+    finally:
+        packets_reader.close_file()
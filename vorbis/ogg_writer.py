@@ -0,0 +1,295 @@
+from typing import List, BinaryIO, Optional
+
+from .ogg import (
+    CorruptedFileDataError,
+    OggSource,
+    OggPacket,
+    PageHeader,
+    PacketsReader,
+    ogg_crc)
+from .helper_funcs import ilog
+from .vorbis_main import PacketsProcessor
+
+
+class OggPageWriter:
+    """Class for writing packets of one logical bitstream into ogg pages
+
+    Packets are split into segments by lacing values. Pages are numbered
+    from zero, the first page is marked with BOS flag"""
+    output: BinaryIO
+    stream_serial_number: int
+
+    # Page is closed on packet boundary when its data reaches this size
+    page_data_size: int
+
+    # Sequence number of the next written page
+    page_sequence_number: int
+
+    _segment_table: bytearray
+    _page_data: bytearray
+
+    # Granule position of the last packet completed on current page. -1 if
+    # no packet is completed on current page
+    _granule_position: int
+
+    # True if current page begins with continuation of packet
+    _continued_packet: bool
+
+    def __init__(
+            self,
+            output: BinaryIO,
+            stream_serial_number: int,
+            page_data_size: int = 4096):
+        assert 0 < page_data_size <= 255 * 255
+
+        self.output = output
+        self.stream_serial_number = stream_serial_number
+        self.page_data_size = page_data_size
+        self.page_sequence_number = 0
+
+        self._segment_table = bytearray()
+        self._page_data = bytearray()
+        self._granule_position = -1
+        self._continued_packet = False
+
+    def write_packet(
+            self,
+            packet: bytes,
+            granule_position: int = -1,
+            last_packet: bool = False):
+        """Appends [packet] to current page
+
+        [granule_position] is granule position after the packet. Page gets
+        granule position of the last packet completed on it. If
+        [last_packet] is True then page is written and marked as the last
+        page of logical bitstream (EOS)"""
+        packet = memoryview(packet)
+        lacing_values = [255] * (len(packet) // 255) + [len(packet) % 255]
+
+        offset = 0
+        for segment_number, lacing_value in enumerate(lacing_values):
+            if len(self._segment_table) == 255:
+                self._write_page()
+                self._continued_packet = segment_number != 0
+
+            self._segment_table.append(lacing_value)
+            self._page_data += packet[offset:offset + lacing_value]
+            offset += lacing_value
+
+        self._granule_position = granule_position
+
+        if last_packet:
+            self._write_page(last_page=True)
+        elif len(self._page_data) >= self.page_data_size:
+            self._write_page()
+
+    def flush(self):
+        """Method writes current page, so the next packet begins on a new
+        page"""
+        if len(self._segment_table) != 0:
+            self._write_page()
+
+    def _write_page(self, last_page: bool = False):
+        """Method writes current page with computed checksum"""
+        header_type_flag = (
+            (1 if self._continued_packet else 0)
+            | (2 if self.page_sequence_number == 0 else 0)
+            | (4 if last_page else 0))
+
+        page_header = bytearray(PageHeader.FIXED_PART.pack(
+            b'OggS',
+            0,
+            header_type_flag,
+            self._granule_position,
+            self.stream_serial_number,
+            self.page_sequence_number,
+            0,
+            len(self._segment_table)))
+        page_header += self._segment_table
+
+        page_checksum = ogg_crc(self._page_data, ogg_crc(page_header))
+        page_header[22:26] = page_checksum.to_bytes(4, 'little')
+
+        self.output.write(page_header)
+        self.output.write(self._page_data)
+
+        self.page_sequence_number += 1
+        self._segment_table = bytearray()
+        self._page_data = bytearray()
+        self._granule_position = -1
+        self._continued_packet = False
+
+
+def _packet_blocksize(
+        packet: OggPacket,
+        logical_stream: PacketsProcessor.LogicalStreamData) -> int:
+    """Returns window size of audio [packet] by its mode number
+
+    Mode number follows packet type bit. There are at most 64 modes, so
+    both are in the first byte of packet"""
+    if len(packet.data) == 0 or packet.data[0] & 1:
+        raise CorruptedFileDataError(
+            'Audio packet expected. Byte position: '
+            + str(packet.byte_position))
+
+    modes = logical_stream.vorbis_mode_configurations
+    mode_number = (
+        (packet.data[0] >> 1) & ((1 << ilog(len(modes) - 1)) - 1))
+
+    if mode_number >= len(modes):
+        raise CorruptedFileDataError(
+            'Mode number of audio packet is out of range. Byte position: '
+            + str(packet.byte_position))
+
+    if modes[mode_number].vorbis_mode_blockflag == 1:
+        return logical_stream.blocksize_1
+
+    return logical_stream.blocksize_0
+
+
+def _packets_end_samples(
+        packets: List[OggPacket], blocksizes: List[int]) -> List[int]:
+    """Returns number of the sample after audio of every packet
+
+    Packets are counted from granule positions of their pages: audio
+    packet returns a quarter of previous window plus a quarter of its own
+    window. End of packets before the first granule position is counted
+    backwards"""
+    end_samples: List[Optional[int]] = [None] * len(packets)
+
+    for packet_number, packet in enumerate(packets):
+        if packet.granule_position != -1:
+            end_samples[packet_number] = packet.granule_position
+        elif (packet_number != 0
+              and end_samples[packet_number - 1] is not None):
+            end_samples[packet_number] = (
+                end_samples[packet_number - 1]
+                + blocksizes[packet_number - 1] // 4
+                + blocksizes[packet_number] // 4)
+
+    if all(end_sample is None for end_sample in end_samples):
+        raise CorruptedFileDataError(
+            'Page with granule position is not found')
+
+    for packet_number in range(len(packets) - 1, 0, -1):
+        if end_samples[packet_number - 1] is None:
+            end_samples[packet_number - 1] = (
+                end_samples[packet_number]
+                - blocksizes[packet_number - 1] // 4
+                - blocksizes[packet_number] // 4)
+
+    return end_samples
+
+
+def cut_audio(
+        source: OggSource,
+        output: BinaryIO,
+        start_time: float,
+        end_time: float):
+    """Writes audio from [start_time] to [end_time] seconds of [source]
+    into [output] as ogg vorbis stream without re-encoding
+
+    Three header packets and audio packets covering the interval are copied
+    as is. The first copied packet only primes decoding. Granule positions
+    of written pages are shifted by [start_time], so granule position of
+    the first audio page trims the beginning of audio and granule position
+    of the last page trims its end. Only the first link of chained file is
+    cut"""
+    if not 0 <= start_time < end_time:
+        raise ValueError('Wrong time interval of audio to cut')
+
+    if hasattr(source, 'read'):
+        source_position = source.tell()
+
+    packets_processor = PacketsProcessor(source)
+    try:
+        packets_processor.process_headers(headers_only=True)
+    finally:
+        packets_processor.close_file()
+
+    logical_stream = packets_processor.logical_stream
+    start_sample = int(start_time * logical_stream.audio_sample_rate)
+    end_sample = int(end_time * logical_stream.audio_sample_rate)
+
+    if hasattr(source, 'read'):
+        source.seek(source_position)
+
+    packets_reader = PacketsReader(source)
+    try:
+        packets_reader.select_stream(logical_stream.stream_serial_number)
+
+        packets = packets_reader.iter_packets()
+        header_packets = [bytes(next(packets).data) for _ in range(3)]
+        packets.close()
+
+        links_end = None
+        if packets_reader.chained_stream_present():
+            links_end = packets_reader.find_chain_links()[0].byte_range[1]
+
+        packets_reader.seek_granule(
+            start_sample, logical_stream.audio_byte_position, links_end)
+
+        audio_packets: List[OggPacket] = []
+        blocksizes: List[int] = []
+
+        for packet in packets_reader.iter_packets():
+            audio_packets.append(packet)
+            blocksizes.append(_packet_blocksize(packet, logical_stream))
+
+            if packet.granule_position != -1 and (
+                    packet.last_page
+                    or (packet.granule_position >= end_sample
+                        and len(audio_packets) > 1)):
+                break
+
+        if len(audio_packets) == 0:
+            raise CorruptedFileDataError('Audio packets are not found')
+
+        end_samples = _packets_end_samples(audio_packets, blocksizes)
+
+        first_packet = 0
+        while (first_packet + 1 < len(audio_packets)
+               and end_samples[first_packet + 1] <= start_sample):
+            first_packet += 1
+
+        last_packet = first_packet + 1
+        while (last_packet + 1 < len(audio_packets)
+               and end_samples[last_packet] < end_sample):
+            last_packet += 1
+        last_packet = min(last_packet, len(audio_packets) - 1)
+
+        if end_samples[last_packet] <= start_sample:
+            raise ValueError('Interval of audio to cut is out of audio data')
+
+        # Page with both beginning and end of audio trims only the end, so
+        # clip in one packet begins on the first sample of the packet
+        clip_start = end_samples[first_packet]
+        if last_packet > first_packet + 1:
+            clip_start = max(start_sample, clip_start)
+        clip_end = min(end_sample, end_samples[last_packet])
+
+        page_writer = OggPageWriter(
+            output, logical_stream.stream_serial_number)
+
+        page_writer.write_packet(header_packets[0], 0)
+        page_writer.flush()
+        page_writer.write_packet(header_packets[1], 0)
+        page_writer.write_packet(header_packets[2], 0)
+        page_writer.flush()
+
+        for packet_number in range(first_packet, last_packet + 1):
+            if packet_number == last_packet:
+                page_writer.write_packet(
+                    audio_packets[packet_number].data,
+                    clip_end - clip_start,
+                    last_packet=True)
+            else:
+                page_writer.write_packet(
+                    audio_packets[packet_number].data,
+                    max(0, end_samples[packet_number] - clip_start))
+
+            # Granule position of the first audio page trims the beginning
+            if packet_number == first_packet + 1:
+                page_writer.flush()
+    finally:
+        packets_reader.close_file()
@@ -0,0 +1,512 @@
+from typing import Optional, Union, Dict, List, Tuple, Any
+from os import (
+    PathLike,
+    DirEntry,
+    makedirs,
+    getpid,
+    replace,
+    remove,
+    scandir,
+    utime)
+from os.path import join as os_path_join
+from collections import OrderedDict
+from hashlib import blake2b
+from struct import Struct
+from zlib import compress, decompress
+
+import numpy as np
+
+from .ogg import CorruptedFileDataError
+from .decoders import SetupHeaderDecoder
+
+
+class SetupHeaderCache:
+    """Cache of decoded setup headers
+
+    Files encoded by the same encoder version with the same preset have
+    identical setup header packets, so decoded setup header is taken by
+    hash of the packet. Cache has in-process LRU layer and optional
+    persistent directory store. Directory files are evicted by size, the
+    least recently used first
+
+    Directory files keep only plain values of setup header: numbers and
+    lists of numbers, see [_SetupDataWriter]. Built Huffman decode tables
+    and VQ lookup tables of codebooks are stored too"""
+    # Version of stored data format. Files of other versions are ignored
+    FORMAT_VERSION: int = 3
+
+    # Header of stored file: magic, format version
+    _FILE_HEADER: Struct = Struct('<4sH')
+    _FILE_MAGIC: bytes = b'OVSH'
+
+    _FILE_EXTENSION: str = '.setup'
+
+    # Directory of persistent store. None if cache is in-process only
+    directory: Optional[str]
+
+    # Max amount of setup headers in in-process layer
+    memory_entries: int
+
+    # Max size of directory store in bytes
+    max_directory_size: int
+
+    hits: int
+    misses: int
+
+    # Key -> setup header fields of logical stream
+    _memory_layer: 'OrderedDict[str, Dict[str, Any]]'
+
+    def __init__(
+            self,
+            directory: Optional[Union[str, PathLike]] = None,
+            memory_entries: int = 64,
+            max_directory_size: int = 64 << 20):
+        assert memory_entries > 0 and max_directory_size > 0
+
+        self.directory = None
+        if directory is not None:
+            self.directory = str(directory)
+            makedirs(self.directory, exist_ok=True)
+
+        self.memory_entries = memory_entries
+        self.max_directory_size = max_directory_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._memory_layer = OrderedDict()
+
+    @staticmethod
+    def make_key(setup_packet: bytes, audio_channels: int) -> str:
+        """Returns key of setup header by its packet data
+
+        Mappings are decoded by amount of audio channels, so it is a part of
+        key too"""
+        key_hash = blake2b(digest_size=20)
+        key_hash.update(audio_channels.to_bytes(1, byteorder='little'))
+        key_hash.update(setup_packet)
+
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns setup header fields with [key] or None if they are not
+        cached"""
+        setup_fields = self._memory_layer.get(key)
+
+        if setup_fields is not None:
+            self._memory_layer.move_to_end(key)
+        elif self.directory is not None:
+            setup_fields = self._read_file(key)
+
+            if setup_fields is not None:
+                self._add_to_memory(key, setup_fields)
+
+        if setup_fields is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return setup_fields
+
+    def put(self, key: str, setup_fields: Dict[str, Any]):
+        """Method caches setup header fields with [key]
+
+        Setup header is cached in-process only if directory store is not
+        writable"""
+        self._add_to_memory(key, setup_fields)
+
+        if self.directory is not None and self._write_file(key, setup_fields):
+            self._evict_files()
+
+    def clear(self):
+        """Method removes all setup headers from cache"""
+        self._memory_layer.clear()
+
+        if self.directory is not None:
+            for entry in self._directory_files():
+                remove(entry.path)
+
+    def _add_to_memory(self, key: str, setup_fields: Dict[str, Any]):
+        """Method adds setup header fields to in-process layer"""
+        self._memory_layer[key] = setup_fields
+        self._memory_layer.move_to_end(key)
+
+        while len(self._memory_layer) > self.memory_entries:
+            self._memory_layer.popitem(last=False)
+
+    def _file_path(self, key: str) -> str:
+        return os_path_join(self.directory, key + self._FILE_EXTENSION)
+
+    def _read_file(self, key: str) -> Optional[Dict[str, Any]]:
+        """Method reads setup header fields from directory store
+
+        Returns None if there is no file of [key] or it is damaged or of
+        other format version. Such files are removed"""
+        file_path = self._file_path(key)
+
+        try:
+            with open(file_path, 'rb') as cache_file:
+                file_data = cache_file.read()
+        except OSError:
+            return None
+
+        try:
+            magic, format_version = self._FILE_HEADER.unpack_from(file_data)
+
+            if (magic != self._FILE_MAGIC
+                    or format_version != self.FORMAT_VERSION):
+                raise ValueError('Other format of setup cache file')
+
+            setup_fields = _SetupDataReader(
+                decompress(file_data[self._FILE_HEADER.size:])
+            ).read_setup_fields()
+        except Exception:
+            self._remove_file(file_path)
+
+            return None
+
+        # Modification time is time of the last use for eviction
+        try:
+            utime(file_path)
+        except OSError:
+            pass
+
+        return setup_fields
+
+    def _write_file(self, key: str, setup_fields: Dict[str, Any]) -> bool:
+        """Method writes setup header fields into directory store
+
+        Data is written into temporary file which then replaces file of
+        [key], so other processes never read partly written file. Returns
+        False if file is not written, temporary file is removed then"""
+        file_path = self._file_path(key)
+        temporary_path = f'{file_path}.{getpid()}.tmp'
+        file_data = compress(
+            _SetupDataWriter().write_setup_fields(setup_fields))
+
+        try:
+            with open(temporary_path, 'wb') as cache_file:
+                cache_file.write(self._FILE_HEADER.pack(
+                    self._FILE_MAGIC, self.FORMAT_VERSION))
+                cache_file.write(file_data)
+
+            replace(temporary_path, file_path)
+        except OSError:
+            self._remove_file(temporary_path)
+
+            return False
+
+        return True
+
+    def _evict_files(self):
+        """Method removes the least recently used files while directory
+        store is bigger than [max_directory_size]
+
+        Files can be removed by other processes meanwhile, such files are
+        skipped"""
+        files: List[Tuple[float, int, str]] = []
+
+        try:
+            directory_files = self._directory_files()
+        except OSError:
+            return
+
+        for entry in directory_files:
+            try:
+                file_stat = entry.stat()
+            except OSError:
+                continue
+
+            files.append(
+                (file_stat.st_mtime, file_stat.st_size, entry.path))
+
+        files.sort()
+        directory_size = sum(file_size for _, file_size, _ in files)
+
+        for _, file_size, file_path in files:
+            if directory_size <= self.max_directory_size:
+                break
+
+            directory_size -= file_size
+            self._remove_file(file_path)
+
+    def _directory_files(self) -> List[DirEntry]:
+        """Returns directory entries of stored setup headers"""
+        with scandir(self.directory) as entries:
+            return [
+                entry for entry in entries
+                if entry.is_file() and entry.name.endswith(
+                    self._FILE_EXTENSION)]
+
+    @staticmethod
+    def _remove_file(file_path: str):
+        try:
+            remove(file_path)
+        except OSError:
+            pass
+
+
+# Kinds of stored values
+_INT: int = 0
+_FLOAT: int = 1
+_BOOL: int = 2
+_INTS: int = 3
+# List of ints where items can be None
+_OPTIONAL_INTS: int = 4
+_INTS_LISTS: int = 5
+_OPTIONAL_INTS_LISTS: int = 6
+
+# Stored fields of setup header data classes: (<field name>, <kind>).
+# Fields that are absent in object are skipped
+_CODEBOOK_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ('codebook_dimensions', _INT),
+    ('codebook_entries', _INT),
+    ('codebook_codewords_lengths', _OPTIONAL_INTS),
+    ('codebook_lookup_type', _INT),
+    ('codebook_minimum_value', _FLOAT),
+    ('codebook_delta_value', _FLOAT),
+    ('codebook_sequence_p', _BOOL),
+    ('codebook_lookup_values', _INT),
+    ('codebook_multiplicands', _INTS))
+
+_FLOOR_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ('floor0_order', _INT),
+    ('floor0_rate', _INT),
+    ('floor0_bark_map_size', _INT),
+    ('floor0_amplitude_bits', _INT),
+    ('floor0_amplitude_offset', _INT),
+    ('floor0_number_of_books', _INT),
+    ('floor0_book_list', _INTS),
+    ('floor1_partition_class_list', _INTS),
+    ('floor1_class_dimensions', _INTS),
+    ('floor1_class_subclasses', _INTS),
+    ('floor1_class_masterbooks', _OPTIONAL_INTS),
+    ('floor1_subclass_books', _INTS_LISTS),
+    ('floor1_multiplier', _INT),
+    ('floor1_x_list', _INTS),
+    ('floor1_values', _INT))
+
+_RESIDUE_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ('residue_begin', _INT),
+    ('residue_end', _INT),
+    ('residue_partition_size', _INT),
+    ('residue_classifications', _INT),
+    ('residue_classbook', _INT),
+    ('residue_cascade', _INTS),
+    ('residue_books', _OPTIONAL_INTS_LISTS))
+
+_MAPPING_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ('vorbis_mapping_submaps', _INT),
+    ('vorbis_mapping_coupling_steps', _INT),
+    ('vorbis_mapping_magnitude', _INTS),
+    ('vorbis_mapping_angle', _INTS),
+    ('vorbis_mapping_mux', _INTS),
+    ('vorbis_mapping_submap_floor', _INTS),
+    ('vorbis_mapping_submap_residue', _INTS))
+
+_MODE_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ('vorbis_mode_blockflag', _INT),
+    ('vorbis_mode_mapping', _INT))
+
+# Stored value of None in lists of ints
+_NONE_VALUE: int = -1 << 31
+
+_UINT32: Struct = Struct('<I')
+_INT32: Struct = Struct('<i')
+_FLOAT64: Struct = Struct('<d')
+
+
+class _SetupDataWriter:
+    """Writer of setup header fields into compact binary data
+
+    Numbers are little-endian: counts are uint32, ints are int32 and
+    floats are float64. List is its length and int32 items, None item is
+    -2^31. Object is presence byte and value of every field. Codebooks are
+    followed by their decode tables and VQ lookup tables"""
+    _data: bytearray
+
+    def __init__(self):
+        self._data = bytearray()
+
+    def write_setup_fields(self, setup_fields: Dict[str, Any]) -> bytes:
+        """Returns binary data of setup header [setup_fields]"""
+        codebooks: List[SetupHeaderDecoder.CodebookData] = setup_fields[
+            'vorbis_codebook_configurations']
+
+        self._write_objects(codebooks, _CODEBOOK_FIELDS)
+        for codebook in codebooks:
+            self._write_codebook_tables(codebook)
+
+        self._write_value(_INTS, setup_fields['vorbis_floor_types'])
+        self._write_objects(
+            setup_fields['vorbis_floor_configurations'], _FLOOR_FIELDS)
+        self._write_value(_INTS, setup_fields['vorbis_residue_types'])
+        self._write_objects(
+            setup_fields['vorbis_residue_configurations'], _RESIDUE_FIELDS)
+        self._write_objects(
+            setup_fields['vorbis_mapping_configurations'], _MAPPING_FIELDS)
+        self._write_objects(
+            setup_fields['vorbis_mode_configurations'], _MODE_FIELDS)
+
+        return bytes(self._data)
+
+    def _write_objects(
+            self,
+            objects: List[Any],
+            fields: Tuple[Tuple[str, int], ...]):
+        self._data += _UINT32.pack(len(objects))
+
+        for setup_object in objects:
+            for field_name, kind in fields:
+                field_present: bool = hasattr(setup_object, field_name)
+                self._data.append(field_present)
+
+                if field_present:
+                    self._write_value(kind, getattr(setup_object, field_name))
+
+    def _write_codebook_tables(
+            self, codebook: 'SetupHeaderDecoder.CodebookData'):
+        """Method writes decode tables and VQ lookup table of [codebook]
+
+        Codebook without used entries has no decode tables"""
+        try:
+            decode_tables = codebook.decode_tables
+        except CorruptedFileDataError:
+            decode_tables = []
+
+        self._data += _UINT32.pack(len(decode_tables))
+        for table_bits, table in decode_tables:
+            self._data += _UINT32.pack(table_bits)
+            self._write_value(_OPTIONAL_INTS, table)
+
+        VQ_lookup_table: np.ndarray = codebook.VQ_lookup_table
+        self._data += _UINT32.pack(VQ_lookup_table.shape[0])
+        self._data += VQ_lookup_table.astype('<f4').tobytes()
+
+    def _write_value(self, kind: int, value: Any):
+        if kind == _INT or kind == _BOOL:
+            self._data += _INT32.pack(value)
+        elif kind == _FLOAT:
+            self._data += _FLOAT64.pack(value)
+        elif kind == _INTS or kind == _OPTIONAL_INTS:
+            self._data += _UINT32.pack(len(value))
+            self._data += np.array(
+                [_NONE_VALUE if item is None else item for item in value],
+                dtype='<i4').tobytes()
+        else:
+            self._data += _UINT32.pack(len(value))
+
+            for items in value:
+                self._write_value(
+                    _INTS if kind == _INTS_LISTS else _OPTIONAL_INTS, items)
+
+
+class _SetupDataReader:
+    """Reader of setup header fields from data of [_SetupDataWriter]
+
+    Raises ValueError, IndexError or struct.error on damaged data"""
+    _data: bytes
+    _position: int
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._position = 0
+
+    def read_setup_fields(self) -> Dict[str, Any]:
+        """Returns setup header fields"""
+        setup_fields: Dict[str, Any] = {}
+
+        codebooks = self._read_objects(
+            SetupHeaderDecoder.CodebookData, _CODEBOOK_FIELDS)
+        for codebook in codebooks:
+            self._read_codebook_tables(codebook)
+        setup_fields['vorbis_codebook_configurations'] = codebooks
+
+        setup_fields['vorbis_floor_types'] = self._read_value(_INTS)
+        setup_fields['vorbis_floor_configurations'] = self._read_objects(
+            SetupHeaderDecoder.FloorData, _FLOOR_FIELDS)
+        setup_fields['vorbis_residue_types'] = self._read_value(_INTS)
+        setup_fields['vorbis_residue_configurations'] = self._read_objects(
+            SetupHeaderDecoder.ResidueData, _RESIDUE_FIELDS)
+        setup_fields['vorbis_mapping_configurations'] = self._read_objects(
+            SetupHeaderDecoder.MappingData, _MAPPING_FIELDS)
+        setup_fields['vorbis_mode_configurations'] = self._read_objects(
+            SetupHeaderDecoder.ModeData, _MODE_FIELDS)
+
+        if self._position != len(self._data):
+            raise ValueError('Extra data after setup header fields')
+
+        return setup_fields
+
+    def _read_objects(
+            self,
+            object_class: type,
+            fields: Tuple[Tuple[str, int], ...]) -> List[Any]:
+        objects: List[Any] = []
+
+        for _ in range(self._read_struct(_UINT32)):
+            setup_object = object_class()
+
+            for field_name, kind in fields:
+                field_present: int = self._data[self._position]
+                self._position += 1
+
+                if field_present:
+                    setattr(setup_object, field_name, self._read_value(kind))
+
+            objects.append(setup_object)
+
+        return objects
+
+    def _read_codebook_tables(
+            self, codebook: 'SetupHeaderDecoder.CodebookData'):
+        decode_tables: List[Tuple[int, List[Optional[int]]]] = []
+
+        for _ in range(self._read_struct(_UINT32)):
+            table_bits: int = self._read_struct(_UINT32)
+            decode_tables.append(
+                (table_bits, self._read_value(_OPTIONAL_INTS)))
+
+        if len(decode_tables) != 0:
+            codebook.decode_tables = decode_tables
+
+        vectors_amount: int = self._read_struct(_UINT32)
+        codebook.VQ_lookup_table = self._read_array(
+            '<f4', vectors_amount * codebook.codebook_dimensions
+        ).astype(np.float32).reshape(
+            vectors_amount, codebook.codebook_dimensions)
+
+    def _read_value(self, kind: int) -> Any:
+        if kind == _INT:
+            return self._read_struct(_INT32)
+        if kind == _BOOL:
+            return bool(self._read_struct(_INT32))
+        if kind == _FLOAT:
+            return self._read_struct(_FLOAT64)
+        if kind == _INTS or kind == _OPTIONAL_INTS:
+            items: List[int] = self._read_array(
+                '<i4', self._read_struct(_UINT32)).tolist()
+
+            if kind == _OPTIONAL_INTS:
+                return [
+                    None if item == _NONE_VALUE else item for item in items]
+
+            return items
+
+        return [
+            self._read_value(
+                _INTS if kind == _INTS_LISTS else _OPTIONAL_INTS)
+            for _ in range(self._read_struct(_UINT32))]
+
+    def _read_struct(self, value_struct: Struct) -> Any:
+        value = value_struct.unpack_from(self._data, self._position)[0]
+        self._position += value_struct.size
+
+        return value
+
+    def _read_array(self, dtype: str, count: int) -> np.ndarray:
+        array = np.frombuffer(
+            self._data, dtype=dtype, count=count, offset=self._position)
+        self._position += array.nbytes
+
+        return array
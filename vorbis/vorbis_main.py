@@ -1,11 +1,32 @@
-from typing import List
-
-from .ogg import CorruptedFileDataError, FileDataException
+from typing import (
+    List,
+    Optional,
+    Iterator,
+    Callable,
+    Tuple,
+    Union,
+    Dict,
+    Sequence)
+
+import numpy as np
+
+from vorbis import ProgramException
+from .ogg import (
+    CorruptedFileDataError,
+    FileDataException,
+    PageChecksumError,
+    OggSource,
+    ChainLink,
+    RecoveryReport,
+    AsyncPacketsReader,
+    get_source_name)
 from .decoders import (
     DataReader,
     AbstractDecoder,
     SetupHeaderDecoder,
+    AudioDataDecoder,
     EndOfPacketException)
+from .setup_cache import SetupHeaderCache
 
 
 class PacketsProcessor(AbstractDecoder):
@@ -16,6 +37,13 @@ class PacketsProcessor(AbstractDecoder):
 
         byte_position: int
 
+        # Serial number of logical bitstream in ogg container. None if
+        # Vorbis logical bitstream was not recognized by its first page
+        stream_serial_number: Optional[int]
+
+        # Global position of the first audio packet page
+        audio_byte_position: int
+
         # Identification header data
 
         audio_channels: int
@@ -41,9 +69,11 @@ class PacketsProcessor(AbstractDecoder):
 
         # Comment header data
 
+        # True if vendor string is not decoded or comment header is broken.
+        # User comments are decoded on access, see [UserComments]
         comment_header_decoding_failed: bool
         vendor_string: str
-        user_comment_list_strings: List[str]
+        user_comment_list_strings: 'PacketsProcessor.UserComments'
 
         # Setup header data
 
@@ -62,17 +92,206 @@ class PacketsProcessor(AbstractDecoder):
         def __init__(self, input_byte_position: int):
             self.byte_position = input_byte_position
 
+    class UserComments(Sequence):
+        """Contains user comments of comment header
+
+        Comments are stored as bytes and decoded from UTF-8 only on access,
+        so big fields like cover art do not slow down headers processing.
+        Comment with failed decoding is '[Unicode decoding failed]'. Fields
+        are indexed by names case-insensitively"""
+        _raw_comments: List[bytes]
+
+        # Upper-case field name -> numbers of comments with the field
+        _fields_index: Dict[str, List[int]]
+
+        def __init__(self, raw_comments: List[bytes]):
+            self._raw_comments = raw_comments
+            self._fields_index = {}
+
+            for comment_number, raw_comment in enumerate(raw_comments):
+                separator_position = raw_comment.find(b'=')
+
+                if separator_position != -1:
+                    self._fields_index.setdefault(
+                        raw_comment[:separator_position].decode(
+                            'ascii', 'replace').upper(),
+                        []).append(comment_number)
+
+        def __len__(self) -> int:
+            return len(self._raw_comments)
+
+        def __getitem__(self, index: Union[int, slice]):
+            if isinstance(index, slice):
+                return [
+                    self._decode(raw_comment)
+                    for raw_comment in self._raw_comments[index]]
+
+            return self._decode(self._raw_comments[index])
+
+        def __eq__(self, other) -> bool:
+            if isinstance(other, PacketsProcessor.UserComments):
+                return self._raw_comments == other._raw_comments
+
+            if isinstance(other, Sequence) and not isinstance(other, str):
+                return list(self) == list(other)
+
+            return NotImplemented
+
+        @staticmethod
+        def _decode(raw_data: bytes) -> str:
+            try:
+                return raw_data.decode('utf-8')
+            except UnicodeError:
+                return '[Unicode decoding failed]'
+
+        def get_raw_comment(self, comment_number: int) -> bytes:
+            """Returns not decoded comment with [comment_number]"""
+            return self._raw_comments[comment_number]
+
+        def get_raw_field(self, field_name: str) -> List[bytes]:
+            """Returns not decoded values of all fields with [field_name]
+
+            Name is case-insensitive"""
+            return [
+                self._raw_comments[comment_number][
+                    self._raw_comments[comment_number].find(b'=') + 1:]
+                for comment_number in self._fields_index.get(
+                    field_name.upper(), [])]
+
+        def get_field(self, field_name: str) -> List[str]:
+            """Returns values of all fields with [field_name]
+
+            Name is case-insensitive"""
+            return [
+                self._decode(raw_value)
+                for raw_value in self.get_raw_field(field_name)]
+
+    class LinkData:
+        """Contains data of one link of chained stream
+
+        Link is found by page headers. Headers of link are processed on the
+        first access to [logical_stream]"""
+        # Serial number of Vorbis logical bitstream of link. None if link
+        # has no Vorbis logical bitstream
+        stream_serial_number: Optional[int]
+
+        # Global position of the first page of Vorbis logical bitstream
+        stream_byte_position: int
+
+        # (<first byte of link>, <byte after the last page of link>)
+        byte_range: Tuple[int, int]
+
+        # (<first>, <last>) granule positions of link pages
+        granule_range: Tuple[int, int]
+
+        # True if Vorbis logical bitstream of link has its last page
+        ended: bool
+
+        _logical_stream: Optional['PacketsProcessor.LogicalStreamData']
+        _headers_processor: Callable[
+            ['PacketsProcessor.LinkData'],
+            'PacketsProcessor.LogicalStreamData']
+
+        def __init__(
+                self,
+                chain_link: ChainLink,
+                headers_processor: Callable[
+                    ['PacketsProcessor.LinkData'],
+                    'PacketsProcessor.LogicalStreamData']):
+            self.stream_serial_number = chain_link.stream_serial_number
+            self.stream_byte_position = chain_link.stream_byte_position
+            self.byte_range = chain_link.byte_range
+            self.granule_range = chain_link.granule_range
+            self.ended = chain_link.ended
+
+            self._logical_stream = None
+            self._headers_processor = headers_processor
+
+        @property
+        def logical_stream(self) -> 'PacketsProcessor.LogicalStreamData':
+            """Logical stream data of link. Headers are processed on the
+            first access"""
+            if self._logical_stream is None:
+                self._logical_stream = self._headers_processor(self)
+
+            return self._logical_stream
+
     _data_reader: DataReader
     _setup_header_decoder: SetupHeaderDecoder
 
     logical_stream: LogicalStreamData
 
-    def __init__(self, filename: str):
-        self._data_reader: DataReader = DataReader(filename)
+    # Links of chained stream. Found on the first access to [links]
+    _links: Optional[List[LinkData]] = None
+    # Link which logical stream is [logical_stream]. None if links are not
+    # found yet
+    _current_link: Optional[LinkData] = None
+    # Sample of the last seek. Decoded samples before it are dropped by
+    # [get_audio_data]. None if there was no seek
+    _seek_sample: Optional[int] = None
+
+    # Reader of asynchronous stream. None if processor reads file
+    _async_packets_reader: Optional[AsyncPacketsReader] = None
+
+    # Cache of decoded setup headers. None if setup headers are always
+    # decoded
+    setup_cache: Optional[SetupHeaderCache] = None
+
+    # Fields of [logical_stream] that are decoded from setup header
+    _SETUP_HEADER_FIELDS: Tuple[str, ...] = (
+        'vorbis_codebook_configurations',
+        'vorbis_floor_types',
+        'vorbis_floor_configurations',
+        'vorbis_residue_types',
+        'vorbis_residue_configurations',
+        'vorbis_mapping_configurations',
+        'vorbis_mode_configurations')
+
+    def __init__(
+            self,
+            source: Union[OggSource, AsyncPacketsReader],
+            use_mmap: bool = False,
+            crc_check: str = 'off',
+            tolerant: bool = False,
+            setup_cache: Optional[SetupHeaderCache] = None):
+        """[source] is a filename, in-memory data (bytes, bytearray,
+        memoryview) or a seekable binary file object
+
+        [crc_check] is a mode of page checksum verification: 'strict',
+        'warn' or 'off'. If [tolerant] is True then damaged regions of file
+        are skipped and described in [recovery_report]. If [setup_cache] is
+        given then decoded setup headers are taken from it
+
+        If [source] is AsyncPacketsReader then only headers are processed by
+        [process_headers_async]. Other arguments except [setup_cache] are
+        not used"""
+        self.setup_cache = setup_cache
+
+        if isinstance(source, AsyncPacketsReader):
+            self._async_packets_reader = source
+            self._data_reader = DataReader()
+
+            super().__init__(self._data_reader)
+
+            self._stream_serial_number = None
+            self._setup_header_decoder = SetupHeaderDecoder(
+                self._data_reader)
+
+            return
+
+        self._data_reader: DataReader = DataReader(
+            source,
+            use_mmap=use_mmap,
+            crc_check=crc_check,
+            tolerant=tolerant)
 
         super().__init__(self._data_reader)
 
-        self._basic_file_format_check(filename)
+        # Pages of other multiplexed logical bitstreams are skipped
+        self._stream_serial_number: Optional[int] = (
+            self._data_reader.select_vorbis_stream())
+
+        self._basic_file_format_check(get_source_name(source))
 
         self._setup_header_decoder = SetupHeaderDecoder(self._data_reader)
 
@@ -83,6 +302,10 @@ class PacketsProcessor(AbstractDecoder):
                 self._data_reader.read_packet()
                 self._read_bytes(1)
                 self._check_header_sync_pattern()
+        except PageChecksumError:
+            self.close_file()
+
+            raise
         except FileDataException:
             self.close_file()
 
@@ -91,10 +314,19 @@ class PacketsProcessor(AbstractDecoder):
 
         self._data_reader.restart_file_reading()
 
-    def process_headers(self):
-        """Method-wrapper for better debugging"""
+    def process_headers(self, headers_only: bool = False):
+        """Method-wrapper for better debugging
+
+        If [headers_only] is True then only three header packets are read.
+        Otherwise file is checked for chained stream by page headers and
+        [links] are found if stream is chained. Processed headers belong to
+        the first link"""
         try:
             self._process_headers()
+
+            if (not headers_only
+                    and self._data_reader.chained_stream_present()):
+                self._current_link = self.links[0]
         except (FileDataException, BaseException) as occurred_exc:
             current_byte_position = (
                 self._data_reader.get_packet_global_position()
@@ -109,13 +341,73 @@ class PacketsProcessor(AbstractDecoder):
             raise occurred_exc
 
     def _process_headers(self):
-        """Processes headers in whole file creating [logical_stream] objects"""
+        """Processes three header packets creating [logical_stream] object"""
         self._data_reader.read_packet()
-        packet_type = self._read_bytes(1)
 
         self.logical_stream = self.LogicalStreamData(
             self._data_reader.get_packet_global_position())
 
+        self._process_header_packets(self._data_reader.read_packet)
+
+        self.logical_stream.audio_byte_position = (
+            self._data_reader.get_next_packet_global_position())
+
+    async def process_headers_async(self):
+        """Coroutine version of [process_headers] for processor created from
+        AsyncPacketsReader
+
+        Only three header packets are read from stream, so many streams can
+        be inspected concurrently in one event loop. Stream is not closed"""
+        packets_reader = self._async_packets_reader
+
+        if packets_reader is None:
+            raise ProgramException(
+                'Processor is not created from AsyncPacketsReader')
+
+        try:
+            self._stream_serial_number = (
+                await packets_reader.select_vorbis_stream())
+
+            packets = packets_reader.iter_packets()
+            try:
+                header_packets = [
+                    await packets.__anext__() for _ in range(3)]
+            except StopAsyncIteration:
+                raise CorruptedFileDataError('Header packets are lost')
+            finally:
+                await packets.aclose()
+
+            self.logical_stream = self.LogicalStreamData(
+                header_packets[0].byte_position)
+
+            next_packets = iter(header_packets)
+
+            def set_next_packet():
+                packet = next(next_packets)
+                self._data_reader.set_packet(
+                    packet.data, packet.byte_position)
+
+            set_next_packet()
+            self._process_header_packets(set_next_packet)
+
+            self.logical_stream.audio_byte_position = (
+                packets_reader.get_next_page_position())
+        except (FileDataException, BaseException) as occurred_exc:
+            occurred_exc.args += (
+                'Error occurred on '
+                f'[{packets_reader.byte_position}] byte position',)
+
+            raise occurred_exc
+
+    def _process_header_packets(self, read_next_packet: Callable[[], None]):
+        """Processes three header packets storing data into [logical_stream]
+
+        The first packet is already read by data reader. Next packets are
+        read by [read_next_packet]"""
+        packet_type = self._read_bytes(1)
+
+        self.logical_stream.stream_serial_number = self._stream_serial_number
+
         if packet_type != b'\x01':
             raise CorruptedFileDataError(
                 'Identification header is lost')
@@ -126,7 +418,7 @@ class PacketsProcessor(AbstractDecoder):
                 'End of packet condition triggered while '
                 'identification header decoding')
 
-        self._data_reader.read_packet()
+        read_next_packet()
         packet_type = self._read_bytes(1)
         if packet_type != b'\x03':
             raise CorruptedFileDataError('Comment header is lost')
@@ -138,7 +430,7 @@ class PacketsProcessor(AbstractDecoder):
             self.logical_stream.comment_header_decoding_failed = (
                 True)
 
-        self._data_reader.read_packet()
+        read_next_packet()
         packet_type = self._read_bytes(1)
         if packet_type != b'\x05':
             raise CorruptedFileDataError('Setup header is lost')
@@ -149,15 +441,153 @@ class PacketsProcessor(AbstractDecoder):
                 'End of packet condition triggered while '
                 'setup header decoding')
 
+    @property
+    def recovery_report(self) -> RecoveryReport:
+        """Report about damaged regions skipped in tolerant reading mode"""
+        return self._data_reader.recovery_report
+
+    @property
+    def links(self) -> List['PacketsProcessor.LinkData']:
+        """Links of chained stream in order of their appearance
+
+        Links are found by BOS and EOS flags of page headers, not by
+        decoding. Not chained stream has one link"""
+        self._check_file_source()
+
+        if self._links is None:
+            self._links = [
+                self.LinkData(chain_link, self._process_link_headers)
+                for chain_link in self._data_reader.find_chain_links()]
+
+            current_stream = getattr(self, 'logical_stream', None)
+            if (len(self._links) != 0 and current_stream is not None
+                    and current_stream.byte_position
+                    < self._links[0].byte_range[1]):
+                self._links[0]._logical_stream = current_stream
+
+        return self._links
+
+    def _process_link_headers(
+            self,
+            link: 'PacketsProcessor.LinkData'
+    ) -> 'PacketsProcessor.LogicalStreamData':
+        """Processes three header packets of [link]
+
+        Reading state and [logical_stream] are restored after processing"""
+        if link.stream_serial_number is None:
+            raise CorruptedFileDataError(
+                'Link has no Vorbis logical bitstream',
+                f'Link begins on [{link.byte_range[0]}] byte position')
+
+        reading_state = self._data_reader.get_reading_state()
+        current_stream = getattr(self, 'logical_stream', None)
+        current_serial_number = self._stream_serial_number
+
         try:
-            while packet_type != b'\x01':
-                self._data_reader.read_packet()
-                packet_type = self._read_bytes(1)
+            self._stream_serial_number = link.stream_serial_number
+            self._data_reader.select_stream(link.stream_serial_number)
+            self._data_reader.set_packet_global_position(
+                link.stream_byte_position)
+
+            self._process_headers()
+
+            return self.logical_stream
+        finally:
+            self._data_reader.set_reading_state(reading_state)
+            self.logical_stream = current_stream
+            self._stream_serial_number = current_serial_number
+
+    def _link_containing(
+            self, position: int) -> Optional['PacketsProcessor.LinkData']:
+        """Returns link which contains byte on [position] or None"""
+        for link in self.links:
+            if link.byte_range[0] <= position < link.byte_range[1]:
+                return link
+
+        return None
+
+    def _current_link_end(self, find_links: bool) -> Optional[int]:
+        """Returns position of the end of current link
+
+        If [find_links] is True then [links] are found if needed. Otherwise
+        returns None if links are not found yet"""
+        if self._current_link is None and (
+                find_links or self._links is not None):
+            self._current_link = self._link_containing(
+                self.logical_stream.byte_position)
+
+        if self._current_link is None:
+            return None
+
+        return self._current_link.byte_range[1]
+
+    def select_link(self, link_number: int):
+        """Makes link with [link_number] current
+
+        Logical stream of the link becomes [logical_stream] and reading is
+        moved to the beginning of its audio data. Seeking is bounded by the
+        link"""
+        link = self.links[link_number]
+
+        self.logical_stream = link.logical_stream
+        self._current_link = link
+        self._stream_serial_number = link.stream_serial_number
+        self._seek_sample = None
+
+        self._data_reader.select_stream(link.stream_serial_number)
+        self._data_reader.set_packet_global_position(
+            self.logical_stream.audio_byte_position)
+
+    def seek_to_sample(self, sample_number: int):
+        """Moves reading of audio packets to PCM sample [sample_number]
 
-            raise NotImplementedError(
-                "Chained stream is not supported by this program")
-        except EOFError:
-            pass
+        Page with the sample is found by bisection over granule positions of
+        pages, so seek time does not grow linearly with file size. One packet
+        before the packet with the sample is read too (pre-roll). Only pages
+        of current link are considered, links are found on the first seek.
+        Next [get_audio_data] begins exactly from sample [sample_number]"""
+        if getattr(self, 'logical_stream', None) is None:
+            raise ProgramException("Process file headers first")
+
+        self._check_file_source()
+
+        self._seek_sample = sample_number
+        self._data_reader.seek_granule(
+            sample_number,
+            self.logical_stream.audio_byte_position,
+            self._current_link_end(find_links=True))
+
+    def seek_to_time(self, seconds: float):
+        """Moves reading of audio packets to time [seconds]"""
+        if getattr(self, 'logical_stream', None) is None:
+            raise ProgramException("Process file headers first")
+
+        self.seek_to_sample(
+            int(seconds * self.logical_stream.audio_sample_rate))
+
+    def total_samples(self) -> int:
+        """Returns number of PCM samples per channel
+
+        Number is granule position of the last page found by a scan of file
+        tail, so audio packets are not decoded. If [links] are found then
+        samples of current link are counted"""
+        if getattr(self, 'logical_stream', None) is None:
+            raise ProgramException("Process file headers first")
+
+        self._check_file_source()
+
+        granule_position = self._data_reader.find_last_granule_position(
+            self._current_link_end(find_links=False))
+
+        if granule_position is None:
+            raise CorruptedFileDataError(
+                'Page with granule position is not found')
+
+        return granule_position
+
+    def duration(self) -> float:
+        """Returns duration of audio in seconds"""
+        return self.total_samples() / self.logical_stream.audio_sample_rate
 
     def _process_identification_header(self):
         """Processes identification header
@@ -230,28 +660,64 @@ class PacketsProcessor(AbstractDecoder):
             current_stream.comment_header_decoding_failed = True
 
         user_comment_list_length = self._read_bits_for_int(32)
-        user_comment_list_strings = []
-
-        for i in range(user_comment_list_length):
-            length_ = self._read_bits_for_int(32)
-            string_ = self._read_bytes(length_)
-
-            try:
-                user_comment_list_strings.append(string_.decode('utf-8'))
-            except UnicodeError:
-                current_stream.comment_header_decoding_failed = True
-                user_comment_list_strings.append(
-                    '[Unicode decoding failed]')
+        raw_comments: List[bytes] = []
 
-        current_stream.user_comment_list_strings = user_comment_list_strings
-
-        if not bool(self._read_bit):  # framing bit
+        try:
+            for i in range(user_comment_list_length):
+                length_ = self._read_bits_for_int(32)
+                raw_comments.append(self._read_bytes(length_))
+        finally:
+            current_stream.user_comment_list_strings = (
+                self.UserComments(raw_comments))
+
+        if self._read_bit() == 0:  # framing bit
             current_stream.comment_header_decoding_failed = True
 
     def _process_setup_header(self):
         """Processes setup header info
 
-        Stores info into current logical stream"""
+        Stores info into current logical stream. If processor has
+        [setup_cache] then decoded setup header is taken from cache by
+        packet data. Otherwise it is decoded and cached with built Huffman
+        decode tables and VQ lookup tables"""
+        if self.setup_cache is None:
+            self._decode_setup_header()
+
+            return
+
+        current_stream = self.logical_stream
+        cache_key = self.setup_cache.make_key(
+            self._data_reader.current_packet, current_stream.audio_channels)
+        setup_fields = self.setup_cache.get(cache_key)
+
+        if setup_fields is not None:
+            for field_name, field_value in setup_fields.items():
+                setattr(current_stream, field_name, field_value)
+
+            return
+
+        self._decode_setup_header()
+
+        # Cached codebooks are stored with built tables, so they are not
+        # built again on cache hits
+        for codebook in current_stream.vorbis_codebook_configurations:
+            # Codebook without used entries is valid in setup header and
+            # has no decode tables. Skipping it is safe: decoding with it
+            # builds tables again and raises the same error, and such
+            # codebook is cached without tables
+            try:
+                codebook.build_decode_tables()
+            except CorruptedFileDataError:
+                pass
+
+            codebook.build_vq_lookup_table()
+
+        self.setup_cache.put(cache_key, {
+            field_name: getattr(current_stream, field_name)
+            for field_name in self._SETUP_HEADER_FIELDS})
+
+    def _decode_setup_header(self):
+        """Decodes setup header storing info into current logical stream"""
         self._check_header_sync_pattern()
 
         current_stream = self.logical_stream
@@ -312,145 +778,142 @@ class PacketsProcessor(AbstractDecoder):
             raise CorruptedFileDataError(
                 'Header sync pattern is absent')
 
-    # WouldBeBetter: Complete get_audio_data
-    # def get_audio_data(self):  # -> List[float]:
-    #     """Returns list of PCM audio data from current audio packet
-    #
-    #     Raises EOFError on file end
-    #     Raises EndOfPacketException. If so, current audio packet discards
-    #     from stream
-    #     """
-    #     self._data_reader.read_packet()
-    #
-    #     if getattr(self, 'logical_stream', None) is None:
-    #         raise ProgramException("Process file headers first")
-    #
-    #     packet_type: int = self._data_reader.read_bit()
-    #
-    #     if packet_type != 0:
-    #         raise CorruptedFileDataError(
-    #             'Got wrong packet type in process of audio data reading')
-    #
-    #     mode_number: int = self._data_reader.read_bits_for_int(
-    #         ilog(len(self.logical_stream.vorbis_mode_configurations) - 1))
-    #     n: int  # blocksize
-    #     vorbis_mode_blockflag: int = (
-    #         self.logical_stream
-    #             .vorbis_mode_configurations[mode_number]
-    #             .vorbis_mode_blockflag)
-    #
-    #     if vorbis_mode_blockflag == 0:
-    #         n = self.logical_stream.blocksize_0
-    #     else:
-    #         n = self.logical_stream.blocksize_1
-    #
-    #     previous_window_flag: Optional[int] = None
-    #     next_window_flag: Optional[int] = None
-    #
-    #     if vorbis_mode_blockflag == 1:
-    #         previous_window_flag = self._data_reader.read_bit()
-    #         next_window_flag = self._data_reader.read_bit()
-    #
-    #     # WouldBeBetter: Understand text below
-    #     # From docs:
-    #     # '''
-    #     # if [previous_window_flag] is not set, the left half of the
-    #     # window will be a hybrid window for lapping with a short block.
-    #     # See paragraph 1.3.2, “Window shape decode (long windows only)”
-    #     # for an illustration of overlapping dissimilar windows. Else, the
-    #     # left half window will have normal long shape.
-    #     #
-    #     # if [next_window_flag] is not set, the right half of the window
-    #     # will be a hybrid window for lapping with a short block. See
-    #     # paragraph 1.3.2, “Window shape decode (long windows only)” for
-    #     # an illustration of overlapping dissimilar windows. Else, the
-    #     # left right window will have normal long shape.
-    #     # '''
-    #
-    #     # These vars are integer because they are indexes in 'window' vector
-    #     window_center: int = n//2
-    #     left_window_start: int
-    #     left_window_end: int
-    #     left_n: int
-    #     right_window_start: int
-    #     right_window_end: int
-    #     right_n: int
-    #
-    #     if vorbis_mode_blockflag == 1 and previous_window_flag == 0:
-    #         left_window_start = n//4 - self.logical_stream.blocksize_0//4
-    #         left_window_end = n//4 + self.logical_stream.blocksize_0//4
-    #         left_n = self.logical_stream.blocksize_0//2
-    #     else:
-    #         left_window_start = 0
-    #         left_window_end = window_center
-    #         left_n = n//2
-    #
-    #     if vorbis_mode_blockflag == 1 and next_window_flag == 0:
-    #         right_window_start = n*3//4 - self.logical_stream.blocksize_0//4
-    #         right_window_end = n*3//4 + self.logical_stream.blocksize_0//4
-    #         right_n = self.logical_stream.blocksize_0 // 2
-    #     else:
-    #         right_window_start = window_center
-    #         right_window_end = n
-    #         right_n = n // 2
-    #
-    #     window: List[float] = []
-    #
-    #     for i in range(left_window_start):
-    #         window.append(0)
-    #
-    #     for i in range(left_window_start, left_window_end):
-    #         window.append(
-    #             sin(pi/2 * (
-    #                 sin((i - left_window_start + 0.5) / left_n * pi/2)**2)))
-    #
-    #     for i in range(left_window_end, right_window_start):
-    #         window.append(1)
-    #
-    #     for i in range(right_window_start, right_window_end):
-    #         window.append(
-    #             sin(pi/2 * (
-    #                 sin(
-    #                     (i - right_window_start + 0.5) /
-    #                     right_n * pi/2 + pi/2)**2)))
-    #
-    #     for i in range(right_window_start, n):
-    #         window.append(0)
-    #
-    #     try:
-    #         current_mode_data: SetupHeaderDecoder.ModeData = (
-    #             self.logical_stream
-    #                 .vorbis_mode_configurations[mode_number])
-    #         current_mapping_data: SetupHeaderDecoder.MappingData = (
-    #             self.logical_stream
-    #                 .vorbis_mapping_configurations[
-    #                     current_mode_data.vorbis_mode_mapping])
-    #
-    #         # Floor info for every audio channel
-    #         # floor_info: List = []
-    #         # 'True' if floor info decode returned 'unused'
-    #         # and 'False' otherwise
-    #         # no_residue: List[bool] = []
-    #
-    #         for i in range(self.logical_stream.audio_channels):
-    #             submap_number: int = (
-    #                 current_mapping_data.vorbis_mapping_mux[i])
-    #             floor_number: int = (
-    #                 current_mapping_data.vorbis_mapping_submap_floor[
-    #                     submap_number])
-    #
-    #             if floor_number == 0:
-    #                 raise CorruptedFileDataError(
-    #                     "Got floor type 0 when decoding audio data. This "
-    #                     "program DO NOT support any floor 0 decoding!")
-    #
-    #             if floor_number == 1:
-    #                 self._audio_data_decoder.floor_type_1_packet_decode()
-    #                 # WouldBeBetter: Stopped here
-    #
-    #     except EndOfPacketException:
-    #         pass
+    def get_audio_data(self) -> Iterator[List[np.ndarray]]:
+        """Generator of PCM audio data of audio packets
+
+        Packets are decoded from current reading position, so decoding can
+        be started after [seek_to_sample] or [seek_to_time]. Every item is
+        PCM data of one audio packet: array of samples per channel. Data of
+        the last packet is cut by granule position of the last page. If
+        granule position of the first audio page is less than number of
+        decoded samples then audio is cut at the beginning. After seek data
+        begins from the sought sample. Decoding stops on the last page of
+        logical stream, so next link of chained stream is not decoded
+
+        Raises EndOfPacketException never: packets with end-of-packet
+        condition before audio data are skipped"""
+        if getattr(self, 'logical_stream', None) is None:
+            raise ProgramException("Process file headers first")
+
+        self._check_file_source()
+
+        audio_decoder = AudioDataDecoder(
+            self._data_reader, self.logical_stream)
+
+        # Number of the first sample after returned data. Known at the
+        # beginning of audio data or after the first page with granule
+        sample_position: Optional[int] = None
+        if (self._data_reader.get_next_packet_global_position()
+                == self.logical_stream.audio_byte_position):
+            sample_position = 0
+
+        # Samples before it are dropped: sample of the last seek or zero
+        first_sample = max(0, self._seek_sample or 0)
+        self._seek_sample = None
+
+        # Audio data of packets before the first page with granule position.
+        # It is held until granule position shows sample positions of data
+        held_data: Optional[List[List[np.ndarray]]] = []
+
+        while True:
+            try:
+                self._data_reader.read_split_packet()
+            except EOFError:
+                if held_data is not None:
+                    for held_pcm_data in held_data:
+                        cut_pcm_data = self._cut_pcm_data_beginning(
+                            held_pcm_data, sample_position, first_sample)
+                        if sample_position is not None:
+                            sample_position += len(held_pcm_data[0])
+
+                        if len(cut_pcm_data[0]) != 0:
+                            yield cut_pcm_data
+
+                return
+
+            try:
+                pcm_data = audio_decoder.decode_audio_packet()
+            except EndOfPacketException:
+                continue
+
+            granule_position = self._data_reader.packet_granule_position
+
+            if held_data is not None:
+                held_data.append(pcm_data)
+
+                if granule_position == -1:
+                    continue
+
+                # Held data ends on granule position. On the beginning of
+                # audio samples before zero are dropped, on the last page
+                # granule position cuts the end of data instead
+                held_start = granule_position - sum(
+                    len(held_pcm_data[0]) for held_pcm_data in held_data)
+                if sample_position == 0:
+                    held_start = min(0, held_start)
+                    if self._data_reader.packet_on_last_page:
+                        held_start = 0
+
+                for held_pcm_data in held_data[:-1]:
+                    cut_pcm_data = self._cut_pcm_data_beginning(
+                        held_pcm_data, held_start, first_sample)
+                    held_start += len(held_pcm_data[0])
+
+                    if len(cut_pcm_data[0]) != 0:
+                        yield cut_pcm_data
+
+                sample_position = held_start
+                held_data = None
+
+            packet_start = sample_position
+
+            if granule_position != -1:
+                if self._data_reader.packet_on_last_page:
+                    pcm_data = [
+                        channel_data[:max(
+                            0, granule_position - packet_start)]
+                        for channel_data in pcm_data]
+
+                sample_position = granule_position
+            else:
+                sample_position += len(pcm_data[0])
+
+            pcm_data = self._cut_pcm_data_beginning(
+                pcm_data, packet_start, first_sample)
+
+            if len(pcm_data[0]) != 0:
+                yield pcm_data
+
+            if (granule_position != -1
+                    and self._data_reader.packet_on_last_page):
+                return
+
+    @staticmethod
+    def _cut_pcm_data_beginning(
+            pcm_data: List[np.ndarray],
+            data_start: Optional[int],
+            first_sample: int) -> List[np.ndarray]:
+        """Returns [pcm_data] without samples before [first_sample]
+
+        [data_start] is the number of the first sample of [pcm_data]. Data
+        is not cut if [data_start] is unknown (None)"""
+        if data_start is None or data_start >= first_sample:
+            return pcm_data
+
+        return [
+            channel_data[first_sample - data_start:]
+            for channel_data in pcm_data]
+
+    def _check_file_source(self):
+        """Method checks that processor reads file, not asynchronous
+        stream"""
+        if self._async_packets_reader is not None:
+            raise ProgramException(
+                'Only headers of asynchronous stream are processed')
 
     def close_file(self):
-        """Method closes opened ogg-vorbis file"""
-        self._data_reader.close_file()
+        """Method closes opened ogg-vorbis file
+
+        Asynchronous stream is not closed"""
+        if self._async_packets_reader is None:
+            self._data_reader.close_file()